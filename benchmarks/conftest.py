@@ -0,0 +1,15 @@
+"""
+Benchmarks of the hot paths, based on pytest-benchmark:
+
+    python -m pytest benchmarks
+    python -m pytest benchmarks --benchmark-compare  # compare with the last saved run
+
+The results of every run are saved in .benchmarks/ (ignored by git), so that runs can be compared between commits.
+"""
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    if hasattr(config.option, 'benchmark_autosave'):
+        config.option.benchmark_autosave = True
@@ -0,0 +1,39 @@
+"""
+Micro-benchmark of the JimmyMap access time as the map size grows, for the plain, dataclass and frozen variants.
+The access time should stay flat with the number of keys.
+
+    python benchmarks/jimmy_map_access.py
+"""
+import timeit
+
+from jimmy.jimmy_map import JimmyMap, freeze_jimmy_map, to_jimmy_dataclass
+
+SIZES = (10, 100, 1_000, 10_000)
+NUMBER = 100_000
+
+
+def build_maps(size: int) -> dict:
+    values = {f'key_{i}': i for i in range(size)}
+    annotations = {key: int for key in values}
+    dataclass_cls = to_jimmy_dataclass(type('Config', (JimmyMap,), {'__annotations__': annotations}))
+    return {'plain': JimmyMap(**values),
+            'dataclass': dataclass_cls(**values),
+            'frozen': freeze_jimmy_map(JimmyMap(**values))}
+
+
+def main():
+    operations = {'attribute': 'jmap.key_0',
+                  'getitem': "jmap['key_0']",
+                  'contains': "'key_0' in jmap",
+                  'len': 'len(jmap)'}
+
+    print(f'{"variant":<10} {"size":>7} ' + ' '.join(f'{name:>10}' for name in operations) + '   (ns per call)')
+    for size in SIZES:
+        for variant, jmap in build_maps(size).items():
+            timings = [timeit.timeit(statement, globals={'jmap': jmap}, number=NUMBER) / NUMBER * 1e9
+                       for statement in operations.values()]
+            print(f'{variant:<10} {size:>7} ' + ' '.join(f'{timing:>10.1f}' for timing in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import copy
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from jimmy.constructors import path_constructors  # noqa: E402
+from jimmy.dump import DumpWriter  # noqa: E402
+from jimmy.jimmy import JimmyLauncher, compute_grid_configs, jimmy_load, merge_dict_inplace, save_yaml  # noqa: E402
+from jimmy.jimmy_map import JimmyMap  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def _flat_yaml(num_keys: int, group_size: int = 100) -> str:
+    lines = []
+    for group in range(0, num_keys, group_size):
+        lines.append(f'group_{group}:')
+        lines += [f'  key_{key}: {key}' for key in range(group, min(group + group_size, num_keys))]
+    return '\n'.join(lines) + '\n'
+
+
+def _deep_yaml(depth: int) -> str:
+    return ''.join(f'{"  " * level}level_{level}:\n' for level in range(depth)) + f'{"  " * depth}value: 1\n'
+
+
+def _config(num_keys: int, group_size: int = 100) -> JimmyMap:
+    return JimmyMap(**{f'group_{group}': JimmyMap(**{f'key_{key}': key
+                                                     for key in range(group, min(group + group_size, num_keys))})
+                       for group in range(0, num_keys, group_size)})
+
+
+@pytest.mark.parametrize('num_keys', SIZES)
+def test_load_flat(benchmark, tmp_path, num_keys):
+    (tmp_path / 'config.yaml').write_text(_flat_yaml(num_keys))
+    benchmark(jimmy_load, tmp_path / 'config.yaml')
+
+
+def test_load_deep(benchmark, tmp_path):
+    (tmp_path / 'config.yaml').write_text(_deep_yaml(100))
+    benchmark(jimmy_load, tmp_path / 'config.yaml')
+
+
+@pytest.mark.parametrize('include_workers', [None, 8])
+def test_load_includes(benchmark, tmp_path, include_workers):
+    for index in range(200):
+        (tmp_path / f'include_{index}.yaml').write_text(_flat_yaml(100))
+    (tmp_path / 'config.yaml').write_text(''.join(f"include_{index}: !load 'include_{index}.yaml'\n"
+                                                  for index in range(200)))
+    benchmark(jimmy_load, tmp_path / 'config.yaml', include_workers=include_workers)
+
+
+def test_load_range(benchmark, tmp_path):
+    (tmp_path / 'config.yaml').write_text('values: !range [0, 100000, 1]\n')
+    benchmark(jimmy_load, tmp_path / 'config.yaml')
+
+
+@pytest.mark.parametrize('operation', ['getitem', 'contains', 'iter'])
+def test_jimmy_map_access(benchmark, operation):
+    jmap = JimmyMap(**{f'key_{key}': key for key in range(100_000)})
+    operations = {'getitem': lambda: jmap['key_50000'],
+                  'contains': lambda: 'key_50000' in jmap,
+                  'iter': lambda: sum(1 for _ in jmap)}
+    benchmark(operations[operation])
+
+
+def test_merge_dict_inplace(benchmark):
+    base, update = _config(10_000), _config(10_000)
+    benchmark.pedantic(merge_dict_inplace, setup=lambda: ((copy.deepcopy(base), update), {}), rounds=10)
+
+
+def test_compute_grid_configs(benchmark):
+    config = _config(1_000)
+    grid = JimmyMap(**{f'group_{group}/key_{group}': list(range(10)) for group in range(0, 400, 100)})
+    grid_configs = benchmark(compute_grid_configs, config, grid)
+    assert len(grid_configs) == 10_000
+
+
+def test_parse_config(benchmark):
+    benchmark(JimmyLauncher.parse_config, _config(10_000))
+
+
+def test_save_yaml(benchmark, tmp_path):
+    benchmark(save_yaml, _config(10_000), tmp_path / 'config.yaml')
+
+
+def test_dump_writer(benchmark, tmp_path):
+    configs = [(_config(100), tmp_path / f'point_{index}') for index in range(1_000)]
+
+    def dump():
+        with DumpWriter(manifest_dir=tmp_path, manifest_format='jsonl') as writer:
+            for config, path in configs:
+                writer.submit(config, path, experiment_key=path.name)
+
+    benchmark.pedantic(dump, rounds=3)
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_unique_path(benchmark, tmp_path, cached):
+    for version in range(1, 5_000):
+        (tmp_path / f'logs_v{version}').mkdir()
+    (tmp_path / 'logs').mkdir()
+
+    def setup():
+        if not cached:
+            path_constructors._last_versions.clear()
+
+    benchmark.pedantic(path_constructors._unique_path, args=(tmp_path / 'logs',), setup=setup, rounds=20)
@@ -0,0 +1,40 @@
+"""
+Benchmark of the !unique-path allocation time as the number of existing versions grows.
+The allocation time should stay flat with the number of versions.
+
+    python benchmarks/unique_path.py
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from jimmy.constructors import path_constructors
+from jimmy.constructors.path_constructors import UniquePath
+
+VERSIONS = (10, 100, 1_000, 10_000)
+ALLOCATIONS = 100
+
+
+def main():
+    print(f'{"versions":>9} {"first":>10} {"next":>10}   (us per allocation)')
+    for versions in VERSIONS:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for version in range(versions):
+                (Path(tmp_dir) / f'logs_v{version}').mkdir()
+            (Path(tmp_dir) / 'logs').mkdir()
+
+            # the first allocation scans the directory once, the next ones use the cached version counter
+            path_constructors._last_versions.clear()
+            start = time.perf_counter()
+            UniquePath(Path(tmp_dir) / 'logs').apply()
+            first = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(ALLOCATIONS):
+                UniquePath(Path(tmp_dir) / 'logs').apply()
+            following = (time.perf_counter() - start) / ALLOCATIONS
+            print(f'{versions:>9} {first * 1e6:>10.1f} {following * 1e6:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
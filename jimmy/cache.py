@@ -0,0 +1,108 @@
+import hashlib
+import os
+import pickle
+import warnings
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable
+
+from jimmy.__version__ import __version__
+
+CACHE_DIR_ENV = 'JIMMY_CACHE_DIR'
+
+
+def default_cache_dir() -> Path | None:
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    return Path(cache_dir) if cache_dir else None
+
+
+def path_digest(path: Path) -> str:
+    path = Path(path)
+    if path.is_dir():
+        # directories are tracked by their modification time
+        return f'dir:{path.stat().st_mtime_ns}'
+
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _callable_name(func: Callable) -> str:
+    if isinstance(func, partial):
+        return f'partial({_callable_name(func.func)})'
+    return f'{getattr(func, "__module__", "")}.{getattr(func, "__qualname__", type(func).__qualname__)}'
+
+
+class LoadDependencies:
+    """ Files and directories read while loading a config, with their digest at load time """
+    def __init__(self):
+        self.digests = {}
+
+    def add(self, path: Path) -> None:
+        path = Path(path).absolute()
+        if path not in self.digests:
+            self.digests[path] = path_digest(path)
+
+    def changed(self) -> bool:
+        for path, digest in self.digests.items():
+            try:
+                if path_digest(path) != digest:
+                    return True
+            except OSError:
+                return True
+        return False
+
+
+class ParseCache:
+    """
+    On-disk cache of loaded configs. Entries are keyed by the root file, the load arguments and the working
+    directory, and are invalidated as soon as any of the recorded dependencies (e.g. !load-ed files) changes.
+    """
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    def key(self, path: Path, cli_kwargs: dict = None, constructors: dict = None, **options) -> str:
+        cli_kwargs = {} if cli_kwargs is None else cli_kwargs
+        constructors = {} if constructors is None else constructors
+
+        key = hashlib.sha256()
+        key.update(__version__.encode())
+        key.update(str(Path(path).absolute()).encode())
+        key.update(path_digest(path).encode())
+        # relative includes not found next to the including file, and !absolute-path, are resolved from the cwd
+        key.update(os.getcwd().encode())
+        key.update(repr(sorted(cli_kwargs.items())).encode())
+        key.update(repr(sorted(options.items())).encode())
+        for tag, func in sorted(constructors.items()):
+            key.update(f'{tag}={_callable_name(func)}'.encode())
+        return key.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f'{key}.pkl'
+
+    def get(self, key: str) -> Any:
+        try:
+            with open(self._entry_path(key), 'rb') as f:
+                dependencies, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # corrupted or written by an incompatible version, it will be overwritten
+            return None
+
+        if dependencies.changed():
+            return None
+        return value
+
+    def set(self, key: str, dependencies: LoadDependencies, value: Any) -> None:
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path.with_name(f'{entry_path.name}.{os.getpid()}.tmp')
+        try:
+            data = pickle.dumps((dependencies, value), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            warnings.warn(f'config could not be cached: {e}')
+            return None
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, entry_path)
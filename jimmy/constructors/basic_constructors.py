@@ -14,12 +14,13 @@ def jimmy_configurator_constructor(loader, node):
     return Configurator(**node_mapping)
 
 
-def time_stamp(*args):
-    class TimeStamp:
-        @staticmethod
-        def apply(**kwargs):
-            return datetime.now().strftime("%y_%m_%d_%H:%M:%S")
+class TimeStamp:
+    @staticmethod
+    def apply(**kwargs):
+        return datetime.now().strftime("%y_%m_%d_%H:%M:%S")
+
 
+def time_stamp(*args):
     return TimeStamp()
 
 
@@ -1,5 +1,145 @@
+import math
+import operator
+from abc import abstractmethod
+from collections.abc import Sequence
+
 from jimmy.constructors.utils import build_check_sequential
-import numpy as np
+
+
+class NumericSequence(Sequence):
+    """
+    Immutable arithmetic (or geometric) sequence built by a yaml tag. The elements are computed on demand from the
+    tag arguments, so the sequence takes the same memory whatever its length, it is never copied and it is dumped
+    back as the tag. Slicing returns a list of the selected elements.
+    """
+    __slots__ = ('args', '_length')
+    tag = None
+
+    def __init__(self, *args):
+        self.args = args
+        self._length = self._compute_length()
+
+    @abstractmethod
+    def _compute_length(self) -> int:
+        ...
+
+    @abstractmethod
+    def _value(self, index: int):
+        ...
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._value(i) for i in range(*index.indices(self._length))]
+
+        index = operator.index(index)
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f'{self.tag} index out of range')
+        return self._value(index)
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self._value(index)
+
+    def __reversed__(self):
+        for index in reversed(range(self._length)):
+            yield self._value(index)
+
+    def __eq__(self, other):
+        # compared element-wise as any other sequence, the same arguments are only a shortcut
+        if type(other) is type(self) and self.args == other.args:
+            return True
+        if isinstance(other, Sequence) and not isinstance(other, (str, bytes)):
+            return len(other) == self._length and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __hash__(self):
+        # equal sequences have the same elements, hashed as the equal tuple
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({", ".join(repr(arg) for arg in self.args)})'
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return type(self), self.args
+
+    def tolist(self) -> list:
+        return list(self)
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+        return np.fromiter(self, dtype=float if dtype is None else dtype, count=self._length)
+
+
+class RangeSequence(NumericSequence):
+    """ Same elements as numpy.arange(start, stop, step), integers if all the arguments are integers """
+    __slots__ = ('_delta',)
+    tag = '!range'
+
+    def _compute_length(self) -> int:
+        start, stop, step = self.args
+        if step == 0:
+            raise ValueError('!range step must be non zero.')
+        # as numpy, the elements are start + index * (second element - start)
+        self._delta = (start + step) - start
+        return max(math.ceil((stop - start) / step), 0)
+
+    def _value(self, index: int):
+        return self.args[0] + index * self._delta
+
+
+class LinSpaceSequence(NumericSequence):
+    """ Same elements as numpy.linspace(start, stop, num) """
+    __slots__ = ('_step',)
+    tag = '!lin-space'
+
+    def _compute_length(self) -> int:
+        start, stop, num = self.args
+        num = operator.index(num)
+        if num < 0:
+            raise ValueError(f'!lin-space number of samples must be non negative, got {num}.')
+        # as numpy, the elements are floats even if the arguments are integers
+        self._step = (stop - start) / (num - 1) if num > 1 else float(stop - start)
+        return num
+
+    def _value(self, index: int) -> float:
+        start, stop, _ = self.args
+        if index == self._length - 1 and index > 0:
+            return float(stop)
+        return start + index * self._step
+
+
+class LogSpaceSequence(NumericSequence):
+    """ Same elements as numpy.logspace(start, stop, num), held in a float array built on first access """
+    __slots__ = ('_buffer',)
+    tag = '!log-space'
+
+    def _compute_length(self) -> int:
+        # the vectorized numpy power can differ from the python one in the last digit, so the elements are
+        # computed by numpy to keep the same values (and experiment keys) as numpy.logspace
+        self._buffer = None
+        return LinSpaceSequence(*self.args)._length
+
+    def _value(self, index: int) -> float:
+        if self._buffer is None:
+            import numpy as np
+            self._buffer = np.logspace(*self.args)
+        return self._buffer[index].item()
+
+
+def _numeric_args(loader, node) -> list:
+    seq = build_check_sequential(loader, node, expected_len=3)
+    return [s if not isinstance(s, str) else float(s) for s in seq]
 
 
 def sum_nodes(loader, node):
@@ -7,19 +147,13 @@ def sum_nodes(loader, node):
     return sum(seq)
 
 
-def build_range(loader, node):
-    seq = build_check_sequential(loader, node, expected_len=3)
-    seq = [s if not isinstance(s, str) else float(s) for s in seq]
-    return np.arange(*seq).tolist()
+def build_range(loader, node) -> RangeSequence:
+    return RangeSequence(*_numeric_args(loader, node))
 
 
-def build_log_space(loader, node):
-    seq = build_check_sequential(loader, node, expected_len=3)
-    seq = [s if not isinstance(s, str) else float(s) for s in seq]
-    return np.logspace(*seq).tolist()
+def build_log_space(loader, node) -> LogSpaceSequence:
+    return LogSpaceSequence(*_numeric_args(loader, node))
 
 
-def build_lin_space(loader, node):
-    seq = build_check_sequential(loader, node, expected_len=3)
-    seq = [s if not isinstance(s, str) else float(s) for s in seq]
-    return np.linspace(*seq).tolist()
+def build_lin_space(loader, node) -> LinSpaceSequence:
+    return LinSpaceSequence(*_numeric_args(loader, node))
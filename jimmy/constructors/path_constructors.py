@@ -1,4 +1,8 @@
+import fnmatch
+import os
 import pathlib
+import re
+from collections.abc import Sequence
 from jimmy.constructors.utils import generic_constructor, build_check_sequential
 from yaml import nodes
 
@@ -15,10 +19,107 @@ def join_paths(loader, node):
     return _join_paths(seq)
 
 
+# complete listings of the single level globs, (absolute root, pattern) -> (root mtime, matching entry names)
+_glob_cache = {}
+
+
+class GlobPaths(Sequence):
+    """
+    Deferred !glob, the paths matching pattern in root are listed only when accessed. The patterns matching the
+    entries of root are resolved with os.scandir, iterating and counting stream the directory without building
+    the full list. Complete listings are cached per process until the root directory is modified.
+    """
+    def __init__(self, root, pattern: str):
+        self.root = pathlib.Path(root)
+        self.pattern = pattern
+
+    def __repr__(self):
+        return f'GlobPaths({str(self.root)!r}, {self.pattern!r})'
+
+    def __eq__(self, other):
+        if isinstance(other, GlobPaths):
+            return self.root == other.root and self.pattern == other.pattern
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def _single_level(self) -> bool:
+        # recursive or nested patterns depend on the content of sub-directories, they are never cached
+        return '/' not in self.pattern and os.sep not in self.pattern and '**' not in self.pattern
+
+    def _cache_key(self) -> tuple[str, str]:
+        return os.path.abspath(self.root), self.pattern
+
+    def _cached_names(self) -> tuple[str, ...] | None:
+        entry = _glob_cache.get(self._cache_key())
+        if entry is None:
+            return None
+
+        try:
+            mtime = os.stat(self.root).st_mtime_ns
+        except OSError:
+            return None
+        return entry[1] if entry[0] == mtime else None
+
+    def _scan(self):
+        if not self._single_level():
+            yield from self.root.glob(self.pattern)
+            return None
+
+        try:
+            mtime = os.stat(self.root).st_mtime_ns
+            entries = os.scandir(self.root)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+        match = re.compile(fnmatch.translate(self.pattern)).match
+        names = []
+        with entries:
+            for entry in entries:
+                if match(entry.name):
+                    names.append(entry.name)
+                    yield self.root / entry.name
+
+        # the listing is cached only once complete
+        _glob_cache[self._cache_key()] = (mtime, tuple(names))
+
+    def _names(self) -> tuple[str, ...]:
+        names = self._cached_names()
+        if names is None:
+            names = tuple(path.name if self._single_level() else str(path.relative_to(self.root))
+                          for path in self._scan())
+        return names
+
+    def __iter__(self):
+        names = self._cached_names()
+        if names is None:
+            return self._scan()
+        return (self.root / name for name in names)
+
+    def __len__(self) -> int:
+        names = self._cached_names()
+        if names is None:
+            return sum(1 for _ in self._scan())
+        return len(names)
+
+    def __getitem__(self, index):
+        names = self._names()
+        if isinstance(index, slice):
+            return [self.root / name for name in names[index]]
+        return self.root / names[index]
+
+
 def join_paths_glob(loader, node):
     seq = build_check_sequential(loader, node)
-    return_path = _join_paths(seq[:-1])
-    return list(return_path.glob(seq[-1]))
+    return GlobPaths(_join_paths(seq[:-1]), seq[-1])
 
 
 def home_path(*args, **kwargs):
@@ -31,46 +132,101 @@ def here_path(*args, path=None, **kwargs):
     return path.absolute().parent
 
 
-def _recurrent_unique_path(path: pathlib.Path, idx: int = 1, ignore_name=None):
-    if not path.exists():
-        return path
+# last version allocated for each versioned name, so that the directory is scanned only once per process
+_last_versions = {}
 
-    identifier = f'_v{idx}'
 
-    if ignore_name is None:
-        new_path = path.parent / f'{path.stem}{identifier}{path.suffix}'
-    else:
-        new_path = path.parent.parent / f'{path.parent.name}{identifier}' / path.name
+def _reserve_path(path: pathlib.Path, is_dir: bool) -> bool:
+    # atomically create the path, it fails if it already exists (e.g. reserved by a concurrent worker)
+    try:
+        if is_dir:
+            path.mkdir(parents=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+    return True
 
-    if new_path.exists():
-        return _recurrent_unique_path(path, idx + 1, ignore_name=ignore_name)
-    else:
-        return new_path
 
+def _max_version(directory: pathlib.Path, name: str, suffix: str) -> int:
+    pattern = re.compile(rf'{re.escape(name)}_v(\d+){re.escape(suffix)}')
+    try:
+        with os.scandir(directory) as entries:
+            return max((int(match.group(1)) for entry in entries if (match := pattern.fullmatch(entry.name))),
+                       default=0)
+    except FileNotFoundError:
+        return 0
 
-def unique_path(loader, node):
-    assert isinstance(node, nodes.ScalarNode) or isinstance(node, nodes.SequenceNode)
 
-    class UniquePath:
-        def __init__(self, current):
-            self.current = pathlib.Path(current)
+def _unique_path(path: pathlib.Path, ignore_name=None, is_dir: bool = True) -> pathlib.Path:
+    if _reserve_path(path, is_dir):
+        return path
 
-        def apply(self, experiment_key=None, **kwargs):
+    if ignore_name is None:
+        directory, name, suffix = path.parent, path.stem, path.suffix
+    else:
+        directory, name, suffix = path.parent.parent, path.parent.name, ''
+
+    # start from the last version in use, the versions are never probed one by one from the first
+    version_key = (directory, name, suffix)
+    version = _last_versions.get(version_key) or max(_max_version(directory, name, suffix), 1)
+    while True:
+        identifier = f'_v{version}'
+        if ignore_name is None:
+            new_path = directory / f'{name}{identifier}{suffix}'
+        else:
+            new_path = directory / f'{name}{identifier}' / path.name
+
+        if _reserve_path(new_path, is_dir):
+            _last_versions[version_key] = version
+            return new_path
+        version += 1
+
+
+class UniquePath:
+    """
+    Deferred unique path, the path is allocated and atomically created when applied.
+    The path allocated for each experiment key is memoized, so multiple accesses to the same config are consistent.
+    """
+    def __init__(self, current):
+        self.current = pathlib.Path(current)
+        self._allocated = {}
+
+    def __getstate__(self):
+        return {'current': self.current}
+
+    def __setstate__(self, state):
+        self.__init__(state['current'])
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def apply(self, experiment_key=None, **kwargs):
+        if experiment_key not in self._allocated:
             if self.current.suffix == '':
-                return self.dir_apply(experiment_key=experiment_key)
+                self._allocated[experiment_key] = self.dir_apply(experiment_key=experiment_key)
             else:
-                return self.file_apply(experiment_key=experiment_key)
+                self._allocated[experiment_key] = self.file_apply(experiment_key=experiment_key)
+        return self._allocated[experiment_key]
+
+    def forget(self, experiment_key=None) -> None:
+        """ Allocate a new path at the next apply for experiment_key """
+        self._allocated.pop(experiment_key, None)
 
-        def dir_apply(self, experiment_key=None):
-            out_path = self.current if experiment_key is None else self.current / experiment_key
-            return _recurrent_unique_path(out_path, ignore_name=experiment_key)
+    def dir_apply(self, experiment_key=None):
+        out_path = self.current if experiment_key is None else self.current / experiment_key
+        return _unique_path(out_path, ignore_name=experiment_key, is_dir=True)
 
-        def file_apply(self, experiment_key=None):
-            out_path = self.current if experiment_key is None else self.current.parent / f'{self.current.stem}_' \
-                                                                                         f'{experiment_key}' \
-                                                                                         f'{self.current.suffix}'
-            return _recurrent_unique_path(out_path, ignore_name=experiment_key)
+    def file_apply(self, experiment_key=None):
+        out_path = self.current if experiment_key is None else self.current.parent / f'{self.current.stem}_' \
+                                                                                     f'{experiment_key}' \
+                                                                                     f'{self.current.suffix}'
+        return _unique_path(out_path, ignore_name=experiment_key, is_dir=False)
 
+
+def unique_path(loader, node):
+    assert isinstance(node, nodes.ScalarNode) or isinstance(node, nodes.SequenceNode)
     path = generic_constructor(loader, node, first_element=True)
     return UniquePath(path)
 
@@ -0,0 +1,74 @@
+from functools import lru_cache
+from importlib import import_module
+from typing import Callable
+
+ENTRY_POINT_GROUP = 'jimmy.constructors'
+
+# implementations of the builtin tags, imported only the first time the tag is constructed
+builtin_constructors = {'tag:yaml.org,2002:map': 'jimmy.constructors.basic_constructors:jimmy_constructor',
+                        '!configurator': 'jimmy.constructors.basic_constructors:jimmy_configurator_constructor',
+                        '!join': 'jimmy.constructors.basic_constructors:join',
+                        '!time-stamp': 'jimmy.constructors.basic_constructors:time_stamp',
+                        '!join-paths': 'jimmy.constructors.path_constructors:join_paths',
+                        '!glob': 'jimmy.constructors.path_constructors:join_paths_glob',
+                        '!home': 'jimmy.constructors.path_constructors:home_path',
+                        '!unique-path': 'jimmy.constructors.path_constructors:unique_path',
+                        '!path': 'jimmy.constructors.path_constructors:make_path',
+                        '!absolute-path': 'jimmy.constructors.path_constructors:make_absolute',
+                        '!sum': 'jimmy.constructors.math_constructors:sum_nodes',
+                        '!range': 'jimmy.constructors.math_constructors:build_range',
+                        '!log-space': 'jimmy.constructors.math_constructors:build_log_space',
+                        '!lin-space': 'jimmy.constructors.math_constructors:build_lin_space',
+                        }
+
+
+class LazyConstructor:
+    """ Constructor given as "module:attribute", the module is imported the first time the constructor is called """
+    def __init__(self, spec: str):
+        self.spec = spec
+        # named as the constructor it refers to, e.g. in the parse cache keys
+        self.__module__, _, self.__qualname__ = spec.partition(':')
+        self._constructor = None
+
+    def __repr__(self):
+        return f'LazyConstructor({self.spec!r})'
+
+    def load(self) -> Callable:
+        if self._constructor is None:
+            constructor = import_module(self.__module__)
+            for attribute in self.__qualname__.split('.'):
+                constructor = getattr(constructor, attribute)
+            self._constructor = constructor
+        return self._constructor
+
+    def __call__(self, loader, node):
+        return self.load()(loader, node)
+
+
+def lazy_constructors(specs: dict[str, str | Callable]) -> dict[str, Callable]:
+    return {tag: LazyConstructor(spec) if isinstance(spec, str) else spec for tag, spec in specs.items()}
+
+
+@lru_cache(maxsize=None)
+def entry_point_constructors() -> dict[str, LazyConstructor]:
+    """
+    Third party constructors registered in the "jimmy.constructors" entry points group, e.g. in a setup.cfg:
+        [options.entry_points]
+        jimmy.constructors =
+            !my-tag = my_package.constructors:my_constructor
+    The entry points are only discovered when a tag unknown to the loader is found, and each constructor is
+    imported the first time its tag is constructed.
+    """
+    from importlib.metadata import entry_points
+    constructors = {}
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        tag = entry_point.name if entry_point.name.startswith('!') else f'!{entry_point.name}'
+        constructors[tag] = LazyConstructor(f'{entry_point.module}:{entry_point.attr}')
+    return constructors
+
+
+def undefined_constructor(loader, node):
+    constructor = entry_point_constructors().get(node.tag)
+    if constructor is None:
+        return loader.construct_undefined(node)
+    return constructor(loader, node)
@@ -0,0 +1,232 @@
+import json
+import os
+import queue
+import threading
+from collections.abc import Mapping
+from pathlib import Path, PurePath
+from typing import Any
+
+import yaml
+
+from jimmy.constructors.math_constructors import NumericSequence
+from jimmy.constructors.path_constructors import GlobPaths
+from jimmy.jimmy_map import GenericDict, JimmyMap
+from jimmy.loader import JimmyDumper, JimmyLoader
+
+MANIFEST_NAME = 'jimmy_manifest'
+MANIFEST_FORMATS = ('jsonl', 'yaml')
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, GlobPaths):
+        return str(value.root.absolute() / value.pattern)
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, PurePath):
+        # same as the yaml dumper, paths are dumped absolute
+        return str(Path(value).absolute())
+    if isinstance(value, NumericSequence):
+        # as in yaml, the tag and its arguments instead of the elements
+        return {value.tag: list(value.args)}
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def _serialize_record(experiment_key: str, config: GenericDict, manifest_format: str) -> bytes:
+    record = {'experiment_key': experiment_key, 'config': config}
+    if manifest_format == 'jsonl':
+        return (json.dumps(record, default=_json_default) + '\n').encode()
+    return yaml.dump(record, Dumper=JimmyDumper, explicit_start=True).encode()
+
+
+def manifest_paths(directory: Path, manifest_format: str) -> tuple[Path, Path]:
+    if manifest_format not in MANIFEST_FORMATS:
+        raise ValueError(f'manifest format must be one of {MANIFEST_FORMATS}, got {manifest_format!r}')
+    directory = Path(directory)
+    return directory / f'{MANIFEST_NAME}.{manifest_format}', directory / f'{MANIFEST_NAME}.index.json'
+
+
+class DumpWriter:
+    """
+    Background writer of the dumped configs. The configs are serialized by the caller and written in batches by a
+    single thread, optionally appended to a sweep manifest (one JSONL line or yaml document per config) indexed by
+    experiment key. The index is written once on close, the index of an interrupted sweep is rebuilt by
+    DumpManifest. Errors of the writer thread are raised at the next submit, flush or close.
+    """
+    def __init__(self,
+                 manifest_dir: Path = None,
+                 manifest_format: str = None,
+                 write_files: bool = True,
+                 batch_size: int = 64):
+        self.write_files = write_files
+        self.batch_size = batch_size
+        self.manifest_format = manifest_format
+        self.manifest_path, self.index_path = None, None
+        self.index = {}
+        if manifest_format is not None:
+            self.manifest_path, self.index_path = manifest_paths(manifest_dir, manifest_format)
+            # a resumed sweep appends to the manifest of the previous runs
+            self.index = DumpManifest(self.manifest_path).index()
+
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='jimmy-dump-writer', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def submit(self, config: GenericDict, path: Path, name: str = 'config.yaml', experiment_key: str = None) -> None:
+        """ Dump config at path (a file, or a directory where the config is dumped as name) """
+        self._raise_error()
+        experiment_key = '' if experiment_key is None else experiment_key
+        file_data = yaml.dump(config, Dumper=JimmyDumper) if self.write_files and path is not None else None
+        record = None
+        if self.manifest_format is not None:
+            record = _serialize_record(experiment_key, config, self.manifest_format)
+        self._queue.put((None if file_data is None else Path(path), name, file_data, experiment_key, record))
+
+    def flush(self) -> None:
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self) -> None:
+        closed = False
+        while not closed:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            closed = batch[-1] is None
+            items = [item for item in batch if item is not None]
+            try:
+                if items:
+                    self._write_batch(items)
+                if closed and self.manifest_format is not None:
+                    self._write_index()
+            except Exception as e:
+                self._error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, items: list[tuple]) -> None:
+        if self.write_files:
+            for path, name, file_data, _, _ in items:
+                if file_data is None:
+                    continue
+                _write_text(_config_file_path(path, name), file_data)
+
+        if self.manifest_format is None:
+            return None
+
+        # all the records of the batch are appended with a single write
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, 'ab') as f:
+            offset = f.tell()
+            for _, _, _, experiment_key, record in items:
+                self.index[experiment_key] = (offset, len(record))
+                offset += len(record)
+            f.write(b''.join(record for *_, record in items))
+
+    def _write_index(self) -> None:
+        tmp_path = self.index_path.with_name(f'{self.index_path.name}.{os.getpid()}.tmp')
+        tmp_path.write_text(json.dumps(self.index))
+        os.replace(tmp_path, self.index_path)
+
+
+def _config_file_path(path: Path, name: str) -> Path:
+    if path.exists() and path.is_file():
+        return path.parent / name
+
+    path = path / name
+    path.parent.mkdir(exist_ok=True, parents=True)
+    return path
+
+
+def _write_text(path: Path, data: str) -> None:
+    with open(path, 'w') as f:
+        f.write(data)
+
+
+class DumpManifest:
+    """ Read-only access by experiment key to the configs of a sweep manifest """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.manifest_format = self.path.suffix[1:]
+        _, self.index_path = manifest_paths(self.path.parent, self.manifest_format)
+        self._index = None
+
+    def index(self) -> dict[str, tuple[int, int]]:
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    def _load_index(self) -> dict[str, tuple[int, int]]:
+        if not self.path.exists():
+            return {}
+
+        size = self.path.stat().st_size
+        if self.index_path.exists():
+            index = {key: tuple(value) for key, value in json.loads(self.index_path.read_text()).items()}
+            if max((offset + length for offset, length in index.values()), default=0) == size:
+                return index
+
+        # the index is missing or out of date (e.g. an interrupted sweep), it is rebuilt from the manifest
+        index = {}
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for offset, record in self._split_records(data):
+            try:
+                index[self._parse(record)['experiment_key']] = (offset, len(record))
+            except (ValueError, yaml.YAMLError):
+                # a partially written record from an interrupted run
+                continue
+        return index
+
+    def _split_records(self, data: bytes):
+        separator = b'\n' if self.manifest_format == 'jsonl' else b'\n---'
+        offset = 0
+        while offset < len(data):
+            end = data.find(separator, offset + 1)
+            end = len(data) if end == -1 else end + 1
+            yield offset, data[offset:end]
+            offset = end
+
+    def _parse(self, record: bytes) -> Any:
+        if self.manifest_format == 'jsonl':
+            return json.loads(record, object_hook=lambda value: JimmyMap(**value))
+        return yaml.load(record, Loader=JimmyLoader)
+
+    def keys(self):
+        return self.index().keys()
+
+    def __contains__(self, experiment_key: str) -> bool:
+        return experiment_key in self.index()
+
+    def __len__(self) -> int:
+        return len(self.index())
+
+    def __getitem__(self, experiment_key: str) -> GenericDict:
+        offset, length = self.index()[experiment_key]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return self._parse(f.read(length))['config']
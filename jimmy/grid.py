@@ -0,0 +1,144 @@
+import copy
+import itertools
+import math
+import random
+from collections.abc import Sequence
+from typing import Any, Iterator
+
+from jimmy.jimmy_map import JimmyMap, GenericDict, copy_on_write
+from jimmy.overrides import OverridePlan
+from jimmy.profiling import profile_phase
+
+
+class ReprByKey:
+    """ Used to represent dictionary by keys """
+    def __init__(self, key, value):
+        self.key = key
+        self.value = value
+
+
+class JimmyGrid:
+    """
+    Lazy grid of configs defined by a jimmy grid_launcher. The grid points are never materialized all together:
+    they are yielded one at the time in a stable order (the same as itertools.product over the axes), and any
+    point can be built directly from its index.
+    Each point config shares all the untouched subtrees with config, only the path from the root to each
+    overridden key is copied. They should be treated as read-only, parse_config returns a private copy of them.
+    """
+    def __init__(self, config: GenericDict, grid_launcher: GenericDict):
+        self.config = config
+        self.axis_keys = list(grid_launcher.keys())
+        self.axes = []  # create a list of sequences with all possible variables
+        for value in grid_launcher.values():
+            if isinstance(value, JimmyMap):
+                self.axes.append([ReprByKey(k, v) for k, v in value.items()])
+            elif isinstance(value, Sequence):
+                self.axes.append(value)
+            else:
+                self.axes.append(tuple(value))
+
+        # the overrides are compiled once and applied to every point in a single traversal
+        self.plan = OverridePlan(self.axis_keys)
+        # grid indices of the points in this (possibly sharded or sampled) grid
+        self.indices = range(math.prod(self.shape))
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return tuple(len(axis) for axis in self.axes)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __iter__(self) -> Iterator[tuple[str, GenericDict]]:
+        # itertools.product copies every axis in a tuple, lazy axes (e.g. !range) are indexed instead
+        materialized = all(isinstance(axis, (list, tuple)) for axis in self.axes)
+        if materialized and self.indices == range(math.prod(self.shape)):
+            for new_params in itertools.product(*self.axes):  # create all possible combination of params
+                yield self._build_point(new_params)
+        else:
+            for index in self.indices:
+                yield self._build_point(self._params(index))
+
+    def __getitem__(self, index: int) -> tuple[str, GenericDict]:
+        return self._build_point(self.params(index))
+
+    def shard(self, index: int, count: int, mode: str = 'round-robin') -> 'JimmyGrid':
+        """
+        Deterministic slice of the grid for shard index (0-based) out of count, either assigning the grid points
+        round-robin or in contiguous blocks. The experiment keys are the same as in the full grid.
+        """
+        if not 0 <= index < count:
+            raise ValueError(f'shard index must be between 0 and {count - 1}, got {index}.')
+
+        if mode == 'round-robin':
+            indices = self.indices[index::count]
+        elif mode == 'block':
+            size = len(self.indices)
+            indices = self.indices[index * size // count:(index + 1) * size // count]
+        else:
+            raise ValueError(f'shard mode must be either "round-robin" or "block", got {mode}.')
+
+        sharded_grid = copy.copy(self)
+        sharded_grid.indices = indices
+        return sharded_grid
+
+    def sample(self, num_samples: int, seed: int = None) -> 'JimmyGrid':
+        """
+        Random subset of num_samples grid points (all of them if the grid is smaller), drawn without replacement
+        and without materializing the grid. The experiment keys are the same as in the full grid.
+        """
+        indices = random.Random(seed).sample(self.indices, min(num_samples, len(self.indices)))
+        sampled_grid = copy.copy(self)
+        sampled_grid.indices = indices
+        return sampled_grid
+
+    def params(self, index: int) -> list[Any]:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError(f'grid index {index} out of range for a grid of size {size}')
+        return self._params(self.indices[index])
+
+    def _params(self, index: int) -> list[Any]:
+        # mixed radix decoding of the grid index, the last axis changes the fastest
+        new_params = []
+        for axis in reversed(self.axes):
+            index, axis_index = divmod(index, len(axis))
+            new_params.append(axis[axis_index])
+        return new_params[::-1]
+
+    def override_values(self, index: int) -> list[Any]:
+        """ Values overridden by the grid point, one per axis key """
+        return [value.value if isinstance(value, ReprByKey) else value for value in self.params(index)]
+
+    def axis_values(self, index: int) -> dict[str, Any]:
+        """ Value of every axis at the grid point, ReprByKey values are given by their label """
+        return {key: value.key if isinstance(value, ReprByKey) else value
+                for key, value in zip(self.axis_keys, self.params(index))}
+
+    def experiment_key(self, index: int) -> str:
+        return self._experiment_key(self.params(index))
+
+    def _experiment_key(self, new_params) -> str:
+        new_name = 'hparam'
+        for value, key in zip(new_params, self.axis_keys):
+            # handle repr by key
+            nice_value = value.key if isinstance(value, ReprByKey) else value
+            key_final = key.split('/')[-1]
+            new_name += f'_{key_final}:{nice_value}'
+        return new_name
+
+    def _build_point(self, new_params) -> tuple[str, GenericDict]:
+        with profile_phase('grid_point'):
+            real_values = [value.value if isinstance(value, ReprByKey) else value for value in new_params]
+            return self._experiment_key(new_params), self.plan.apply(self.config, real_values)
+
+
+def compute_grid_configs(config: GenericDict, kwargs: GenericDict) -> GenericDict:
+    """
+    Config of every grid point by experiment key. The points share their untouched subtrees with config as copy on
+    write maps, so a point can be modified without changing config or the other points.
+    """
+    with profile_phase('grid'):
+        return {key: copy_on_write(point) for key, point in JimmyGrid(config, kwargs)}
@@ -0,0 +1,189 @@
+import copy
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from jimmy.cache import LoadDependencies
+from jimmy.profiling import profile_phase
+
+# matches the static includes, e.g. `!load 'a.yaml'` or `!load [b.yaml]`, dynamic ones are resolved at construction
+_static_include = re.compile(r"""!load\s+\[?\s*(?:'([^']+)'|"([^"]+)"|([^\s'"\[\],#{}!][^\s\[\],#{}]*))""")
+
+
+def _absolute(path: Path) -> Path:
+    return Path(os.path.normpath(Path(path).expanduser().absolute()))
+
+
+class IncludeCycleError(ValueError):
+    def __init__(self, chain: tuple[Path, ...]):
+        self.chain = chain
+        super().__init__(f'!load include cycle: {" -> ".join(str(path) for path in chain)}')
+
+
+class IncludeResolver:
+    """
+    Resolves the !load includes of a single load. Every distinct file is parsed once and its result is shared
+    between all the includes (or copied for each of them if copy_on_use is True). Relative includes are resolved
+    against the including file, and include cycles are reported with the full include chain.
+    When max_workers is given, the static includes of every parsed file are prefetched and parsed concurrently.
+    A resolver can be shared by concurrent loads (e.g. jimmy_load_many): a file being parsed by one load is waited
+    for by the others, so that every file is parsed once.
+    """
+    def __init__(self,
+                 loader_cls: type,
+                 constructors: dict = None,
+                 dependencies: LoadDependencies = None,
+                 copy_on_use: bool = True,
+                 max_workers: int = None):
+        self.loader_cls = loader_cls
+        self.constructors = constructors
+        self.dependencies = dependencies
+        self.copy_on_use = copy_on_use
+        self.max_workers = max_workers
+
+        self._parsed = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # threads parsing a file inline, and the file each thread is waiting for
+        self._owners = {}
+        self._waiting = {}
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def parsed_files(self) -> list[Path]:
+        return list(self._parsed.keys())
+
+    def resolve_path(self, path: Path, including_path: Path = None) -> Path:
+        path = Path(path).expanduser()
+        if not path.is_absolute() and including_path is not None:
+            relative_path = Path(including_path).parent / path
+            if relative_path.exists():
+                return _absolute(relative_path)
+        # fall back to the current working directory
+        return _absolute(path)
+
+    def include(self, path: Path, chain: tuple[Path, ...] = ()) -> Any:
+        including_path = chain[-1] if chain else None
+        path = self.resolve_path(path, including_path)
+        if not path.exists():
+            raise ValueError(f'!load cannot load {path}. File does not exists.')
+
+        config = self.parse(path, chain=chain)
+        return copy.deepcopy(config) if self.copy_on_use else config
+
+    def parse(self, path: Path, chain: tuple[Path, ...] = ()) -> Any:
+        path = _absolute(path)
+        if path in chain:
+            raise IncludeCycleError(chain + (path,))
+
+        worker, thread = getattr(self._local, 'worker', False), threading.get_ident()
+        with self._lock:
+            if path in self._parsed:
+                return self._parsed[path]
+            future = self._futures.get(path)
+
+            owned = future is None and not worker
+            if owned:
+                # the other loads sharing the resolver wait for this parse, instead of parsing the file again
+                future = self._futures[path] = Future()
+                future.set_running_or_notify_cancel()
+                self._owners[path] = thread
+
+            elif future is not None and not worker and not future.done():
+                if self._waits_for(self._owners.get(path), thread):
+                    # the file is including, through another load, the file being parsed by this thread
+                    raise IncludeCycleError(chain + (path,))
+                self._waiting[thread] = path
+
+        if owned:
+            return self._owned_parse(path, chain, future)
+
+        if future is not None:
+            if future.done() or not worker:
+                try:
+                    return future.result()
+                finally:
+                    with self._lock:
+                        self._waiting.pop(thread, None)
+            # workers never wait on each other, the include is parsed inline instead
+            future.cancel()
+
+        return self._parse(path, chain + (path,))
+
+    def _waits_for(self, owner: int | None, thread: int) -> bool:
+        # whether owner is waiting, directly or through other threads, for a file parsed by thread
+        seen = set()
+        while owner is not None and owner not in seen:
+            if owner == thread:
+                return True
+            seen.add(owner)
+            waited_path = self._waiting.get(owner)
+            owner = None if waited_path is None else self._owners.get(waited_path)
+        return False
+
+    def _owned_parse(self, path: Path, chain: tuple[Path, ...], future: Future) -> Any:
+        try:
+            config = self._parse(path, chain + (path,))
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(config)
+            return config
+        finally:
+            with self._lock:
+                self._owners.pop(path, None)
+
+    def _parse(self, path: Path, chain: tuple[Path, ...]) -> Any:
+        with profile_phase('parse', path):
+            with open(path, 'rb') as f:
+                stream = f.read()
+
+            if self.max_workers:
+                self._prefetch(stream, path, chain)
+
+            loader = self.loader_cls(stream, path=path, resolver=self, chain=chain)
+            try:
+                config = loader.get_single_data()
+            finally:
+                loader.dispose()
+
+        with self._lock:
+            if self.dependencies is not None:
+                self.dependencies.add(path)
+            return self._parsed.setdefault(path, config)
+
+    def _prefetch(self, stream: bytes, path: Path, chain: tuple[Path, ...]) -> None:
+        for match in _static_include.finditer(stream.decode('utf-8', errors='ignore')):
+            include_path = self.resolve_path(next(group for group in match.groups() if group), path)
+            if include_path in chain or not include_path.is_file():
+                continue
+
+            with self._lock:
+                if include_path in self._parsed or include_path in self._futures:
+                    continue
+
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix='jimmy-include')
+                future = self._executor.submit(self._worker_parse, include_path, chain + (include_path,))
+                self._futures[include_path] = future
+
+    def _worker_parse(self, path: Path, chain: tuple[Path, ...]) -> Any:
+        self._local.worker = True
+        return self._parse(path, chain)
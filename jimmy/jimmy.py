@@ -1,21 +1,35 @@
+import atexit
 import copy
-import itertools
+import inspect
+import os
+import threading
+import traceback
 from collections.abc import Mapping
+from contextlib import contextmanager
 from dataclasses import dataclass
-from functools import partial
-from pathlib import Path, PosixPath
-from typing import Any, Callable
+from functools import partial, wraps
+from pathlib import Path
+from typing import Any, Callable, Iterable
 
 import yaml
 
-from jimmy.constructors.basic_constructors import jimmy_constructor, time_stamp, join, jimmy_configurator_constructor
-from jimmy.constructors.math_constructors import build_range, build_lin_space, build_log_space, sum_nodes
-from jimmy.constructors.path_constructors import home_path, unique_path, make_absolute, join_paths, make_path
-from jimmy.constructors.path_constructors import join_paths_glob, here_path
-from jimmy.constructors.utils import generic_constructor
-from jimmy.jimmy_map import JimmyMap, split_jimmy_map, GenericDict
-from jimmy.utils import config_parser
-from collections import UserList
+from jimmy.cache import ParseCache, LoadDependencies, default_cache_dir
+from jimmy.constructors.path_constructors import UniquePath
+from jimmy.dump import DumpWriter
+from jimmy.overrides import OverridePlan
+from jimmy.ledger import ConfigFingerprint, RunLedger, LEDGER_NAME
+from jimmy.include import IncludeResolver
+from jimmy.loader import JimmyDumper, JimmyLoader, default_constructors, _load
+from jimmy.pool import LaunchFailure, run_pool
+from jimmy.ray_stream import stream_ray
+from jimmy.results import ResultStore, RESULTS_NAME
+from jimmy.transport import ConfigDelta, SweepTask, run_sweep_task
+from jimmy.profiling import Profiler, profile_phase
+from jimmy.grid import JimmyGrid, compute_grid_configs  # noqa: F401 (re-exported, it used to be defined here)
+from jimmy.jimmy_validator import JimmyValidator, ValidationError, validate_grid
+from jimmy.jimmy_map import JimmyMap, split_jimmy_map, GenericDict, copy_on_write, merge_dict
+from jimmy.utils import jimmy_args_parser, parse_shard
+from jimmy.watch import ConfigDiff, ConfigWatcher
 
 
 def touch_file_or_dir(path: Path):
@@ -46,97 +60,175 @@ def update_from_template(jimmy_config: GenericDict, config: GenericDict) -> Gene
     return config
 
 
-default_constructors = {'tag:yaml.org,2002:map': jimmy_constructor,
-                        '!configurator': jimmy_configurator_constructor,
-                        '!join': join,
-                        '!time-stamp': time_stamp,
-                        '!join-paths': join_paths,
-                        '!glob': join_paths_glob,
-                        '!home': home_path,
-                        '!unique-path': unique_path,
-                        '!path': make_path,
-                        '!absolute-path': make_absolute,
-                        '!sum': sum_nodes,
-                        '!range': build_range,
-                        '!log-space': build_log_space,
-                        '!lin-space': build_lin_space
-                        }
-
-
-def _load(path: Path) -> GenericDict:
-    with open(path, 'r') as f:
-        config = yaml.full_load(f)
-        return config
-
-
-def load_node(loader, node) -> GenericDict:
-    if isinstance(node, yaml.nodes.ScalarNode):
-        value = node.value
-
-    elif isinstance(node, yaml.nodes.SequenceNode):
-        value = generic_constructor(loader, node)
-        if len(value) == 1:
-            value = value[0]
-        else:
-            raise ValueError('!load allows only for length 1 list as input.')
-    else:
-        raise ValueError('!load allows only for string or list inputs.')
-
-    value = Path(value)
-    if not value.exists():
-        raise ValueError(f'!load cannot load {value}. File does not exists.')
-
-    return _load(value)
-
-
 def update_nested_dict(base: GenericDict, dict_key: str, dict_value: Any) -> GenericDict:
-    keys = dict_key.split('/')
-    key0, _key = keys[0], '/'.join(keys[1:])
-    if len(keys) == 1:
-        base = merge_dict_inplace(base, JimmyMap(**{key0: dict_value}))
-    else:
-        if key0 not in base:
-            base = merge_dict_inplace(base, JimmyMap(**{key0: JimmyMap()}))
-
-        up_config = update_nested_dict(base[key0], '/'.join(keys[1:]), dict_value)
-        base = merge_dict_inplace(base, JimmyMap(**{key0: up_config}))
-    return base
-
-
-def update_from_cli(base: dict, cli_kwargs: dict):
-    for key, value in cli_kwargs.items():
-        base = update_nested_dict(base, dict_key=key, dict_value=value)
-    return base
-
-
-def jimmy_load(path: Path, cli_kwargs: dict = None, constructors: dict = None) -> tuple[GenericDict, GenericDict]:
-    # add new constructors
-    constructors = default_constructors if constructors is None else default_constructors.update(constructors)
-    constructors['!here'] = partial(here_path, path=path)
-
-    for key, func in constructors.items():
-        yaml.add_constructor(key, func)
-
-    yaml.add_constructor('!load', load_node)
-
-    # add new representer
-    yaml.add_representer(JimmyMap, jimmy_dumper)
-    yaml.add_representer(PosixPath, path_dumper)
+    return OverridePlan([dict_key]).apply(base, [dict_value], inplace=True)
+
+
+def update_from_cli(base: dict, cli_kwargs: dict, strict: bool = False):
+    # all the cli overrides are applied in a single traversal of the config
+    return OverridePlan(cli_kwargs.keys()).apply(base, cli_kwargs.values(), inplace=True, strict=strict)
+
+
+def jimmy_load(path: Path,
+               cli_kwargs: dict = None,
+               constructors: dict = None,
+               cache_dir: Path = None,
+               copy_includes: bool = True,
+               include_workers: int = None) -> tuple[GenericDict, GenericDict]:
+    with profile_phase('jimmy_load', path):
+        # user constructors are bound to the loader instances, the global yaml state is never modified
+        constructors = {} if constructors is None else dict(constructors)
+
+        cache_dir = default_cache_dir() if cache_dir is None else cache_dir
+        if cache_dir is None:
+            return _jimmy_load(path,
+                               cli_kwargs=cli_kwargs,
+                               constructors=constructors,
+                               copy_includes=copy_includes,
+                               include_workers=include_workers)
+
+        cache = ParseCache(cache_dir)
+        cache_key = cache.key(path,
+                              cli_kwargs=cli_kwargs,
+                              constructors={**default_constructors, **constructors},
+                              copy_includes=copy_includes)
+        with profile_phase('cache'):
+            configs = cache.get(cache_key)
+        if configs is None:
+            # the files and directories read during the load are recorded to validate the cache
+            dependencies = LoadDependencies()
+            configs = _jimmy_load(path,
+                                  cli_kwargs=cli_kwargs,
+                                  constructors=constructors,
+                                  dependencies=dependencies,
+                                  copy_includes=copy_includes,
+                                  include_workers=include_workers)
+            cache.set(cache_key, dependencies, configs)
+        return configs
+
+
+def _jimmy_load(path: Path,
+                cli_kwargs: dict = None,
+                constructors: dict = None,
+                dependencies: LoadDependencies = None,
+                copy_includes: bool = True,
+                include_workers: int = None,
+                resolver: IncludeResolver = None) -> tuple[GenericDict, GenericDict]:
+    if resolver is not None:
+        # the parsed files are shared with the other loads of the resolver, they are never modified
+        return _shared_jimmy_load(path, resolver, cli_kwargs=cli_kwargs)
 
     # load config
-    config = _load(path)
+    config = _load(path,
+                   constructors=constructors,
+                   dependencies=dependencies,
+                   copy_includes=copy_includes,
+                   include_workers=include_workers)
 
     if cli_kwargs is not None:
-        config = update_from_cli(config, cli_kwargs)
+        with profile_phase('cli'):
+            config = update_from_cli(config, cli_kwargs)
 
     if 'jimmy' in config:
-        raw_config, jimmy_config = split_jimmy_map(config)
-        config = update_from_template(jimmy_config, raw_config)
+        with profile_phase('template'):
+            raw_config, jimmy_config = split_jimmy_map(config)
+            config = update_from_template(jimmy_config, raw_config)
         return config, jimmy_config
     else:
         return config, JimmyMap()
 
 
+def _shared_jimmy_load(path: Path, resolver: IncludeResolver, cli_kwargs: dict = None):
+    # same as _jimmy_load, but the overrides and the template copy the maps they modify
+    config = resolver.parse(path)
+    if cli_kwargs is not None:
+        with profile_phase('cli'):
+            config = OverridePlan(cli_kwargs.keys()).apply(config, cli_kwargs.values())
+
+    if 'jimmy' not in config:
+        return config, JimmyMap()
+
+    with profile_phase('template'):
+        raw_config, jimmy_config = split_jimmy_map(config)
+        if 'template' in jimmy_config:
+            raw_config = merge_dict(jimmy_config['template'], raw_config)
+    return raw_config, jimmy_config
+
+
+@dataclass
+class LoadFailure:
+    """ Returned by jimmy_load_many in place of the configs of a file that could not be loaded """
+    path: Path
+    exception: BaseException
+    traceback: str = None
+
+
+def _load_or_failure(path: Path, resolver: IncludeResolver, cli_kwargs: dict = None):
+    try:
+        return _jimmy_load(path, cli_kwargs=cli_kwargs, resolver=resolver)
+    except Exception as e:
+        return LoadFailure(path, e, traceback.format_exc())
+
+
+def _load_paths(paths: list[Path],
+                cli_kwargs: dict = None,
+                constructors: dict = None,
+                copy_includes: bool = True,
+                include_workers: int = None,
+                max_workers: int = None) -> list:
+    # the loads share a single include resolver, so the files included by several configs are parsed once
+    with IncludeResolver(JimmyLoader,
+                         constructors=constructors,
+                         copy_on_use=copy_includes,
+                         max_workers=include_workers) as resolver:
+        if max_workers == 1 or len(paths) == 1:
+            return [_load_or_failure(path, resolver, cli_kwargs) for path in paths]
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='jimmy-load') as executor:
+            return list(executor.map(partial(_load_or_failure, resolver=resolver, cli_kwargs=cli_kwargs), paths))
+
+
+def jimmy_load_many(paths: Iterable[Path],
+                    cli_kwargs: dict = None,
+                    constructors: dict = None,
+                    max_workers: int = None,
+                    executor: str = 'thread',
+                    copy_includes: bool = True,
+                    include_workers: int = None) -> list[tuple[GenericDict, GenericDict] | LoadFailure]:
+    """
+    Load several configs concurrently, in a thread pool or in a process pool (executor='process', the paths are
+    split in max_workers contiguous chunks, one per process). The loads of a pool (of a process) share a single
+    include resolver: every file included by several configs is parsed once, while each loader keeps its own state
+    (e.g. the file !here refers to). Returns the (config, jimmy_config) of every path in order, a file that can not
+    be loaded is returned as a LoadFailure without stopping the others. The parse cache is not used.
+    """
+    paths = [Path(path) for path in paths]
+    constructors = {} if constructors is None else dict(constructors)
+    load_kwargs = {'cli_kwargs': cli_kwargs,
+                   'constructors': constructors,
+                   'copy_includes': copy_includes,
+                   'include_workers': include_workers}
+    if executor == 'thread':
+        return _load_paths(paths, max_workers=max_workers, **load_kwargs)
+    if executor != 'process':
+        raise ValueError(f'executor must be either "thread" or "process", got {executor}.')
+
+    max_workers = min(os.cpu_count() if max_workers is None else max_workers, max(len(paths), 1))
+    bounds = [(index * len(paths) // max_workers, (index + 1) * len(paths) // max_workers)
+              for index in range(max_workers)]
+    chunks = [(f'paths {start}-{stop}', {'paths': paths[start:stop], 'max_workers': 1, **load_kwargs})
+              for start, stop in bounds if stop > start]
+
+    results = []
+    for (_, chunk), chunk_results in zip(chunks, run_pool(_load_paths, chunks, max_workers=max_workers)):
+        if isinstance(chunk_results, LaunchFailure):
+            chunk_results = [LoadFailure(path, chunk_results.exception, chunk_results.traceback)
+                             for path in chunk['paths']]
+        results += chunk_results
+    return results
+
+
 def recursive_dict(a: GenericDict, **kwargs) -> GenericDict:
     for key, value in a.items():
         if isinstance(value, JimmyMap):
@@ -151,50 +243,54 @@ def recursive_dict(a: GenericDict, **kwargs) -> GenericDict:
     return a
 
 
-def jimmy_dumper(dumper, data: JimmyMap):
-    return dumper.represent_dict(data.to_dict())
-
+def find_deferred(a: GenericDict, prefix: tuple = ()) -> list[tuple]:
+    # key paths of all the deferred values, i.e. the values resolved by recursive_dict
+    paths = []
+    for key, value in a.items():
+        if isinstance(value, (JimmyMap, dict)):
+            paths += find_deferred(value, prefix + (key,))
 
-def path_dumper(dumper, data: Path):
-    data = str(data.absolute())
-    return dumper.represent_str(data)
+        elif hasattr(value, 'apply'):
+            paths.append(prefix + (key,))
+
+    return paths
+
+
+def find_point_deferred(config: GenericDict, base_paths: list[tuple], keys: Iterable[str]) -> list[tuple]:
+    # key paths of the deferred values of a grid point config, from the ones of the base config: only the
+    # overridden subtrees are searched again
+    overridden = [tuple(key.split('/')) for key in keys]
+    paths = [path for path in base_paths if not any(path[:len(key_path)] == key_path for key_path in overridden)]
+    for key_path in overridden:
+        value = config
+        for key in key_path:
+            value = value[key]
+        if isinstance(value, (JimmyMap, dict)):
+            paths += find_deferred(value, key_path)
+        elif hasattr(value, 'apply'):
+            paths.append(key_path)
+    return list(dict.fromkeys(paths))
 
 
-def compute_grid_configs(config: GenericDict, kwargs: GenericDict) -> GenericDict:
-    class ReprByKey:
-        """ Used to represent dictionary by keys """
-        def __init__(self, key, value):
-            self.key = key
-            self.value = value
+def resolve_deferred(a: GenericDict, paths: list[tuple], **kwargs) -> GenericDict:
+    # same as recursive_dict, but a is not modified: only the maps from the root to the deferred values are copied
+    # and all the other subtrees are shared
+    nested_paths = {}
+    for key, *nested_path in paths:
+        nested_paths.setdefault(key, []).append(tuple(nested_path))
 
-    kwargs_values = []  # create a list of iterables with all possible variables
-    for key, value in kwargs.items():
-        if isinstance(value, JimmyMap):
-            list_values = [ReprByKey(k, v) for k, v in value.items()]
-            kwargs_values.append(list_values)
+    a = copy.copy(a)
+    for key, key_paths in nested_paths.items():
+        if key_paths == [()]:
+            a[key] = a[key].apply(**kwargs)
         else:
-            kwargs_values.append(value)
-
-    all_config = {}
-    for new_params in itertools.product(*kwargs_values):  # create all possible combination of params
-        _config = copy.deepcopy(config)
-        new_name = 'hparam'
-        for value, key in zip(new_params, kwargs.keys()):
-            # handle repr by key
-            nice_value = value.key if isinstance(value, ReprByKey) else value
-            real_value = value.value if isinstance(value, ReprByKey) else value
-
-            _config = update_nested_dict(_config, key, real_value)
-            key_final = key.split('/')[-1]
-            new_name += f'_{key_final}:{nice_value}'
-
-        all_config[new_name] = _config
-    return all_config
+            a[key] = resolve_deferred(a[key], key_paths, **kwargs)
+    return a
 
 
 def save_yaml(config: GenericDict, path: Path) -> None:
     with open(path, "w") as f:
-        yaml.dump(config, f)
+        yaml.dump(config, f, Dumper=JimmyDumper)
 
 
 @dataclass
@@ -204,102 +300,619 @@ class JimmyConfig:
     grid_launcher: GenericDict = None
     ray_remote: GenericDict = None
     ray_init: GenericDict = None
+    ray_launcher: GenericDict = None
+    pool_launcher: GenericDict = None
+    random_launcher: GenericDict = None
+    halving_launcher: GenericDict = None
+    ledger: str | bool = None
+    dump_manifest: str = None
+    dump_files: bool = True
+    results: str | bool = None
+
+
+def _launch(method: Callable) -> Callable:
+    # the config is not swapped by a watcher while the launcher runs, see JimmyLauncher._launching
+    if inspect.isgeneratorfunction(method):
+        @wraps(method)
+        def generator_wrapper(self, *args, **kwargs):
+            with self._launching():
+                yield from method(self, *args, **kwargs)
+
+        return generator_wrapper
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._launching():
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class JimmyLauncher:
-    def __init__(self, config_path: Path = None, cli_kwargs: dict = None, constructors: Mapping = None, launcher=None):
+    def __init__(self,
+                 config_path: Path = None,
+                 cli_kwargs: dict = None,
+                 constructors: Mapping = None,
+                 launcher=None,
+                 cache_dir: Path = None,
+                 include_workers: int = None,
+                 shard: str | tuple[int, int] = None,
+                 shard_mode: str = 'round-robin',
+                 resume: bool = False,
+                 profile: bool | str = False,
+                 validator: JimmyValidator = None,
+                 validation_workers: int = None):
         if config_path is None:
-            config_path, cli_kwargs, launcher = config_parser()
+            config_path, cli_kwargs, jimmy_args = jimmy_args_parser()
+            launcher, shard, shard_mode = jimmy_args.launcher, jimmy_args.shard, jimmy_args.shard_mode
+            resume, profile = jimmy_args.resume, jimmy_args.profile
+
+        # the profile report is printed at exit, if profile is a path the chrome trace is exported there as well
+        self.profiler = None
+        if profile:
+            self.profiler = Profiler().enable()
+            atexit.register(self._report_profile, None if profile is True else Path(profile))
 
         self.config_path = config_path
-        self._config, jimmy_config = jimmy_load(self.config_path, cli_kwargs=cli_kwargs, constructors=constructors)
+        self._cli_kwargs, self._constructors = cli_kwargs, constructors
+        self._config, jimmy_config = jimmy_load(self.config_path,
+                                                cli_kwargs=cli_kwargs,
+                                                constructors=constructors,
+                                                cache_dir=cache_dir,
+                                                include_workers=include_workers)
         self.jimmy_config = JimmyConfig(**jimmy_config)
         self.default_launcher = launcher
+        self.shard = None if shard is None else parse_shard(shard)
+        self.shard_mode = shard_mode
+        self.resume = resume
+        self._dump_writer = None
+        self._result_store = None
+        self._deferred_paths = None
+        self._resolved = {}
+        # configs reloaded by a watcher during a launch are only set once no launch is running
+        self._config_lock = threading.Lock()
+        self._launches, self._pending_config = 0, None
+        # when given, the configs are validated before launching anything
+        self.validator = validator
+        self.validation_workers = validation_workers
+
+    def watch(self, callback: Callable[[ConfigDiff], None] = None, interval: float = None) -> ConfigWatcher:
+        """
+        Keep the config up to date with its files: when the config file, one of its includes or a !glob directory
+        changes, only the changed files are parsed again and spliced into the config. callback is called with the
+        diff of every reload (key paths of the whole file, e.g. 'jimmy/grid_launcher/x'). With interval the files
+        are polled in a background thread, otherwise the returned watcher should be reloaded explicitly.
+        """
+        watcher = ConfigWatcher(self.config_path, cli_kwargs=self._cli_kwargs, constructors=self._constructors)
+
+        def update(diff: ConfigDiff):
+            self._set_config(watcher.config)
+            if callback is not None:
+                callback(diff)
+
+        self._set_config(watcher.config)
+        watcher.subscribe(update)
+        return watcher if interval is None else watcher.watch(interval)
+
+    def _set_config(self, config: GenericDict) -> None:
+        with self._config_lock:
+            if self._launches:
+                self._pending_config = config
+            else:
+                self._swap_config(config)
+
+    @contextmanager
+    def _launching(self):
+        # the config, the grid and the deferred paths stay consistent during a launch, the configs reloaded in the
+        # meantime (e.g. by the watcher thread) are set when the last launch ends
+        with self._config_lock:
+            self._launches += 1
+        try:
+            yield None
+        finally:
+            with self._config_lock:
+                self._launches -= 1
+                if not self._launches and self._pending_config is not None:
+                    config, self._pending_config = self._pending_config, None
+                    self._swap_config(config)
+
+    def _swap_config(self, config: GenericDict) -> None:
+        jimmy_config = JimmyMap()
+        if 'jimmy' in config:
+            config, jimmy_config = split_jimmy_map(config)
+            if 'template' in jimmy_config:
+                # the template is merged in a copy, the watched config is never modified
+                jimmy_config['template'] = copy.deepcopy(jimmy_config['template'])
+            config = update_from_template(jimmy_config, config)
+        self._config, self.jimmy_config = config, JimmyConfig(**jimmy_config)
+        self._deferred_paths, self._resolved = None, {}
+
+    def _report_profile(self, trace_path: Path = None) -> None:
+        self.profiler.print_report()
+        if trace_path is not None:
+            self.profiler.to_chrome_trace(trace_path)
 
     @property
     def config(self) -> GenericDict:
-        return self.parse_config(self._config)
+        # resolved on the first access and memoized, it shares all the subtrees without deferred values with the
+        # loaded config and should be treated as read-only
+        return self.resolved_config()
+
+    def resolve(self, experiment_key: str = None) -> GenericDict:
+        """
+        Resolve again the deferred values of the config (e.g. a new !time-stamp, a new !unique-path version) and
+        memoize the result
+        """
+        if self._deferred_paths is None:
+            self._deferred_paths = find_deferred(self._config)
+        for path in self._deferred_paths:
+            value = self._config
+            for key in path:
+                value = value[key]
+            if isinstance(value, UniquePath):
+                # the unique paths memoize the path allocated for every experiment key
+                value.forget(experiment_key)
+        return self._resolve(experiment_key)
+
+    def _resolve(self, experiment_key: str = None) -> GenericDict:
+        if self._deferred_paths is None:
+            self._deferred_paths = find_deferred(self._config)
+
+        kwargs = {} if experiment_key is None else {'experiment_key': experiment_key}
+        config = resolve_deferred(self._config, self._deferred_paths, **kwargs)
+        self._resolved[experiment_key] = config
+        return config
 
-    @staticmethod
-    def parse_config(config, **kwargs):
-        _config = copy.deepcopy(config)
-        return recursive_dict(_config, **kwargs)
+    def resolved_config(self, experiment_key: str = None) -> GenericDict:
+        """ Config resolved for experiment_key, memoized """
+        config = self._resolved.get(experiment_key)
+        return self._resolve(experiment_key) if config is None else config
+
+    @property
+    def grid(self) -> JimmyGrid:
+        if self.jimmy_config.grid_launcher is None:
+            raise ValueError('The grid requires a "grid_launcher to be defined" in the jimmy-config.')
+
+        grid = JimmyGrid(self._config, self.jimmy_config.grid_launcher)
+        if self.shard is not None:
+            grid = grid.shard(*self.shard, mode=self.shard_mode)
+        return grid
+
+    def sample_grid(self, num_samples: int, seed: int = None) -> JimmyGrid:
+        # the full grid is sampled before sharding, so that the shards split the same sample
+        if self.jimmy_config.grid_launcher is None:
+            raise ValueError('The grid requires a "grid_launcher to be defined" in the jimmy-config.')
+
+        grid = JimmyGrid(self._config, self.jimmy_config.grid_launcher).sample(num_samples, seed=seed)
+        if self.shard is not None:
+            grid = grid.shard(*self.shard, mode=self.shard_mode)
+        return grid
+
+    @property
+    def ledger(self) -> RunLedger | None:
+        ledger = self.jimmy_config.ledger
+        if ledger is False:
+            return None
+
+        if ledger is not None and ledger is not True:
+            return RunLedger(Path(ledger))
 
-    def dump_config(self, config, name='config.yaml'):
         if self.jimmy_config.dump_config is None:
+            if ledger is True:
+                raise ValueError('The ledger requires either a path or a "dump_config" in the jimmy-config.')
             return None
 
-        config_path = self._get_dump_path(config, dump_key=self.jimmy_config.dump_config)
+        # by default the ledger is placed next to the dumped configs
+        return RunLedger(self._sweep_dir() / LEDGER_NAME)
 
-        if config_path.exists() and config_path.is_file():
-            config_path = config_path.parent / name
+    def result_store(self) -> ResultStore | None:
+        """ Store of the sweep results, if enabled by the results key of the jimmy-config """
+        results = self.jimmy_config.results
+        if results is None or results is False:
+            return None
 
-        elif config_path.exists() and config_path.is_dir():
-            config_path = config_path / name
+        if results is not True:
+            return ResultStore(Path(results))
 
-        else:
-            config_path = config_path / name
-            config_path.parent.mkdir(exist_ok=True, parents=True)
-        save_yaml(config, config_path)
+        if self.jimmy_config.dump_config is None:
+            raise ValueError('The result store requires either a path or a "dump_config" in the jimmy-config.')
+        # by default the results are stored next to the dumped configs
+        return ResultStore(self._sweep_dir() / RESULTS_NAME)
+
+    @contextmanager
+    def _storing(self):
+        # the results recorded within the context are written to a single store, closed on exit
+        if self._result_store is not None:
+            yield self._result_store
+            return None
+
+        self._result_store = self.result_store()
+        try:
+            yield self._result_store
+        finally:
+            if self._result_store is not None:
+                self._result_store.close()
+            self._result_store = None
+
+    def _record(self,
+                ledger: RunLedger | None,
+                grid: JimmyGrid,
+                index: int,
+                key: str,
+                fingerprint: str,
+                result,
+                axes: dict = None):
+        # the result of a grid point is recorded in the ledger and in the result store as soon as it completes,
+        # with the axis values of the point unless given
+        if ledger is not None:
+            if isinstance(result, LaunchFailure):
+                ledger.failure(key, fingerprint, result.exception)
+            else:
+                ledger.success(key, fingerprint, result)
+
+        if self._result_store is not None:
+            self._result_store.record(key, grid.axis_values(index) if axes is None else axes, result)
+
+    def _sweep_dir(self) -> Path:
+        # directory of the dumped configs, shared by all the grid points
+        dump_path = self._get_dump_path(self._config, dump_key=self.jimmy_config.dump_config)
+        dump_path = Path(dump_path.current if isinstance(dump_path, UniquePath) else dump_path)
+        return dump_path.parent if dump_path.suffix else dump_path
+
+    def validate_grid(self, grid: JimmyGrid = None, max_workers: int = None) -> dict[str, list[str]]:
+        """ Errors of the invalid grid points by experiment key, all the points are validated up front """
+        if self.validator is None:
+            raise ValueError('Grid validation requires a validator.')
+        max_workers = self.validation_workers if max_workers is None else max_workers
+        return validate_grid(self.validator, self.grid if grid is None else grid, max_workers=max_workers)
+
+    def _validate_before_launch(self, grid: JimmyGrid) -> None:
+        if self.validator is None:
+            return None
+
+        invalid = self.validate_grid(grid)
+        if invalid:
+            raise ValidationError([f'{key}: {error}' for key, errors in invalid.items() for error in errors])
+
+    def _grid_points(self, ledger: RunLedger | None, results: dict, grid: JimmyGrid = None):
+        # yield the grid points to launch, when resuming the results of the completed points are stored in results
+        grid = self.grid if grid is None else grid
+        self._validate_before_launch(grid)
+        completed = ledger.completed() if ledger is not None and self.resume else {}
+        # the base config is walked once by the fingerprint, only if the runs are recorded
+        fingerprint = None if ledger is None else ConfigFingerprint(shared=grid.config)
+        for index, (key, config) in enumerate(grid):
+            point_fingerprint = None if ledger is None else fingerprint(config)
+            if point_fingerprint in completed:
+                results[index] = completed[point_fingerprint]
+                continue
+            yield index, key, point_fingerprint, config
+
+    @staticmethod
+    def parse_config(config, **kwargs):
+        with profile_phase('resolve'):
+            _config = copy.deepcopy(config)
+            return recursive_dict(_config, **kwargs)
+
+    @contextmanager
+    def _dumping(self):
+        # the configs dumped within the context are written by a single background writer, flushed on exit
+        if self._dump_writer is not None or self.jimmy_config.dump_config is None:
+            yield self._dump_writer
+            return None
+
+        manifest_format = self.jimmy_config.dump_manifest
+        self._dump_writer = DumpWriter(manifest_dir=None if manifest_format is None else self._sweep_dir(),
+                                       manifest_format=manifest_format,
+                                       write_files=self.jimmy_config.dump_files)
+        try:
+            yield self._dump_writer
+        finally:
+            writer, self._dump_writer = self._dump_writer, None
+            writer.close()
+
+    def dump_config(self, config, name='config.yaml', experiment_key: str = None):
+        if self.jimmy_config.dump_config is None:
+            return None
+
+        config_path = self._get_dump_path(config, dump_key=self.jimmy_config.dump_config)
+        with self._dumping() as writer:
+            writer.submit(config, config_path, name=name, experiment_key=experiment_key)
 
     @staticmethod
     def _get_dump_path(config, dump_key):
-        keys = dump_key.split('/')
-        config_copy = copy.deepcopy(config)
-        for key in keys:
-            config_copy = config_copy.get(key)
-        return config_copy
+        # the key path is only walked, the config is never copied
+        for key in dump_key.split('/'):
+            config = config.get(key)
+        return config
 
-    def simple_launcher(self, func: Callable, config: GenericDict = None):
+    @_launch
+    def simple_launcher(self, func: Callable, config: GenericDict = None, experiment_key: str = None):
         if config is None:
-            config = self.config
+            # the launched function gets a private copy of the config
+            config = copy.deepcopy(self.config)
+            if self.validator is not None:
+                self.validator.validate(config)
 
-        self.dump_config(config)
+        self.dump_config(config, experiment_key=experiment_key)
         return func(**config)
 
+    @_launch
     def grid_launcher(self, func: Callable):
         if self.jimmy_config.grid_launcher is None:
             raise ValueError('Grid launcher required a "grid_launcher to be defined" in the jimmy-config.')
 
-        grid_configs = compute_grid_configs(self._config, self.jimmy_config.grid_launcher)
-        returns, summaries = [], []
-        for key, config in grid_configs.items():
-            config = self.parse_config(config, experiment_key=key)
-            result = self.simple_launcher(func, config)
-            returns.append(result)
-
-        return returns
-
-    def ray_launcher(self, func: Callable):
+        ledger, returns, grid = self.ledger, {}, self.grid
+        with self._dumping(), self._storing():
+            for index, key, fingerprint, config in self._grid_points(ledger, returns, grid=grid):
+                returns[index] = self._launch_point(func, key, fingerprint, config, ledger, grid=grid, index=index)
+
+        return [returns[index] for index in range(len(returns))]
+
+    def _launch_point(self,
+                      func: Callable,
+                      key: str,
+                      fingerprint: str,
+                      config: GenericDict,
+                      ledger: RunLedger | None,
+                      grid: JimmyGrid = None,
+                      index: int = None,
+                      override_keys: list[str] = None,
+                      axes: dict = None):
+        override_keys = grid.axis_keys if override_keys is None and grid is not None else override_keys
+        config = self._resolve_point(config, key, override_keys)[0]
+        if ledger is not None:
+            ledger.start(key, fingerprint)
+
+        try:
+            self.dump_config(config, experiment_key=key)
+            # the launched function gets a private copy of the config, copied as it is accessed
+            result = func(**copy_on_write(config))
+        except Exception as e:
+            if ledger is not None:
+                ledger.failure(key, fingerprint, e)
+            if grid is not None and self._result_store is not None:
+                axes = grid.axis_values(index) if axes is None else axes
+                self._result_store.record(key, axes, LaunchFailure(key, e, ''))
+            raise
+
+        if grid is None:
+            if ledger is not None:
+                ledger.success(key, fingerprint, result)
+        else:
+            self._record(ledger, grid, index, key, fingerprint, result, axes=axes)
+        return result
+
+    @_launch
+    def random_launcher(self, func: Callable, num_samples: int = None, seed: int = None):
+        """ Run func on num_samples grid points sampled at random, the results are returned in sampling order """
+        # the arguments override the random_launcher jimmy-config
+        random_kwargs = {} if self.jimmy_config.random_launcher is None else dict(self.jimmy_config.random_launcher)
+        num_samples = random_kwargs.get('num_samples') if num_samples is None else num_samples
+        seed = random_kwargs.get('seed') if seed is None else seed
+        if num_samples is None:
+            raise ValueError('Random launcher requires "num_samples", either as argument or in the '
+                             '"random_launcher" jimmy-config.')
+
+        ledger, returns = self.ledger, {}
+        grid = self.sample_grid(num_samples, seed=seed)
+        with self._dumping(), self._storing():
+            for index, key, fingerprint, config in self._grid_points(ledger, returns, grid=grid):
+                returns[index] = self._launch_point(func, key, fingerprint, config, ledger, grid=grid, index=index)
+
+        return [returns[index] for index in range(len(returns))]
+
+    @_launch
+    def halving_launcher(self,
+                         func: Callable,
+                         num_samples: int = None,
+                         seed: int = None,
+                         min_budget: float = None,
+                         max_budget: float = None,
+                         eta: int = None,
+                         budget_key: str = None,
+                         score_key: str = None,
+                         mode: str = None) -> dict[str, Any]:
+        """
+        Successive halving over the grid points (or num_samples of them sampled at random). All the candidates
+        are run with min_budget, passed to func as the budget_key config value, then only the best 1 / eta of them
+        by score are run again with eta times the budget, until a single candidate is left or max_budget is
+        reached. The score is the value returned by func, or its score_key item, and is maximized or minimized
+        according to mode. Returns the last result of every candidate, from the best to the worst.
+        """
+        # the arguments override the halving_launcher jimmy-config
+        halving_kwargs = {'min_budget': 1, 'eta': 3, 'budget_key': 'budget', 'mode': 'max'}
+        if self.jimmy_config.halving_launcher is not None:
+            halving_kwargs.update(self.jimmy_config.halving_launcher)
+        for key, value in [('num_samples', num_samples), ('seed', seed), ('min_budget', min_budget),
+                           ('max_budget', max_budget), ('eta', eta), ('budget_key', budget_key),
+                           ('score_key', score_key), ('mode', mode)]:
+            if value is not None:
+                halving_kwargs[key] = value
+
+        if halving_kwargs['mode'] not in ('max', 'min'):
+            raise ValueError(f'halving mode must be either "max" or "min", got {halving_kwargs["mode"]}.')
+        if halving_kwargs['eta'] < 2:
+            raise ValueError(f'halving eta must be at least 2, got {halving_kwargs["eta"]}.')
+
+        if halving_kwargs.get('num_samples') is None:
+            grid = self.grid
+        else:
+            grid = self.sample_grid(halving_kwargs['num_samples'], seed=halving_kwargs.get('seed'))
+        self._validate_before_launch(grid)
+
+        def score(result):
+            score_key = halving_kwargs.get('score_key')
+            return result if score_key is None else result[score_key]
+
+        ledger = self.ledger
+        completed = ledger.completed() if ledger is not None and self.resume else {}
+        fingerprint = None if ledger is None else ConfigFingerprint(shared=grid.config)
+        budget_plan = OverridePlan([halving_kwargs['budget_key']])
+        max_budget, eta = halving_kwargs.get('max_budget'), halving_kwargs['eta']
+
+        budget_key = halving_kwargs['budget_key']
+        candidates, budget, results = list(enumerate(grid)), halving_kwargs['min_budget'], {}
+        with self._dumping(), self._storing():
+            while True:
+                for index, (key, config) in candidates:
+                    config = budget_plan.apply(config, [budget])
+                    point_fingerprint = None if ledger is None else fingerprint(config)
+                    if point_fingerprint in completed:
+                        results[key] = completed[point_fingerprint]
+                    else:
+                        # the result store keeps the last round of every candidate, with its budget
+                        results[key] = self._launch_point(func, key, point_fingerprint, config, ledger,
+                                                          grid=grid, index=index,
+                                                          override_keys=[*grid.axis_keys, budget_key],
+                                                          axes={**grid.axis_values(index), budget_key: budget})
+
+                # the candidates are sorted by score at every round, the stopped ones keep their last result
+                candidates.sort(key=lambda candidate: score(results[candidate[1][0]]),
+                                reverse=halving_kwargs['mode'] == 'max')
+                if len(candidates) == 1 or (max_budget is not None and budget * eta > max_budget):
+                    break
+
+                candidates = candidates[:max(1, len(candidates) // eta)]
+                budget = budget * eta
+
+        ranked_keys = [key for _, (key, _) in candidates]
+        ranked_keys += sorted((key for key in results if key not in ranked_keys),
+                              key=lambda key: score(results[key]), reverse=halving_kwargs['mode'] == 'max')
+        return {key: results[key] for key in ranked_keys}
+
+    def _resolve_point(self, config: GenericDict, key: str, override_keys: list[str] = None):
+        # config of a grid point resolved for its experiment key, and the key paths of its deferred values. Only the
+        # maps leading to the deferred values are copied, the deferred values are searched in the overridden keys
+        # (or in the whole config if they are not known)
+        if self._deferred_paths is None:
+            self._deferred_paths = find_deferred(self._config)
+
+        with profile_phase('resolve'):
+            if override_keys is None:
+                paths = find_deferred(config)
+            else:
+                paths = find_point_deferred(config, self._deferred_paths, override_keys)
+            return resolve_deferred(config, paths, experiment_key=key), paths
+
+    def _point_delta(self, grid: JimmyGrid, index: int, key: str, config: GenericDict):
+        # resolved config of a grid point (sharing its untouched subtrees with the grid config), and the delta
+        # from which the workers rebuild it
+        resolved, paths = self._resolve_point(config, key, grid.axis_keys)
+        with profile_phase('resolve'):
+            resolved_values = []
+            for path in paths:
+                value = resolved
+                for path_key in path:
+                    value = value[path_key]
+                resolved_values.append((path, value))
+        return resolved, ConfigDelta(key, tuple(grid.override_values(index)), tuple(resolved_values))
+
+    def _ray_remote(self, func: Callable):
         import ray
-        if self.jimmy_config.grid_launcher is None:
-            raise ValueError('Ray launcher requires a "grid_launcher to be defined" in the jimmy-config.')
 
-        # setup ray
-        if self.jimmy_config.ray_init is None:
-            ray.init()
-        else:
-            ray.init(**self.jimmy_config.ray_init)
+        # setup ray, unless it was already initialized (e.g. by the caller)
+        if not ray.is_initialized():
+            ray.init(**({} if self.jimmy_config.ray_init is None else self.jimmy_config.ray_init))
 
         if self.jimmy_config.ray_remote is None:
-            remote_launcher = ray.remote(func)
-        else:
-            remote_launcher = ray.remote(**self.jimmy_config.ray_remote)(func)
+            return ray.remote(func)
+        return ray.remote(**self.jimmy_config.ray_remote)(func)
 
-        grid_configs = compute_grid_configs(self._config, self.jimmy_config.grid_launcher)
+    @_launch
+    def _ray_results(self, func: Callable, results: dict, max_in_flight: int = None, max_retries: int = None):
+        # yield (index, key, result) of the launched grid points as they complete, the results of the points
+        # completed in a previous run are stored in results when resuming
+        if self.jimmy_config.grid_launcher is None:
+            raise ValueError('Ray launcher requires a "grid_launcher to be defined" in the jimmy-config.')
 
-        futures = []
-        for key, config in grid_configs.items():
-            config = self.parse_config(config, experiment_key=key)
-            self.dump_config(config)
-            future = remote_launcher.remote(**config)
-            futures.append(future)
+        # the arguments override the ray_launcher jimmy-config
+        ray_kwargs = {'max_retries': 0}
+        if self.jimmy_config.ray_launcher is not None:
+            ray_kwargs.update(self.jimmy_config.ray_launcher)
+        for key, value in [('max_in_flight', max_in_flight), ('max_retries', max_retries)]:
+            if value is not None:
+                ray_kwargs[key] = value
 
-        results = ray.get(futures)
-        return results
+        import ray
+
+        remote_launcher = self._ray_remote(run_sweep_task)
+        ledger, fingerprints, grid = self.ledger, {}, self.grid
+        # the base config is put once in the object store, every task only sends its delta
+        task_refs = [ray.put(SweepTask(func, grid.config, grid.plan))]
+
+        def tasks():
+            for index, key, fingerprint, config in self._grid_points(ledger, results, grid=grid):
+                config, delta = self._point_delta(grid, index, key, config)
+                self.dump_config(config, experiment_key=key)
+                if ledger is not None:
+                    ledger.start(key, fingerprint)
+                fingerprints[key] = (index, fingerprint)
+                yield key, {'task_refs': task_refs, 'delta': delta}
+
+        with self._dumping(), self._storing():
+            for _, key, result in stream_ray(remote_launcher, tasks(), **ray_kwargs):
+                index, fingerprint = fingerprints.pop(key)
+                self._record(ledger, grid, index, key, fingerprint, result)
+                yield index, key, result
+
+    def ray_stream(self, func: Callable, max_in_flight: int = None, max_retries: int = None):
+        """ Yield (experiment_key, result) of every grid point launched on ray, as soon as it completes """
+        for _, key, result in self._ray_results(func, {}, max_in_flight=max_in_flight, max_retries=max_retries):
+            yield key, result
+
+    def ray_launcher(self,
+                     func: Callable,
+                     max_in_flight: int = None,
+                     max_retries: int = None,
+                     callback: Callable[[str, Any], None] = None):
+        """
+        Run the grid points on ray with at most max_in_flight tasks queued in the cluster, each failed task is
+        retried max_retries times and then recorded as a LaunchFailure. callback(experiment_key, result) is called
+        as soon as each point completes, the results are returned in grid order.
+        """
+        results = {}
+        for index, key, result in self._ray_results(func, results, max_in_flight, max_retries):
+            results[index] = result
+            if callback is not None:
+                callback(key, result)
+        return [results[index] for index in range(len(results))]
+
+    @_launch
+    def pool_launcher(self, func: Callable, max_workers: int = None, start_method: str = None, timeout: float = None):
+        if self.jimmy_config.grid_launcher is None:
+            raise ValueError('Pool launcher requires a "grid_launcher to be defined" in the jimmy-config.')
+
+        # setup the pool, the arguments override the pool_launcher jimmy-config
+        pool_kwargs = {} if self.jimmy_config.pool_launcher is None else dict(self.jimmy_config.pool_launcher)
+        for key, value in [('max_workers', max_workers), ('start_method', start_method), ('timeout', timeout)]:
+            if value is not None:
+                pool_kwargs[key] = value
+
+        ledger, results, grid = self.ledger, {}, self.grid
+        launched = []
+
+        def tasks():
+            for index, key, fingerprint, config in self._grid_points(ledger, results, grid=grid):
+                config, delta = self._point_delta(grid, index, key, config)
+                self.dump_config(config, experiment_key=key)
+                if ledger is not None:
+                    ledger.start(key, fingerprint)
+                launched.append((index, fingerprint))
+                yield key, {'delta': delta}
+
+        def record(task_index, key, result):
+            index, fingerprint = launched[task_index]
+            results[index] = result
+            self._record(ledger, grid, index, key, fingerprint, result)
+
+        with self._dumping(), self._storing():
+            # the base config is sent once to every worker with func, every task only sends its delta
+            run_pool(SweepTask(func, grid.config, grid.plan), tasks(), callback=record, **pool_kwargs)
+        return [results[index] for index in range(len(results))]
 
     def auto_launcher(self, func: Callable):
-        assert self.default_launcher in ['simple', 'grid', 'ray']
+        assert self.default_launcher in ['simple', 'grid', 'ray', 'pool', 'random', 'halving']
 
         if self.default_launcher == 'simple':
             return self.simple_launcher(func=func)
@@ -310,6 +923,15 @@ class JimmyLauncher:
         elif self.default_launcher == 'ray':
             return self.ray_launcher(func=func)
 
+        elif self.default_launcher == 'pool':
+            return self.pool_launcher(func=func)
+
+        elif self.default_launcher == 'random':
+            return self.random_launcher(func=func)
+
+        elif self.default_launcher == 'halving':
+            return self.halving_launcher(func=func)
+
         else:
             raise NotImplementedError
 
@@ -336,3 +958,27 @@ def jimmy_ray_launcher(func, **jimmy_kwargs):
         return _jimmy_launcher.ray_launcher(func)
 
     return wrapper
+
+
+def jimmy_pool_launcher(func, **jimmy_kwargs):
+    def wrapper():
+        _jimmy_launcher = JimmyLauncher(**jimmy_kwargs)
+        return _jimmy_launcher.pool_launcher(func)
+
+    return wrapper
+
+
+def jimmy_random_launcher(func, **jimmy_kwargs):
+    def wrapper():
+        _jimmy_launcher = JimmyLauncher(**jimmy_kwargs)
+        return _jimmy_launcher.random_launcher(func)
+
+    return wrapper
+
+
+def jimmy_halving_launcher(func, **jimmy_kwargs):
+    def wrapper():
+        _jimmy_launcher = JimmyLauncher(**jimmy_kwargs)
+        return _jimmy_launcher.halving_launcher(func)
+
+    return wrapper
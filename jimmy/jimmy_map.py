@@ -1,10 +1,14 @@
 from collections.abc import Mapping
 import copy
-from dataclasses import asdict, is_dataclass, dataclass
-from typing import Union
+from dataclasses import asdict, is_dataclass, dataclass, fields, replace, FrozenInstanceError
+from functools import lru_cache
+from typing import Any, Union
 
 
 class JimmyMap(Mapping):
+    # key set of the dataclass and frozen variants, plain maps keep their keys in the instance __dict__
+    _jimmy_fields = None
+
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
             setattr(self, key, value)
@@ -12,7 +16,7 @@ class JimmyMap(Mapping):
     def __repr__(self, out_str='JimmyMap'):
         divider = '; '
         out_str = f'{out_str}('
-        for key, values in self.to_dict().items():
+        for key, values in self.items():
             if isinstance(values, JimmyMap):
                 values = 'JimmyMap(**)'
             out_str += f'{key}={values}{divider}'
@@ -20,13 +24,40 @@ class JimmyMap(Mapping):
         out_str = out_str[:-len(divider)] + ')'
         return out_str
 
+    def __copy__(self):
+        if self._jimmy_fields is not None:
+            return replace(self)
+        jmap = object.__new__(type(self))
+        jmap.__dict__.update(self.__dict__)
+        return jmap
+
+    def __deepcopy__(self, memo):
+        if self._jimmy_fields is not None:
+            return type(self)(**copy.deepcopy(dict(self.items()), memo))
+        jmap = memo[id(self)] = object.__new__(type(self))
+        jmap.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return jmap
+
+    def __reduce_ex__(self, protocol):
+        if self._jimmy_fields is not None:
+            return super().__reduce_ex__(protocol)
+        # the maps with the same keys (e.g. the same sub-config in every grid point) share a single keys tuple,
+        # which is pickled once and then referenced
+        return _build_jimmy_map, (type(self), _shared_keys(tuple(self.__dict__)), tuple(self.__dict__.values()))
+
+    def _keys(self):
+        jimmy_fields = self._jimmy_fields
+        return self.__dict__ if jimmy_fields is None else jimmy_fields
+
     def to_dict(self):
         if is_dataclass(self):
             return asdict(self)
         return self.__dict__
 
-    def pop(self, key: str):
-        return self.to_dict().pop(key)
+    def pop(self, key: str, *default):
+        if self._jimmy_fields is not None:
+            raise NotImplementedError('pop is not implemented for dataclasses')
+        return self.__dict__.pop(key, *default)
 
     def __setitem__(self, *args):
         if is_dataclass(self):
@@ -36,20 +67,176 @@ class JimmyMap(Mapping):
         setattr(self, key, *values)
 
     def __getitem__(self, key):
+        if self._jimmy_fields is None:
+            return self.__dict__[key]
+
+        if key not in self._jimmy_fields:
+            raise KeyError(key)
         return getattr(self, key)
 
     def __contains__(self, item):
-        return True if item in self.to_dict() else False
+        return item in self._keys()
 
     def __iter__(self):
-        return iter(self.to_dict().keys())
+        return iter(self._keys())
 
     def __len__(self):
-        return len(self.to_dict())
+        return len(self._keys())
+
+
+@lru_cache(maxsize=256)
+def _shared_keys(keys: tuple[str, ...]) -> tuple[str, ...]:
+    # the same keys tuple for the maps with the same keys (bounded, the least recently pickled key sets are dropped)
+    return keys
+
+
+def _build_jimmy_map(cls: type, keys: tuple[str, ...], values: tuple) -> JimmyMap:
+    # used to unpickle plain maps and their subclasses (e.g. Configurator), __init__ is not called
+    jmap = object.__new__(cls)
+    jmap.__dict__.update(zip(keys, values))
+    return jmap
+
+
+class CopyOnWriteMap(JimmyMap):
+    """
+    JimmyMap sharing its values with other configs until they are accessed. The first access to a value replaces
+    it with a private copy: nested maps are copied one level at a time (as copy on write maps), any other value is
+    deep copied. The untouched subtrees stay shared, and a change never leaks to the configs they are shared with.
+    """
+    __slots__ = ('_private',)
+
+    def __getattribute__(self, key):
+        if key in object.__getattribute__(self, '__dict__'):
+            return self._own(key)
+        return object.__getattribute__(self, key)
+
+    def __getitem__(self, key):
+        if key not in self.__dict__:
+            raise KeyError(key)
+        return self._own(key)
+
+    def __setattr__(self, key, value):
+        object.__setattr__(self, key, value)
+        self._private_keys().add(key)
+
+    def _private_keys(self) -> set:
+        try:
+            return object.__getattribute__(self, '_private')
+        except AttributeError:
+            private = set()
+            object.__setattr__(self, '_private', private)
+            return private
+
+    def _own(self, key):
+        values, private = object.__getattribute__(self, '__dict__'), self._private_keys()
+        value = values[key]
+        if key not in private:
+            value = values[key] = copy_on_write(value)
+            private.add(key)
+        return value
+
+    def __copy__(self):
+        # the private values of self are shared with the copy from now on
+        self._private_keys().clear()
+        return copy_on_write(self)
+
+
+def copy_on_write(jmap: Any) -> Any:
+    """ Private copy of jmap: plain maps are copied lazily as CopyOnWriteMap, any other value is deep copied """
+    if type(jmap) is not JimmyMap and type(jmap) is not CopyOnWriteMap:
+        return copy.deepcopy(jmap)
+    if type(jmap) is CopyOnWriteMap:
+        return copy.copy(jmap)
+
+    cow_map = object.__new__(CopyOnWriteMap)
+    object.__getattribute__(cow_map, '__dict__').update(object.__getattribute__(jmap, '__dict__'))
+    return cow_map
 
 
 def to_jimmy_dataclass(cls: JimmyMap, slots=True, frozen=True):
-    return dataclass(slots=slots, frozen=frozen)(cls)
+    data_cls = dataclass(slots=slots, frozen=frozen)(cls)
+    data_cls._jimmy_fields = dict.fromkeys(field.name for field in fields(data_cls))
+    return data_cls
+
+
+class FrozenJimmyMap(Mapping):
+    """
+    Compact read-only JimmyMap, values are stored in __slots__ of a class shared by all the maps with the same keys.
+    """
+    __slots__ = ()
+    _jimmy_fields = {}
+
+    def __repr__(self, out_str='FrozenJimmyMap'):
+        return JimmyMap.__repr__(self, out_str=out_str)
+
+    def __reduce__(self):
+        return _build_frozen_jimmy_map, (tuple(self._jimmy_fields), tuple(self.values()))
+
+    def __setattr__(self, key, value):
+        raise FrozenInstanceError(f'cannot assign to field {key!r} of a FrozenJimmyMap')
+
+    def __delattr__(self, key):
+        raise FrozenInstanceError(f'cannot delete field {key!r} of a FrozenJimmyMap')
+
+    def __copy__(self):
+        return self
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self._jimmy_fields}
+
+    def pop(self, key: str, *default):
+        raise NotImplementedError('pop is not implemented for FrozenJimmyMap')
+
+    def __setitem__(self, *args):
+        raise NotImplementedError('__setitem__ is not implemented for FrozenJimmyMap')
+
+    def __getitem__(self, key):
+        if key not in self._jimmy_fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, item):
+        return item in self._jimmy_fields
+
+    def __iter__(self):
+        return iter(self._jimmy_fields)
+
+    def __len__(self):
+        return len(self._jimmy_fields)
+
+
+# frozen maps are handled everywhere as JimmyMap, without carrying an instance __dict__
+JimmyMap.register(FrozenJimmyMap)
+
+
+def _is_slot_name(key) -> bool:
+    return isinstance(key, str) and key.isidentifier() and not key.startswith('__') and not hasattr(FrozenJimmyMap, key)
+
+
+@lru_cache(maxsize=None)
+def _frozen_jimmy_map_cls(keys: tuple[str, ...]) -> type:
+    return type('FrozenJimmyMap', (FrozenJimmyMap,), {'__slots__': keys, '_jimmy_fields': dict.fromkeys(keys)})
+
+
+def _build_frozen_jimmy_map(keys: tuple[str, ...], values: tuple) -> FrozenJimmyMap:
+    frozen_map = object.__new__(_frozen_jimmy_map_cls(keys))
+    for key, value in zip(keys, values):
+        object.__setattr__(frozen_map, key, value)
+    return frozen_map
+
+
+def freeze_jimmy_map(jmap: Mapping, recursive: bool = True) -> JimmyMap:
+    """
+    Convert a map into a FrozenJimmyMap. Maps with keys that can not be used as attribute names are kept as
+    plain JimmyMap.
+    """
+    keys = tuple(jmap.keys())
+    values = tuple(freeze_jimmy_map(value) if recursive and isinstance(value, Mapping) else value
+                   for value in jmap.values())
+
+    if not all(_is_slot_name(key) for key in keys):
+        return JimmyMap(**dict(zip(keys, values)))
+    return _build_frozen_jimmy_map(keys, values)
 
 
 def split_jimmy_map(jmap, key='jimmy'):
@@ -61,6 +248,28 @@ def split_jimmy_map(jmap, key='jimmy'):
 GenericDict = Union[JimmyMap, dict]
 
 
+def merge_dict(a: GenericDict, b: GenericDict) -> GenericDict:
+    # same as merge_dict_inplace, but only the merged maps are copied, all the other subtrees are shared
+    assert isinstance(a, type(b)), f'{a} must be an instance of type {type(b)}.'
+    a = copy.copy(a)
+    for key, value in b.items():
+        if isinstance(value, JimmyMap) and key in a:
+            a[key] = merge_dict(a.get(key), value)
+        else:
+            a[key] = value
+    return a
+
+
+def replace_key_path(tree: Any, key_path: tuple, value: Any) -> Any:
+    # copy of tree with value at key_path, only the maps and lists from the root to key_path are copied
+    if not key_path:
+        return value
+    key, *nested_path = key_path
+    tree = copy.copy(tree)
+    tree[key] = replace_key_path(tree[key], nested_path, value)
+    return tree
+
+
 class Configurator(JimmyMap):
     name: str
     kwargs: GenericDict
@@ -1,6 +1,21 @@
-from jimmy.jimmy_map import JimmyMap
+import types
+import typing
+from collections.abc import Mapping, Sequence
 from enum import Enum
-from typing import Callable
+from functools import partial
+from numbers import Real
+from typing import Any, Callable, Union
+
+from jimmy.grid import JimmyGrid
+from jimmy.jimmy_map import JimmyMap, GenericDict
+from jimmy.pool import LaunchFailure, run_pool
+
+
+class ValidationError(ValueError):
+    """ Raised with all the errors found validating a config """
+    def __init__(self, errors: list[str]):
+        self.errors = errors
+        super().__init__('invalid config:\n' + '\n'.join(f'  {error}' for error in errors))
 
 
 def failed_exist(**kwargs):
@@ -19,32 +34,239 @@ def failed_test(**kwargs):
 class Validation(Enum):
     SUCCESS = True
     FAILED_EXIST = failed_exist
-    # FAILED_TYPE =  failed_type
+    FAILED_TYPE = failed_type
     FAILED_TEST = failed_test
 
 
+def _type_name(annotation) -> str:
+    return getattr(annotation, '__name__', None) or str(annotation)
+
+
+def _is_deferred(value) -> bool:
+    # deferred values (e.g. !unique-path) are resolved only at launch, they can not be validated before
+    return hasattr(value, 'apply')
+
+
+def compile_type_check(annotation) -> Callable[[Any, str, list], None]:
+    """
+    Compile an annotation into a check(value, key, errors) function, appending to errors a message for every
+    mismatch. Supports plain classes, Any, None, Optional/Union, Literal, list/set/tuple/dict generics, Mappings,
+    jimmy validators and annotated classes (checked recursively when the value is a map).
+    """
+    if annotation is Any:
+        return _check_nothing
+
+    if isinstance(annotation, JimmyValidator):
+        return annotation._check_nested
+
+    if annotation is None or annotation is type(None):
+        return _check_instance(type(None))
+
+    origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+    if origin is Union or origin is types.UnionType:
+        return _check_union(annotation, [compile_type_check(arg) for arg in args])
+
+    if origin is typing.Literal:
+        return _check_literal(args)
+
+    if origin in (list, set, frozenset) or (origin is tuple and len(args) == 2 and args[1] is Ellipsis):
+        return _check_collection(origin, compile_type_check(args[0]) if args else _check_nothing)
+
+    if origin is tuple:
+        return _check_tuple([compile_type_check(arg) for arg in args])
+
+    if origin in (dict, Mapping):
+        value_check = compile_type_check(args[1]) if len(args) == 2 else _check_nothing
+        return _check_mapping(value_check)
+
+    if origin is not None:
+        return _check_instance(origin)
+
+    if annotation is float:
+        # integers are valid floats, e.g. `lr: 1`
+        return _check_instance(Real, exclude=bool, name='float')
+
+    if annotation in (list, tuple):
+        return _check_collection(annotation, None)
+
+    if isinstance(annotation, type):
+        if annotation not in (str, int, bool, list, tuple, dict) and getattr(annotation, '__annotations__', None):
+            return _check_annotated_class(annotation)
+        return _check_instance(annotation)
+
+    # e.g. Callable or string annotations that can not be resolved
+    return _check_nothing
+
+
+def _check_nothing(value, key, errors) -> None:
+    return None
+
+
+def _check_instance(cls: type, exclude: type = None, name: str = None):
+    name = _type_name(cls) if name is None else name
+
+    def check(value, key, errors):
+        if not isinstance(value, cls) or (exclude is not None and isinstance(value, exclude)):
+            if not _is_deferred(value):
+                errors.append(f'{key}: expected {name}, got {type(value).__name__}')
+
+    return check
+
+
+def _check_union(annotation, checks: list[Callable]):
+    def check(value, key, errors):
+        for sub_check in checks:
+            sub_errors = []
+            sub_check(value, key, sub_errors)
+            if not sub_errors:
+                return None
+        if not _is_deferred(value):
+            errors.append(f'{key}: expected {annotation}, got {type(value).__name__}')
+
+    return check
+
+
+def _check_literal(options: tuple):
+    def check(value, key, errors):
+        if value not in options:
+            errors.append(f'{key}: expected one of {list(options)}, got {value!r}')
+
+    return check
+
+
+def _is_sequence(value) -> bool:
+    # yaml sequences are loaded as lists, or as lazy sequences (e.g. !range or !glob)
+    return isinstance(value, Sequence) and not isinstance(value, (str, bytes))
+
+
+def _check_collection(cls: type, item_check: Callable | None):
+    def check(value, key, errors):
+        # yaml sequences are valid for any collection annotation
+        if not isinstance(value, cls) and not _is_sequence(value):
+            if not _is_deferred(value):
+                errors.append(f'{key}: expected {cls.__name__}, got {type(value).__name__}')
+            return None
+        if item_check is not None:
+            for index, item in enumerate(value):
+                item_check(item, f'{key}[{index}]', errors)
+
+    return check
+
+
+def _check_tuple(item_checks: list[Callable]):
+    def check(value, key, errors):
+        if not _is_sequence(value) or len(value) != len(item_checks):
+            if not _is_deferred(value):
+                errors.append(f'{key}: expected a sequence of length {len(item_checks)}, got {value!r}')
+            return None
+        for index, (item_check, item) in enumerate(zip(item_checks, value)):
+            item_check(item, f'{key}[{index}]', errors)
+
+    return check
+
+
+def _check_mapping(value_check: Callable):
+    def check(value, key, errors):
+        if not isinstance(value, Mapping):
+            if not _is_deferred(value):
+                errors.append(f'{key}: expected a map, got {type(value).__name__}')
+            return None
+        for item_key, item in value.items():
+            value_check(item, f'{key}/{item_key}', errors)
+
+    return check
+
+
+def _check_annotated_class(cls: type):
+    instance_check = _check_instance(cls)
+    validator = []  # compiled on first use, the class annotations may reference classes defined later
+
+    def check(value, key, errors):
+        if isinstance(value, cls) or not isinstance(value, Mapping):
+            return instance_check(value, key, errors)
+        if not validator:
+            validator.append(CompiledValidator(cls))
+        validator[0].collect_errors(value, errors, prefix=f'{key}/')
+
+    return check
+
+
+def _type_hints(cls) -> dict:
+    try:
+        return typing.get_type_hints(cls)
+    except Exception:
+        return dict(getattr(cls, '__annotations__', {}))
+
+
+def _class_tests(cls) -> dict[str, list[Callable]]:
+    tests = {}
+    for key, value in cls.__dict__.items():
+        if key.startswith('__'):
+            continue
+        if isinstance(value, Callable):
+            tests[key] = [value]
+        elif isinstance(value, list) and value and all(isinstance(c, Callable) for c in value):
+            tests[key] = value
+    return tests
+
+
+class CompiledValidator:
+    """
+    Checks of all the annotated keys of a class, compiled once into a flat list of (key, type check, tests).
+    All the errors of a config are collected, validation never stops at the first one.
+    """
+    def __init__(self, cls: type):
+        tests = _class_tests(cls)
+        self.checks = [(key, compile_type_check(annotation), tests.get(key, []))
+                       for key, annotation in _type_hints(cls).items()]
+
+    def collect_errors(self, config: GenericDict, errors: list[str], prefix: str = '') -> list[str]:
+        for key, type_check, tests in self.checks:
+            if key not in config:
+                errors.append(f'{prefix}{key}: missing')
+                continue
+
+            value = config[key]
+            type_check(value, f'{prefix}{key}', errors)
+            if not tests or _is_deferred(value):
+                continue
+
+            results = []
+            for test in tests:
+                try:
+                    results.append(bool(test(value)))
+                except Exception as e:
+                    results.append(e)
+            if not all(result is True for result in results):
+                errors.append(f'{prefix}{key}: tests failed for {value!r}, results: {results}')
+        return errors
+
+    def errors(self, config: GenericDict) -> list[str]:
+        return self.collect_errors(config, [])
+
+
 class ObjectValidator:
     def __init__(self, key, annotation: type = None, tests: list[Callable] = None):
         self.key = key
         self.annotation = annotation
         self.tests = tests
+        self._type_check = _check_nothing if annotation is None else compile_type_check(annotation)
 
     def verify(self, test_obj: JimmyMap):
-        # verify type is not yet implemented
         self.verify_exist(test_obj)
+        self.verify_type(test_obj)
         self.run_tests(test_obj)
 
     def verify_exist(self, test_obj: JimmyMap) -> Validation:
-        if hasattr(test_obj, self.key):
+        if self.key in test_obj:
             return Validation.SUCCESS
 
         raise Validation.FAILED_EXIST(key=self.key, test_obj=test_obj)
 
     def verify_type(self, test_obj: JimmyMap) -> Validation:
-        if self.annotation is None:
-            return Validation.SUCCESS
-
-        if isinstance(test_obj[self.key], self.annotation):
+        errors = []
+        self._type_check(test_obj[self.key], self.key, errors)
+        if not errors:
             return Validation.SUCCESS
 
         raise Validation.FAILED_TYPE(key=self.key, annotation=self.annotation, test_obj=test_obj)
@@ -60,40 +282,92 @@ class ObjectValidator:
         raise Validation.FAILED_TEST(key=self.key, results=results)
 
 
+class JimmyValidator:
+    _name = None
+
+    def __init__(self, validator_cls: type):
+        self._name = validator_cls.__name__
+        self._validator_cls = validator_cls
+        self.__annotations__ = validator_cls.__annotations__
+        self._compiled = None
+
+        self._tests = _class_tests(validator_cls)
+        for key, value in validator_cls.__dict__.items():
+            # plain values are allowed as documentation of the defaults, e.g. `x: int = 0`
+            if not key.startswith('__') and key not in self._tests and isinstance(value, list):
+                raise ValueError('value for JimmyValidator Objects must be either None (not defined), '
+                                 'a default value, a callable test or a list of callable tests')
+
+        for key in self.__annotations__:
+            setattr(self, key, None)
+
+    @property
+    def compiled(self) -> CompiledValidator:
+        # compiled on first use, so that the annotations can reference validators defined later
+        if self._compiled is None:
+            self._compiled = CompiledValidator(self._validator_cls)
+        return self._compiled
+
+    def errors(self, test_obj: GenericDict) -> list[str]:
+        """ All the errors of test_obj, an empty list if it is valid """
+        return self.compiled.errors(test_obj)
+
+    def validate(self, test_obj: GenericDict) -> None:
+        errors = self.errors(test_obj)
+        if errors:
+            raise ValidationError(errors)
+
+    def _check_nested(self, value, key, errors) -> None:
+        if not isinstance(value, Mapping):
+            if not _is_deferred(value):
+                errors.append(f'{key}: expected a map, got {type(value).__name__}')
+            return None
+        self.compiled.collect_errors(value, errors, prefix=f'{key}/')
+
+    def __call__(self):
+        raise NotImplementedError(
+            f'{self._name} is now an instance of {type(self).__name__}, and it can not be initialized')
+
+    def __repr__(self):
+        return f'JimmyValidator for {self._name}'
+
+
 def jimmy_validator(validator_cls):
-    class JimmyValidator:
-        _name = validator_cls.__name__
-        _not_initialized = True
-
-        def __init__(self):
-
-            self._tests = {}
-            for key, value in validator_cls.__dict__.items():
-                if key.find('__') != 0:
-                    if isinstance(value, Callable):
-                        self._tests[key] = [value]
-                    elif isinstance(value, list) and all([isinstance(c, Callable) for c in value]):
-                        self._tests[key] = value
-                    else:
-                        raise ValueError(
-                            'value for JimmyValidator Objects must be either None '
-                            '(not defined) or a callable test or a list of callable tests')
-
-            self.__annotations__ = validator_cls.__annotations__
-            self._validators = {}
-            for key, value in self.__annotations__.items():
-                setattr(self, key, None)
-                self._validators[key] = ObjectValidator(key=key, annotation=value, tests=self._tests.get(key))
-
-        def validate(self, test_obj: JimmyMap) -> None:
-            for validator in self._validators.values():
-                validator.verify(test_obj)
-
-        def __call__(self):
-            raise NotImplementedError(
-                f'{self._name} is now an instance of {type(self).__name__}, and it can not be initialized')
-
-        def __repr__(self):
-            return f'JimmyValidator for {self._name}'
-
-    return JimmyValidator()
+    return JimmyValidator(validator_cls)
+
+
+def _validate_points(validator: JimmyValidator, grid: JimmyGrid, start: int, stop: int) -> dict[str, list[str]]:
+    invalid = {}
+    for index in range(start, stop):
+        key, config = grid[index]
+        errors = validator.errors(config)
+        if errors:
+            invalid[key] = errors
+    return invalid
+
+
+def validate_grid(validator: JimmyValidator,
+                  grid: JimmyGrid,
+                  max_workers: int = None,
+                  chunk_size: int = 1024) -> dict[str, list[str]]:
+    """
+    Validate every point of grid before launching it, returns the errors of the invalid points by experiment key.
+    With max_workers, large grids are validated in chunks on a forked process pool (the validator tests do not need
+    to be picklable). Deferred values (e.g. !unique-path) are resolved only at launch and are not validated.
+    """
+    import multiprocessing
+
+    size = len(grid)
+    parallel = max_workers is not None and max_workers > 1 and size > chunk_size
+    if not parallel or 'fork' not in multiprocessing.get_all_start_methods():
+        return _validate_points(validator, grid, 0, size)
+
+    bounds = [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+    chunks = [(f'points {start}-{stop}', {'start': start, 'stop': stop}) for start, stop in bounds]
+    invalid = {}
+    for result in run_pool(partial(_validate_points, validator, grid), chunks,
+                           max_workers=max_workers, start_method='fork'):
+        if isinstance(result, LaunchFailure):
+            raise result.exception
+        invalid.update(result)
+    return invalid
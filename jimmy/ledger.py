@@ -0,0 +1,149 @@
+import base64
+import hashlib
+import json
+import pickle
+import time
+from collections.abc import Mapping
+from pathlib import Path, PurePath
+from typing import Any
+
+LEDGER_NAME = 'jimmy_ledger.jsonl'
+
+
+class ConfigFingerprint:
+    """
+    Canonical hash of a config tree. Maps are hashed independently of the keys order, and deferred values
+    (e.g. !unique-path) are hashed by their definition, so the fingerprint is stable across runs.
+    The hash of every map and list of the shared config (e.g. the base config of a grid) is memoized, so the
+    subtrees shared between the grid points are hashed only once. The other ones are only memoized for one call,
+    so the grid points are not kept alive.
+    """
+    def __init__(self, shared: Any = None):
+        # the shared config is kept alive, so the ids of its subtrees can not be reused
+        self._shared = shared
+        self._shared_ids = set()
+        stack = [] if shared is None else [shared]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, (Mapping, list, tuple)) and id(value) not in self._shared_ids:
+                self._shared_ids.add(id(value))
+                stack += [value[key] for key in value] if isinstance(value, Mapping) else value
+        self._memo = {}
+
+    def __call__(self, config: Any) -> str:
+        return self._digest(config, {}).hex()
+
+    def _digest(self, value: Any, memo: dict) -> bytes:
+        if isinstance(value, (Mapping, list, tuple)):
+            memo = self._memo if id(value) in self._shared_ids else memo
+            memoized = memo.get(id(value))
+            if memoized is not None and memoized[0] is value:
+                return memoized[1]
+
+        if isinstance(value, Mapping):
+            items = sorted((str(key), self._digest(item, memo)) for key, item in value.items())
+            digest = self._hash(b'map', *(part for key, item in items for part in (key.encode(), item)))
+        elif isinstance(value, (list, tuple)):
+            digest = self._hash(b'seq', *(self._digest(item, memo) for item in value))
+        elif isinstance(value, PurePath):
+            digest = self._hash(b'path', str(value).encode())
+        elif value is None or isinstance(value, (bool, int, float, str, bytes)):
+            digest = self._hash(type(value).__name__.encode(), repr(value).encode())
+        elif hasattr(value, '__dict__'):
+            # deferred values are hashed by their definition, i.e. their pickled state
+            state = value.__getstate__() if hasattr(value, '__getstate__') else vars(value)
+            digest = self._hash(type(value).__qualname__.encode(), self._digest(state, {}))
+        else:
+            digest = self._hash(type(value).__qualname__.encode(), repr(value).encode())
+
+        if isinstance(value, (Mapping, list, tuple)):
+            # the value is kept alive with its digest, so its id can not be reused
+            memo[id(value)] = (value, digest)
+        return digest
+
+    @staticmethod
+    def _hash(*parts: bytes) -> bytes:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(len(part).to_bytes(8, 'little'))
+            digest.update(part)
+        return digest.digest()
+
+
+def config_fingerprint(config: Any) -> str:
+    return ConfigFingerprint()(config)
+
+
+def _json_exact(value: Any, decoded: Any) -> bool:
+    # True if the json round trip gave back the same value, with the same types (e.g. not a tuple as a list)
+    if type(value) is not type(decoded):
+        return False
+    if isinstance(value, dict):
+        return (list(value) == list(decoded) and all(type(key) is str for key in value)
+                and all(_json_exact(value[key], decoded[key]) for key in value))
+    if isinstance(value, list):
+        return len(value) == len(decoded) and all(_json_exact(a, b) for a, b in zip(value, decoded))
+    return value == decoded
+
+
+def _encode_result(result: Any) -> dict:
+    try:
+        decoded = json.loads(json.dumps(result))
+        if _json_exact(result, decoded):
+            return {'result': decoded}
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        return {'result_pickle': base64.b64encode(pickle.dumps(result)).decode()}
+    except Exception:
+        return {'result_repr': repr(result)}
+
+
+def _decode_result(record: dict) -> Any:
+    if 'result_pickle' in record:
+        return pickle.loads(base64.b64decode(record['result_pickle']))
+    return record.get('result')
+
+
+class RunLedger:
+    """
+    Append-only JSONL ledger of the grid points launched, with their config fingerprint, status and result.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def _append(self, **record) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps({'time': time.time(), **record}) + '\n'
+        with open(self.path, 'a') as f:
+            f.write(line)
+
+    def start(self, experiment_key: str, fingerprint: str) -> None:
+        self._append(experiment_key=experiment_key, fingerprint=fingerprint, status='started')
+
+    def success(self, experiment_key: str, fingerprint: str, result: Any) -> None:
+        self._append(experiment_key=experiment_key, fingerprint=fingerprint, status='success', **_encode_result(result))
+
+    def failure(self, experiment_key: str, fingerprint: str, exception: BaseException) -> None:
+        self._append(experiment_key=experiment_key, fingerprint=fingerprint, status='failed', error=repr(exception))
+
+    def records(self) -> list[dict]:
+        if not self.path.exists():
+            return []
+
+        records = []
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # a partially written line from an interrupted run
+                    continue
+        return records
+
+    def completed(self) -> dict[str, Any]:
+        """ Results of the fingerprints whose last run completed successfully """
+        last_records = {record['fingerprint']: record for record in self.records()}
+        return {fingerprint: _decode_result(record)
+                for fingerprint, record in last_records.items() if record['status'] == 'success'}
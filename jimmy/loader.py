@@ -0,0 +1,124 @@
+from pathlib import Path, PurePath
+
+import yaml
+
+from jimmy.cache import LoadDependencies
+from jimmy.constructors.math_constructors import NumericSequence
+from jimmy.constructors.path_constructors import GlobPaths, here_path
+from jimmy.constructors.registry import builtin_constructors, lazy_constructors, undefined_constructor
+from jimmy.constructors.utils import generic_constructor
+from jimmy.include import IncludeResolver
+from jimmy.jimmy_map import JimmyMap, FrozenJimmyMap, GenericDict
+from jimmy.profiling import active_profiler
+
+# use the libyaml bindings when available, they are several times faster than the pure python implementation
+try:
+    from yaml import CSafeLoader as _BaseLoader, CDumper as _BaseDumper
+except ImportError:
+    from yaml import SafeLoader as _BaseLoader, Dumper as _BaseDumper
+
+
+def here_node(loader, node) -> Path:
+    return here_path(path=loader.path)
+
+
+def load_node(loader, node) -> GenericDict:
+    if isinstance(node, yaml.nodes.ScalarNode):
+        value = node.value
+
+    elif isinstance(node, yaml.nodes.SequenceNode):
+        value = generic_constructor(loader, node)
+        if len(value) == 1:
+            value = value[0]
+        else:
+            raise ValueError('!load allows only for length 1 list as input.')
+    else:
+        raise ValueError('!load allows only for string or list inputs.')
+
+    return loader.resolver.include(value, chain=loader.chain)
+
+
+default_constructors = lazy_constructors({**builtin_constructors,
+                                          '!here': here_node,
+                                          '!load': load_node,
+                                          })
+
+
+class JimmyLoader(_BaseLoader):
+    """
+    Loader for jimmy configs. The default constructors are registered once on the class, so that jimmy never
+    modifies the global yaml state, while the user constructors, the file being loaded and the resolver used
+    for its includes are bound to the loader instance.
+    """
+    def __init__(self,
+                 stream,
+                 path: Path = None,
+                 constructors: dict = None,
+                 resolver: IncludeResolver = None,
+                 chain: tuple[Path, ...] = None):
+        super().__init__(stream)
+        self.path = getattr(stream, 'name', None) if path is None else path
+        if resolver is None:
+            resolver = IncludeResolver(type(self), constructors=constructors)
+        self.resolver = resolver
+        self.constructors = resolver.constructors
+        self.dependencies = resolver.dependencies
+        self.chain = chain if chain is not None else (() if self.path is None else (Path(self.path).absolute(),))
+        if self.constructors:
+            self.yaml_constructors = {**self.yaml_constructors, **self.constructors}
+
+        profiler = active_profiler()
+        if profiler is not None:
+            # the jimmy and user constructors are timed only while profiling, they are not wrapped otherwise
+            self.yaml_constructors = {**self.yaml_constructors,
+                                      **{tag: profiler.wrap_constructor(tag, self.yaml_constructors[tag], self.path)
+                                         for tag in {**default_constructors, **(self.constructors or {})}}}
+
+
+for _tag, _constructor in default_constructors.items():
+    JimmyLoader.add_constructor(_tag, _constructor)
+# unknown tags are looked up in the constructors registered by third party packages
+JimmyLoader.add_constructor(None, undefined_constructor)
+
+
+def jimmy_dumper(dumper, data: JimmyMap):
+    return dumper.represent_dict(data.to_dict())
+
+
+def path_dumper(dumper, data: PurePath):
+    data = str(Path(data).absolute())
+    return dumper.represent_str(data)
+
+
+def glob_dumper(dumper, data: GlobPaths):
+    # dumped as the pattern, not as the matching paths
+    return dumper.represent_sequence('!glob', [str(data.root.absolute()), data.pattern], flow_style=True)
+
+
+def numeric_sequence_dumper(dumper, data: NumericSequence):
+    # dumped as the tag and its arguments, not as the elements
+    return dumper.represent_sequence(data.tag, list(data.args), flow_style=True)
+
+
+class JimmyDumper(_BaseDumper):
+    pass
+
+
+JimmyDumper.add_multi_representer(JimmyMap, jimmy_dumper)
+JimmyDumper.add_multi_representer(FrozenJimmyMap, jimmy_dumper)
+JimmyDumper.add_multi_representer(PurePath, path_dumper)
+JimmyDumper.add_representer(GlobPaths, glob_dumper)
+JimmyDumper.add_multi_representer(NumericSequence, numeric_sequence_dumper)
+
+
+def _load(path: Path,
+          constructors: dict = None,
+          dependencies: LoadDependencies = None,
+          copy_includes: bool = True,
+          include_workers: int = None) -> GenericDict:
+    with IncludeResolver(JimmyLoader,
+                         constructors=constructors,
+                         dependencies=dependencies,
+                         copy_on_use=copy_includes,
+                         max_workers=include_workers) as resolver:
+        return resolver.parse(path)
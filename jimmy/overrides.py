@@ -0,0 +1,103 @@
+import copy
+from collections.abc import Mapping
+from numbers import Number
+from typing import Any, Iterable, Sequence
+
+from jimmy.jimmy_map import JimmyMap, GenericDict, merge_dict
+
+
+class OverrideError(ValueError):
+    """ Raised with all the overrides that could not be applied to a config """
+    def __init__(self, errors: list[str]):
+        self.errors = errors
+        super().__init__('invalid overrides:\n' + '\n'.join(f'  {error}' for error in errors))
+
+
+def _type_conflict(current: Any, value: Any) -> bool:
+    if current is None or value is None:
+        return False
+    if isinstance(current, Mapping) or isinstance(value, Mapping):
+        return not (isinstance(current, Mapping) and isinstance(value, Mapping))
+    if isinstance(current, Number) and isinstance(value, Number):
+        return isinstance(current, bool) != isinstance(value, bool)
+    return not isinstance(value, type(current))
+
+
+class OverridePlan:
+    """
+    Overrides of slash separated keys (e.g. 'model/layers/n') compiled into a trie, so that all of them are applied
+    to a config in a single traversal. The plan is built once and applied with different values, one per key, to
+    every grid point. A key is applied before the keys nested in it, map values are merged into the existing maps.
+    """
+    def __init__(self, keys: Iterable[str]):
+        self.keys = tuple(keys)
+        # trie of the keys, every node maps a key to [value slot or None, children]
+        self._trie = {}
+        for slot, key in enumerate(self.keys):
+            *parents, leaf = key.split('/')
+            node = self._trie
+            for parent in parents:
+                node = node.setdefault(parent, [None, {}])[1]
+            node.setdefault(leaf, [None, {}])[0] = slot
+
+    def apply(self, config: GenericDict, values: Sequence, inplace: bool = False, strict: bool = False) -> GenericDict:
+        """
+        Apply the overrides to config. Unless inplace, config is not modified and only the maps from the root to
+        the overridden keys are copied. Overriding a key nested in a non-map value always raises an OverrideError,
+        if strict unknown keys and values of a different type than the value overridden are reported as well.
+        All the errors are collected in the same traversal and raised together.
+        """
+        values = tuple(values)
+        if len(values) != len(self.keys):
+            raise ValueError(f'expected {len(self.keys)} override values, got {len(values)}.')
+
+        errors, warnings = [], []
+        config = self._apply(config, self._trie, values, inplace, errors, warnings, prefix='')
+        if strict:
+            errors += warnings
+        if errors:
+            raise OverrideError(errors)
+        return config
+
+    def check(self, config: GenericDict, values: Sequence) -> list[str]:
+        """ Unknown keys and type conflicts of the overrides, config is not modified """
+        errors, warnings = [], []
+        self._apply(config, self._trie, tuple(values), False, errors, warnings, prefix='')
+        return errors + warnings
+
+    def _apply(self, config, trie, values, inplace, errors, warnings, prefix):
+        if not inplace:
+            config = copy.copy(config)
+
+        for key, (slot, children) in trie.items():
+            path = f'{prefix}{key}'
+            exists = key in config
+            if slot is not None:
+                value = values[slot]
+                if exists:
+                    current = config[key]
+                    if _type_conflict(current, value):
+                        warnings.append(f'{path}: {type(value).__name__} value overrides a {type(current).__name__}')
+                    elif isinstance(current, JimmyMap) and isinstance(value, JimmyMap):
+                        value = merge_dict(current, value)
+                else:
+                    warnings.append(f'{path}: unknown key')
+                config[key] = value
+                exists = True
+
+            if not children:
+                continue
+
+            if not exists:
+                # the nested keys are reported only once, with the first missing key
+                warnings.append(f'{path}: unknown key')
+                child, child_inplace, child_warnings = JimmyMap(), True, []
+            else:
+                child, child_inplace, child_warnings = config[key], inplace and slot is None, warnings
+
+            if not isinstance(child, Mapping):
+                errors.append(f'{path}: can not override the keys {list(children)} of a {type(child).__name__}')
+                continue
+            config[key] = self._apply(child, children, values, child_inplace, errors, child_warnings,
+                                      prefix=f'{path}/')
+        return config
@@ -0,0 +1,109 @@
+import os
+import signal
+import warnings
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from jimmy.jimmy_map import GenericDict
+
+# function executed by the pool workers, it is set by the worker initializer (inherited without pickling on fork)
+_worker_func = None
+
+
+@dataclass
+class LaunchFailure:
+    """ Recorded in place of the result of a grid point that raised an exception """
+    experiment_key: str
+    exception: BaseException
+    traceback: str = None
+
+
+def _init_worker(func: Callable) -> None:
+    global _worker_func
+    _worker_func = func
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError('grid point exceeded the pool timeout')
+
+
+def _run_task(config: GenericDict, timeout: float = None) -> Any:
+    if timeout is None or not hasattr(signal, 'SIGALRM'):
+        return _worker_func(**config)
+
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _worker_func(**config)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def run_pool(func: Callable,
+             tasks: Iterable[tuple[str, GenericDict]],
+             max_workers: int = None,
+             start_method: str = None,
+             timeout: float = None,
+             callback: Callable[[int, str, Any], None] = None) -> list:
+    """
+    Run func(**config) for every (experiment_key, config) in tasks on a process pool and return the results in
+    the tasks order. Tasks are consumed lazily, with at most two tasks per worker in flight. A task raising an
+    exception (or exceeding the timeout) is recorded as a LaunchFailure and does not stop the others. If a worker
+    dies abruptly, the pool is broken and the remaining tasks are recorded as LaunchFailures.
+    callback(task_index, experiment_key, result) is called in the calling process as soon as each task completes.
+    """
+    # multiprocessing is imported only when a pool is launched, it is a large part of the jimmy import time
+    import multiprocessing
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from concurrent.futures.process import BrokenProcessPool
+
+    max_workers = os.cpu_count() if max_workers is None else max_workers
+    mp_context = None if start_method is None else multiprocessing.get_context(start_method)
+    if timeout is not None and not hasattr(signal, 'SIGALRM'):
+        warnings.warn('the pool timeout is not enforced on this platform (no SIGALRM)')
+
+    results, in_flight = {}, {}
+    tasks = enumerate(tasks)
+
+    def record(index, key, result):
+        results[index] = result
+        if callback is not None:
+            callback(index, key, result)
+
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             mp_context=mp_context,
+                             initializer=_init_worker,
+                             initargs=(func,)) as executor:
+        exhausted, broken = False, None
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < 2 * max_workers:
+                try:
+                    index, (key, config) = next(tasks)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if broken is not None:
+                    record(index, key, LaunchFailure(key, broken))
+                    continue
+                try:
+                    in_flight[executor.submit(_run_task, config, timeout)] = (index, key)
+                except BrokenProcessPool as e:
+                    broken = e
+                    record(index, key, LaunchFailure(key, broken))
+
+            if not in_flight:
+                continue
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, key = in_flight.pop(future)
+                exception = future.exception()
+                if exception is None:
+                    record(index, key, future.result())
+                else:
+                    # a worker died abruptly: the pool cannot run any other task, they are all recorded as failures
+                    if isinstance(exception, BrokenProcessPool):
+                        broken = exception
+                    cause = exception.__cause__
+                    record(index, key, LaunchFailure(key, exception, None if cause is None else str(cause)))
+
+    return [results[index] for index in range(len(results))]
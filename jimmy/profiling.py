@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+# profiler enabled in this process, when None the instrumentation is reduced to a single global lookup
+_active_profiler = None
+_disabled = nullcontext()
+
+
+@dataclass
+class ProfileStats:
+    kind: str
+    name: str
+    file: str = None
+    count: int = 0
+    total: float = 0.
+    max: float = 0.
+
+
+class Profiler:
+    """
+    Wall time of the load pipeline phases (parsing, includes, cli overrides, templates, grid points and config
+    resolution) and of every constructor tag, per file. Times are inclusive, e.g. the time of a !load constructor
+    includes the parsing of the included file.
+    """
+    def __init__(self):
+        self.stats = {}
+        self.events = []
+        self._lock = threading.Lock()
+
+    def enable(self) -> 'Profiler':
+        global _active_profiler
+        _active_profiler = self
+        return self
+
+    def disable(self) -> None:
+        global _active_profiler
+        if _active_profiler is self:
+            _active_profiler = None
+
+    def record(self, kind: str, name: str, file: str | None, start: float, end: float) -> None:
+        duration = end - start
+        with self._lock:
+            stats = self.stats.get((kind, name, file))
+            if stats is None:
+                stats = self.stats[(kind, name, file)] = ProfileStats(kind, name, file)
+            stats.count += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            self.events.append((kind, name, file, start, duration, threading.get_ident()))
+
+    @contextmanager
+    def phase(self, name: str, file: str = None):
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.record('phase', name, None if file is None else str(file), start, time.perf_counter())
+
+    def wrap_constructor(self, tag: str, constructor: Callable, file: str = None) -> Callable:
+        file = None if file is None else str(file)
+
+        def profiled_constructor(loader, node):
+            start = time.perf_counter()
+            try:
+                return constructor(loader, node)
+            finally:
+                self.record('tag', tag, file, start, time.perf_counter())
+
+        return profiled_constructor
+
+    def sorted_stats(self, key: str = 'total') -> list[ProfileStats]:
+        with self._lock:
+            return sorted(self.stats.values(), key=lambda stats: getattr(stats, key), reverse=True)
+
+    def report(self, key: str = 'total') -> str:
+        lines = [f'{"kind":<6} {"name":<24} {"count":>7} {"total [ms]":>11} {"max [ms]":>10}  file']
+        for stats in self.sorted_stats(key):
+            lines.append(f'{stats.kind:<6} {stats.name:<24} {stats.count:>7} {stats.total * 1e3:>11.2f} '
+                         f'{stats.max * 1e3:>10.2f}  {"" if stats.file is None else stats.file}')
+        return '\n'.join(lines)
+
+    def print_report(self, key: str = 'total', file=None) -> None:
+        print(self.report(key), file=sys.stderr if file is None else file)
+
+    def to_chrome_trace(self, path: Path) -> None:
+        """ Export the recorded events in the Chrome trace format, e.g. to be opened in chrome://tracing """
+        pid = os.getpid()
+        with self._lock:
+            events = [{'name': name, 'cat': kind, 'ph': 'X', 'ts': start * 1e6, 'dur': duration * 1e6,
+                       'pid': pid, 'tid': tid, 'args': {} if file is None else {'file': file}}
+                      for kind, name, file, start, duration, tid in self.events]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def active_profiler() -> Profiler | None:
+    return _active_profiler
+
+
+def profile_phase(name: str, file: str = None):
+    profiler = _active_profiler
+    return _disabled if profiler is None else profiler.phase(name, file)
+
+
+@contextmanager
+def profile(profiler: Profiler = None):
+    """ Profile the loads within the context, e.g. `with profile() as profiler: jimmy_load(path)` """
+    global _active_profiler
+    profiler = Profiler() if profiler is None else profiler
+    previous_profiler, _active_profiler = _active_profiler, profiler
+    try:
+        yield profiler
+    finally:
+        _active_profiler = previous_profiler
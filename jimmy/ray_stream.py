@@ -0,0 +1,52 @@
+import traceback
+from typing import Any, Iterable, Iterator
+
+from jimmy.jimmy_map import GenericDict
+from jimmy.pool import LaunchFailure
+
+
+def default_max_in_flight() -> int:
+    import ray
+    # enough tasks to keep every cpu of the cluster busy, without queueing the whole grid
+    return 2 * max(int(ray.available_resources().get('CPU', 1)), 1)
+
+
+def stream_ray(remote_func,
+               tasks: Iterable[tuple[str, GenericDict]],
+               max_in_flight: int = None,
+               max_retries: int = 0) -> Iterator[tuple[int, str, Any]]:
+    """
+    Run remote_func.remote(**config) for every (experiment_key, config) in tasks and yield
+    (task_index, experiment_key, result) as soon as each task completes. Tasks are consumed lazily, with at most
+    max_in_flight tasks submitted to the cluster at any time. A failed task is submitted again up to max_retries
+    times, then it is yielded as a LaunchFailure without stopping the others.
+    """
+    import ray
+
+    max_in_flight = default_max_in_flight() if max_in_flight is None else max_in_flight
+    in_flight = {}
+    tasks = enumerate(tasks)
+    exhausted = False
+    while in_flight or not exhausted:
+        while not exhausted and len(in_flight) < max_in_flight:
+            try:
+                index, (key, config) = next(tasks)
+            except StopIteration:
+                exhausted = True
+                break
+            in_flight[remote_func.remote(**config)] = (index, key, config, 0)
+
+        if not in_flight:
+            break
+
+        done, _ = ray.wait(list(in_flight), num_returns=1)
+        for ref in done:
+            index, key, config, attempt = in_flight.pop(ref)
+            try:
+                result = ray.get(ref)
+            except Exception as e:
+                if attempt < max_retries:
+                    in_flight[remote_func.remote(**config)] = (index, key, config, attempt + 1)
+                    continue
+                result = LaunchFailure(key, e, traceback.format_exc())
+            yield index, key, result
@@ -0,0 +1,232 @@
+import pickle
+import sqlite3
+import time
+from collections.abc import Mapping
+from numbers import Integral, Real
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+from jimmy.pool import LaunchFailure
+
+RESULTS_NAME = 'jimmy_results.sqlite'
+
+_aggregates = {'mean': 'AVG', 'min': 'MIN', 'max': 'MAX', 'sum': 'SUM', 'count': 'COUNT'}
+
+
+def _encode(value: Any) -> Any:
+    # scalars are stored as sqlite values, so they can be filtered and aggregated, anything else is pickled
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, Integral) and -2 ** 63 <= value < 2 ** 63:
+        return int(value)
+    if isinstance(value, Real):
+        return float(value)
+    return pickle.dumps(value)
+
+
+def _decode(value: Any) -> Any:
+    return pickle.loads(value) if isinstance(value, bytes) else value
+
+
+def flatten_result(result: Any, prefix: str = '') -> dict[str, Any]:
+    """ Items of a (nested) map result by slash separated key, any other result is named "result" """
+    if not isinstance(result, Mapping):
+        return {prefix.rstrip('/') or 'result': result}
+
+    items = {}
+    for key, value in result.items():
+        if isinstance(value, Mapping) and value:
+            items.update(flatten_result(value, prefix=f'{prefix}{key}/'))
+        else:
+            items[f'{prefix}{key}'] = value
+    return items
+
+
+class ResultStore:
+    """
+    Results of a sweep in a SQLite database, one row per experiment key with a column for every grid axis
+    (ReprByKey axes are stored by label) and for every result item. A row is committed as soon as each point
+    completes, and the store can be filtered and aggregated by axis values without loading the whole sweep.
+    Scalar values are stored as sqlite values, anything else (e.g. arrays) is pickled.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS columns '
+                                     '(name TEXT PRIMARY KEY, kind TEXT NOT NULL, sql_name TEXT NOT NULL)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS results (experiment_key TEXT PRIMARY KEY, '
+                                     'status TEXT NOT NULL, error TEXT, time REAL)')
+        # name: (kind, sql column), the sql columns are generated, so any key can be used as a name
+        self._columns = {name: (kind, sql_name) for name, kind, sql_name
+                         in self._connection.execute('SELECT name, kind, sql_name FROM columns ORDER BY rowid')}
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    @property
+    def axes(self) -> list[str]:
+        return [name for name, (kind, _) in self._columns.items() if kind == 'axis']
+
+    @property
+    def metrics(self) -> list[str]:
+        return [name for name, (kind, _) in self._columns.items() if kind == 'result']
+
+    def _column(self, name: str, kind: str) -> str:
+        if name in self._columns:
+            column_kind, sql_name = self._columns[name]
+            if column_kind == kind:
+                return sql_name
+            # a result item named as an axis
+            return self._column(f'result/{name}', kind)
+
+        sql_name = f'c{len(self._columns)}'
+        with self._connection:
+            self._connection.execute(f'ALTER TABLE results ADD COLUMN {sql_name}')
+            self._connection.execute('INSERT INTO columns VALUES (?, ?, ?)', (name, kind, sql_name))
+        self._columns[name] = (kind, sql_name)
+        return sql_name
+
+    def record(self, experiment_key: str, axes: Mapping[str, Any], result: Any) -> None:
+        """ Store the result of a grid point, replacing any previous result of the same experiment key """
+        row = {'experiment_key': experiment_key, 'status': 'success', 'error': None, 'time': time.time()}
+        if isinstance(result, LaunchFailure):
+            row.update(status='failed', error=repr(result.exception))
+            items = {}
+        else:
+            items = flatten_result(result)
+
+        for name, value in axes.items():
+            row[self._column(name, 'axis')] = _encode(value)
+        for name, value in items.items():
+            row[self._column(name, 'result')] = _encode(value)
+
+        with self._connection:
+            self._connection.execute(f'INSERT OR REPLACE INTO results ({", ".join(row)}) '
+                                     f'VALUES ({", ".join("?" * len(row))})', tuple(row.values()))
+
+    def _sql_name(self, name: str) -> str:
+        if name in ('experiment_key', 'status', 'error', 'time'):
+            return name
+        if name not in self._columns:
+            raise KeyError(f'{name} is not a column of {self.path}, available: {list(self._columns)}')
+        return self._columns[name][1]
+
+    def _where(self, where: Mapping[str, Any] | None, status: str | None) -> tuple[str, list]:
+        clauses, params = [], []
+        if status is not None:
+            clauses.append('status = ?')
+            params.append(status)
+
+        for name, value in ({} if where is None else where).items():
+            sql_name = self._sql_name(name)
+            if value is None:
+                clauses.append(f'{sql_name} IS NULL')
+            elif isinstance(value, slice):
+                if value.start is not None:
+                    clauses.append(f'{sql_name} >= ?')
+                    params.append(_encode(value.start))
+                if value.stop is not None:
+                    clauses.append(f'{sql_name} < ?')
+                    params.append(_encode(value.stop))
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                clauses.append(f'{sql_name} IN ({", ".join("?" * len(value))})')
+                params.extend(_encode(item) for item in value)
+            else:
+                clauses.append(f'{sql_name} = ?')
+                params.append(_encode(value))
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def select(self,
+               columns: Sequence[str] = None,
+               where: Mapping[str, Any] = None,
+               status: str | None = 'success',
+               order_by: str = None) -> Iterator[dict[str, Any]]:
+        """
+        Rows of the store as dicts, streamed from the database. where maps column names to a value, a list of
+        values or a slice(start, stop) range, e.g. `store.select(['accuracy'], where={'lr': slice(None, 0.1)})`.
+        Only the successful points are selected, unless status is None.
+        """
+        columns = ['experiment_key', *self._columns] if columns is None else list(columns)
+        where_sql, params = self._where(where, status)
+        order_sql = '' if order_by is None else f' ORDER BY {self._sql_name(order_by)}'
+        query = f'SELECT {", ".join(self._sql_name(name) for name in columns)} FROM results{where_sql}{order_sql}'
+        for row in self._connection.execute(query, params):
+            yield {name: _decode(value) for name, value in zip(columns, row)}
+
+    def columns(self,
+                columns: Sequence[str] = None,
+                where: Mapping[str, Any] = None,
+                status: str | None = 'success') -> dict[str, list]:
+        """ Selected rows as a list of values per column """
+        columns = ['experiment_key', *self._columns] if columns is None else list(columns)
+        values = {name: [] for name in columns}
+        for row in self.select(columns, where=where, status=status):
+            for name, value in row.items():
+                values[name].append(value)
+        return values
+
+    def aggregate(self,
+                  value: str,
+                  by: Sequence[str] = (),
+                  how: str = 'mean',
+                  where: Mapping[str, Any] = None) -> Any:
+        """
+        Aggregate (mean, min, max, sum or count) of a scalar column over the successful points, computed by the
+        database. Grouped by the values of the columns in by, e.g. `store.aggregate('accuracy', by=['lr'])`
+        returns {lr: mean accuracy}, or {(lr, batch_size): ...} when grouped by more columns.
+        """
+        if how not in _aggregates:
+            raise ValueError(f'aggregate must be one of {list(_aggregates)}, got {how}.')
+
+        by = [by] if isinstance(by, str) else list(by)
+        where_sql, params = self._where(where, 'success')
+        group_columns = [self._sql_name(name) for name in by]
+        query = f'SELECT {", ".join([*group_columns, f"{_aggregates[how]}({self._sql_name(value)})"])} ' \
+                f'FROM results{where_sql}'
+        if not by:
+            return self._connection.execute(query, params).fetchone()[0]
+
+        query += f' GROUP BY {", ".join(group_columns)} ORDER BY {", ".join(group_columns)}'
+        groups = {}
+        for *group, result in self._connection.execute(query, params):
+            group = tuple(_decode(item) for item in group)
+            groups[group[0] if len(by) == 1 else group] = result
+        return groups
+
+    def best(self, value: str, mode: str = 'max', where: Mapping[str, Any] = None) -> dict[str, Any] | None:
+        """ Row of the successful point with the highest (or lowest) value """
+        if mode not in ('max', 'min'):
+            raise ValueError(f'mode must be either "max" or "min", got {mode}.')
+
+        where_sql, params = self._where(where, 'success')
+        sql_name = self._sql_name(value)
+        where_sql += f'{" AND" if where_sql else " WHERE"} {sql_name} IS NOT NULL'
+        columns = ['experiment_key', *self._columns]
+        row = self._connection.execute(f'SELECT {", ".join(self._sql_name(name) for name in columns)} '
+                                       f'FROM results{where_sql} ORDER BY {sql_name} '
+                                       f'{"DESC" if mode == "max" else "ASC"} LIMIT 1', params).fetchone()
+        return None if row is None else {name: _decode(item) for name, item in zip(columns, row)}
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def __contains__(self, experiment_key: str) -> bool:
+        return self._connection.execute('SELECT 1 FROM results WHERE experiment_key = ?',
+                                        (experiment_key,)).fetchone() is not None
+
+    def __getitem__(self, experiment_key: str) -> dict[str, Any]:
+        columns = ['experiment_key', 'status', 'error', *self._columns]
+        rows = list(self.select(columns, where={'experiment_key': experiment_key}, status=None))
+        if not rows:
+            raise KeyError(experiment_key)
+        return rows[0]
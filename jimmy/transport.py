@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from jimmy.jimmy_map import GenericDict, copy_on_write, replace_key_path
+from jimmy.overrides import OverridePlan
+
+# sweep tasks deserialized by this (ray worker) process, by object id
+_sweep_tasks = {}
+_max_sweep_tasks = 4
+
+
+@dataclass
+class ConfigDelta:
+    """
+    What a grid point does not share with the rest of the sweep: its experiment key, the values of the grid axes
+    and its deferred values (e.g. !unique-path) resolved by the launcher, by key path.
+    """
+    experiment_key: str
+    values: tuple
+    resolved: tuple[tuple[tuple, Any], ...] = ()
+
+
+class SweepTask:
+    """
+    func together with the base config and the grid overrides of a sweep. It is shipped once to every worker
+    (inherited on fork, pickled once per process otherwise, or put once in the ray object store), then every task
+    only sends its ConfigDelta: the worker rebuilds the grid point config from the base and calls func with it.
+    """
+    def __init__(self, func: Callable, base: GenericDict, plan: OverridePlan):
+        self.func = func
+        self.base = base
+        self.plan = plan
+
+    def build(self, delta: ConfigDelta) -> GenericDict:
+        # only the paths to the overridden and resolved values are copied, the base is shared by all the tasks of
+        # the worker, so func gets a copy on write config that can be modified without changing the base
+        config = self.plan.apply(self.base, delta.values)
+        for key_path, value in delta.resolved:
+            config = replace_key_path(config, key_path, value)
+        return copy_on_write(config)
+
+    def __call__(self, delta: ConfigDelta) -> Any:
+        return self.func(**self.build(delta))
+
+
+def run_sweep_task(task_refs: list, delta: ConfigDelta) -> Any:
+    """
+    Ray task of a sweep. The SweepTask is given as [object ref], so that ray does not fetch it for every task, and
+    it is deserialized once per worker process.
+    """
+    import ray
+
+    task_id = task_refs[0].hex()
+    task = _sweep_tasks.get(task_id)
+    if task is None:
+        if len(_sweep_tasks) >= _max_sweep_tasks:
+            _sweep_tasks.clear()
+        task = _sweep_tasks[task_id] = ray.get(task_refs[0])
+    return task(delta)
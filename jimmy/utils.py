@@ -1,6 +1,19 @@
 import argparse
+import os
+from dataclasses import dataclass
 from pathlib import Path
 
+SHARD_ENV = 'JIMMY_SHARD'
+
+
+@dataclass
+class JimmyArgs:
+    launcher: str = 'simple'
+    shard: str = None
+    shard_mode: str = 'round-robin'
+    resume: bool = False
+    profile: bool | str = False
+
 
 def _try_cascade(value):
     try:
@@ -30,17 +43,73 @@ def _parse_unknown_args(parser, unknown):
     return args
 
 
+def _shard_value(value: str) -> int:
+    # each part of the shard spec can be given as the name of an environment variable, e.g. SLURM_ARRAY_TASK_ID
+    value = value.strip().lstrip('$')
+    if not value.isdigit():
+        if value not in os.environ:
+            raise ValueError(f'shard value {value} is neither an integer nor an environment variable.')
+        value = os.environ[value]
+    return int(value)
+
+
+def parse_shard(shard: str | tuple[int, int]) -> tuple[int, int]:
+    if isinstance(shard, str):
+        if shard.count('/') != 1:
+            raise ValueError(f'shard must be given as "index/count", got {shard}.')
+        shard = tuple(_shard_value(value) for value in shard.split('/'))
+
+    index, count = shard
+    if not 0 <= index < count:
+        raise ValueError(f'shard index must be between 0 and {count - 1}, got {index}.')
+    return index, count
+
+
 def config_parser():
+    """ Config path, cli overrides and launcher name given in the command line """
+    config, args_dict, jimmy_args = jimmy_args_parser()
+    return config, args_dict, jimmy_args.launcher
+
+
+def jimmy_args_parser():
+    """ Same as config_parser, with all the jimmy arguments (launcher, shard, resume, ...) as JimmyArgs """
     parser = argparse.ArgumentParser(description='Jimmy Parser')
     parser.add_argument('--config', '-c', type=Path, help='Path to the YAML config file', required=True)
     parser.add_argument('--launcher', '-l',
                         type=str,
                         default='simple',
+                        choices=['simple', 'grid', 'ray', 'pool', 'random', 'halving'],
                         help='Launcher type to use',
                         required=False)
+    parser.add_argument('--shard',
+                        type=str,
+                        default=os.environ.get(SHARD_ENV),
+                        help='Run only the grid shard "index/count" (0-based), each part can be an environment '
+                             f'variable name, e.g. SLURM_ARRAY_TASK_ID/16. Defaults to ${SHARD_ENV}',
+                        required=False)
+    parser.add_argument('--shard-mode',
+                        type=str,
+                        default='round-robin',
+                        choices=['round-robin', 'block'],
+                        help='Assign the grid points to the shards round-robin or in contiguous blocks',
+                        required=False)
+    parser.add_argument('--resume',
+                        action='store_true',
+                        help='Skip the grid points already completed according to the run ledger')
+    parser.add_argument('--jimmy-profile',
+                        nargs='?',
+                        const=True,
+                        default=False,
+                        help='Print a timing report of the config loading at exit, if a path is given the timings '
+                             'are exported there as well as a Chrome trace',
+                        required=False)
     _, unknown = parser.parse_known_args()
     args_dict = _parse_unknown_args(parser, unknown).__dict__
     config = args_dict.pop('config')
-    launcher = args_dict.pop('launcher')
+    jimmy_args = JimmyArgs(launcher=args_dict.pop('launcher'),
+                           shard=args_dict.pop('shard'),
+                           shard_mode=args_dict.pop('shard_mode'),
+                           resume=args_dict.pop('resume'),
+                           profile=args_dict.pop('jimmy_profile'))
     args_dict = _primitive_type_inference(args_dict)
-    return config, args_dict, launcher
+    return config, args_dict, jimmy_args
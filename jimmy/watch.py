@@ -0,0 +1,339 @@
+import copy
+import os
+import threading
+import warnings
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from jimmy.cache import path_digest
+from jimmy.constructors.path_constructors import GlobPaths
+from jimmy.include import IncludeResolver, _absolute
+from jimmy.jimmy_map import GenericDict, replace_key_path
+from jimmy.loader import JimmyLoader
+from jimmy.overrides import OverridePlan
+
+
+@dataclass
+class ConfigDiff:
+    """ Slash separated key paths changed by a reload, and the files that were parsed again """
+    files: list[Path]
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    modified: list[str] = field(default_factory=list)
+
+    @property
+    def paths(self) -> list[str]:
+        return sorted({*self.added, *self.removed, *self.modified})
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+def _key_path(prefix: tuple) -> str:
+    return '/'.join(str(key) for key in prefix)
+
+
+def diff_configs(old: Any, new: Any, diff: ConfigDiff, prefix: tuple = ()) -> ConfigDiff:
+    """ Add the key paths that differ between old and new to diff, shared subtrees are skipped """
+    if old is new:
+        return diff
+
+    if isinstance(old, Mapping) and isinstance(new, Mapping):
+        for key, value in old.items():
+            if key not in new:
+                diff.removed.append(_key_path(prefix + (key,)))
+            else:
+                diff_configs(value, new[key], diff, prefix + (key,))
+        diff.added += [_key_path(prefix + (key,)) for key in new if key not in old]
+        return diff
+
+    try:
+        equal = bool(type(old) is type(new) and old == new)
+    except Exception:
+        # e.g. arrays, compared element-wise
+        equal = False
+    if not equal:
+        diff.modified.append(_key_path(prefix))
+    return diff
+
+
+def _get(tree: Any, key_path: tuple) -> Any:
+    for key in key_path:
+        tree = tree[key]
+    return tree
+
+
+class TrackingResolver(IncludeResolver):
+    """
+    IncludeResolver recording, for every parsed file, the key paths at which its includes and its !glob values are
+    placed. The previously parsed files can be given, so that only the changed ones are parsed again.
+    """
+    def __init__(self, loader_cls: type, parsed: dict = None, **kwargs):
+        super().__init__(loader_cls, **kwargs)
+        self._parsed.update({} if parsed is None else parsed)
+        self._returned = {}
+        # parsed path: [(included path, key path or None if it can not be located)]
+        self.includes = {}
+        # parsed path: [(glob root, key path)]
+        self.globs = {}
+
+    def include(self, path: Path, chain: tuple[Path, ...] = ()) -> Any:
+        config = super().include(path, chain)
+        including_path = chain[-1] if chain else None
+        with self._lock:
+            self._returned.setdefault(including_path, []).append((self.resolve_path(path, including_path), config))
+        return config
+
+    def _parse(self, path: Path, chain: tuple[Path, ...]) -> Any:
+        config = super()._parse(path, chain)
+        with self._lock:
+            returned = self._returned.pop(path, [])
+
+        # only maps and lists can be located by identity, the other includes are updated with the including file
+        included = {id(value): (index, value) for index, (_, value) in enumerate(returned)
+                    if isinstance(value, (Mapping, list))}
+        locations, globs = [None] * len(returned), []
+
+        def walk(value, key_path):
+            if id(value) in included and included[id(value)][1] is value:
+                locations[included[id(value)][0]] = key_path or None
+            elif isinstance(value, GlobPaths):
+                globs.append((_absolute(value.root), key_path))
+            elif isinstance(value, Mapping):
+                for key, item in value.items():
+                    walk(item, key_path + (key,))
+            elif isinstance(value, list):
+                for index, item in enumerate(value):
+                    walk(item, key_path + (index,))
+
+        walk(config, ())
+        with self._lock:
+            self.includes[path] = [(included_path, location)
+                                   for (included_path, _), location in zip(returned, locations)]
+            self.globs[path] = globs
+        return config
+
+
+def _stat(path: Path) -> tuple | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ConfigWatcher:
+    """
+    Config kept up to date with the files it is loaded from: the root file, its !load includes and the directories
+    of its !glob values. reload() parses again only the changed files and splices them into the config tree, the
+    unchanged subtrees are kept as they are. Every reload is notified to the subscribers as a ConfigDiff of the
+    changed key paths. An included file that can not be located in the including one (e.g. an include used as the
+    argument of another tag) is updated by parsing the including file again.
+    """
+    def __init__(self, path: Path, cli_kwargs: dict = None, constructors: dict = None):
+        self.path = _absolute(path)
+        self.constructors = constructors
+        cli_kwargs = {} if cli_kwargs is None else cli_kwargs
+        self._plan, self._values = OverridePlan(cli_kwargs.keys()), list(cli_kwargs.values())
+        self._subscribers = []
+        self._lock = threading.RLock()
+        self._thread, self._stop = None, threading.Event()
+
+        self._fragments, self._includes, self._globs, self._stats = {}, {}, {}, {}
+        self._parse({self.path})
+
+    @property
+    def config(self) -> GenericDict:
+        return self._fragments[self.path]
+
+    @property
+    def files(self) -> list[Path]:
+        return list(self._fragments)
+
+    def subscribe(self, callback: Callable[[ConfigDiff], None]) -> Callable[[ConfigDiff], None]:
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable[[ConfigDiff], None]) -> None:
+        self._subscribers.remove(callback)
+
+    def _parse(self, paths: set[Path]) -> TrackingResolver:
+        # the unchanged files are reused as they are, the changed ones and their new includes are parsed
+        parsed = {path: config for path, config in self._fragments.items() if path not in paths}
+        with TrackingResolver(JimmyLoader, parsed=parsed, constructors=self.constructors) as resolver:
+            for path in sorted(paths):
+                resolver.parse(path)
+
+        for path in resolver.includes:
+            self._fragments[path] = resolver._parsed[path]
+            self._includes[path] = resolver.includes[path]
+            self._globs[path] = resolver.globs[path]
+            self._stats[path] = (_stat(path), path_digest(path))
+            for root, _ in resolver.globs[path]:
+                self._stats[root] = (_stat(root), None)
+
+        if self.path in paths:
+            # the parsed trees are never modified, they can be shared with a config in use (e.g. by a launcher)
+            self._fragments[self.path] = self._plan.apply(self.config, self._values)
+        return resolver
+
+    def _parents(self, path: Path) -> list[tuple[Path, tuple | None]]:
+        return [(parent, location) for parent, includes in self._includes.items()
+                for included_path, location in includes if included_path == path]
+
+    def _locations(self, path: Path, within: Path, exclude: set[Path] = frozenset()) -> list[tuple]:
+        # key paths of the content of path in the tree of within, not included through the exclude files
+        if path == within:
+            return [()]
+        return [parent_location + location for parent, location in self._parents(path) if parent not in exclude
+                for parent_location in self._locations(parent, within, exclude)]
+
+    def _ancestors(self, path: Path) -> set[Path]:
+        ancestors = set()
+        for parent, _ in self._parents(path):
+            if parent not in ancestors:
+                ancestors |= {parent} | self._ancestors(parent)
+        return ancestors
+
+    def _descendants(self, path: Path) -> set[Path]:
+        descendants = set()
+        for included_path, _ in self._includes.get(path, []):
+            if included_path not in descendants:
+                descendants |= {included_path} | self._descendants(included_path)
+        return descendants
+
+    def _changed_files(self) -> tuple[set[Path], set[Path]]:
+        changed_files, changed_dirs = set(), set()
+        for path, (stat, digest) in self._stats.items():
+            new_stat = _stat(path)
+            if new_stat == stat:
+                continue
+            if digest is None:
+                changed_dirs.add(path)
+                self._stats[path] = (new_stat, None)
+                continue
+            try:
+                # a file touched but not modified is not parsed again
+                if path_digest(path) == digest:
+                    self._stats[path] = (new_stat, digest)
+                    continue
+            except OSError:
+                pass
+            changed_files.add(path)
+        return changed_files, changed_dirs
+
+    def reload(self) -> ConfigDiff | None:
+        """ Parse again the changed files and splice them into the config, returns None if nothing changed """
+        with self._lock:
+            changed_files, changed_dirs = self._changed_files()
+            if not changed_files and not changed_dirs:
+                return None
+
+            # includes that can not be spliced are updated by parsing again the including file
+            paths, stack = set(), list(changed_files)
+            while stack:
+                path = stack.pop()
+                if path in paths:
+                    continue
+                paths.add(path)
+                stack += [parent for parent, location in self._parents(path) if location is None]
+            # the files between a changed file and a file parsed again are parsed again too, so that the latter
+            # includes the up to date files
+            intermediate = {path for path in self._fragments
+                            if path not in paths and self._ancestors(path) & paths and self._descendants(path) & paths}
+            while intermediate:
+                paths |= intermediate
+                intermediate = {path for path in self._fragments if path not in paths
+                                and self._ancestors(path) & paths and self._descendants(path) & paths}
+
+            old_config = self.config
+            # locations of the parsed files in the files not parsed again (the root tree included), the files
+            # included by a parsed file are updated with it
+            splices = {path: [(ancestor, location) for ancestor in self._ancestors(path) - paths
+                              for location in self._locations(path, ancestor, exclude=paths)]
+                       for path in paths if path != self.path}
+            old_values = {path: [_get(old_config, location) for ancestor, location in splices[path]
+                                 if ancestor == self.path] for path in splices}
+            try:
+                self._parse(paths)
+            except Exception:
+                # the config is left as it is, the files are parsed again as soon as they are modified
+                for path in changed_files:
+                    self._stats[path] = (_stat(path), self._stats[path][1])
+                raise
+
+            diff = ConfigDiff(files=sorted(paths))
+            if self.path in paths:
+                diff_configs(old_config, self.config, diff)
+            else:
+                for path, path_splices in splices.items():
+                    for ancestor, location in path_splices:
+                        # every tree holds its own copy of the included file, as when loaded, and the trees are
+                        # path copied so that the previous configs are left as they are
+                        self._fragments[ancestor] = replace_key_path(self._fragments[ancestor], location,
+                                                                     copy.deepcopy(self._fragments[path]))
+                self._fragments[self.path] = self._plan.apply(self.config, self._values)
+                for path, path_splices in splices.items():
+                    root_locations = [location for ancestor, location in path_splices if ancestor == self.path]
+                    for old_value, location in zip(old_values[path], root_locations):
+                        diff_configs(old_value, _get(self.config, location), diff, location)
+
+            # the values of the globs are listed when accessed, they are reported as modified
+            for path, globs in self._globs.items():
+                for root, glob_location in globs:
+                    if root in changed_dirs:
+                        diff.modified += [_key_path(location + glob_location)
+                                          for location in self._locations(path, self.path)]
+            diff.modified = sorted(set(diff.modified))
+            self._prune()
+
+        for callback in list(self._subscribers):
+            callback(diff)
+        return diff
+
+    def _prune(self) -> None:
+        # files no longer included are not watched anymore
+        reachable, stack = set(), [self.path]
+        while stack:
+            path = stack.pop()
+            if path not in reachable:
+                reachable.add(path)
+                stack += [included_path for included_path, _ in self._includes.get(path, [])]
+
+        for path in set(self._fragments) - reachable:
+            for mapping in (self._fragments, self._includes, self._globs, self._stats):
+                mapping.pop(path, None)
+        glob_roots = {root for globs in self._globs.values() for root, _ in globs}
+        for path in [path for path, (_, digest) in self._stats.items() if digest is None and path not in glob_roots]:
+            self._stats.pop(path)
+
+    def watch(self, interval: float = 1.) -> 'ConfigWatcher':
+        """ Poll the files every interval seconds in a background thread, until stop() """
+        if self._thread is not None:
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, args=(interval,), name='jimmy-watch', daemon=True)
+        self._thread.start()
+        return self
+
+    def _poll(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.reload()
+            except Exception as e:
+                warnings.warn(f'config reload failed: {e}')
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'ConfigWatcher':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
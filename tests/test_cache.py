@@ -0,0 +1,57 @@
+from pathlib import Path
+
+from jimmy.jimmy import JimmyLauncher, jimmy_load
+from jimmy.constructors.path_constructors import UniquePath
+
+
+def _write_configs(tmp_path):
+    (tmp_path / 'template.yaml').write_text('a: 1\nb: {c: 2}\n')
+    (tmp_path / 'config.yaml').write_text(f"b: {{c: 3}}\n"
+                                          f"logs: !unique-path '{tmp_path / 'logs'}'\n"
+                                          f"jimmy:\n"
+                                          f"  template: !load '{tmp_path / 'template.yaml'}'\n")
+    return tmp_path / 'config.yaml'
+
+
+class TestParseCache:
+    def test_cache_hit(self, tmp_path):
+        config_path = _write_configs(tmp_path)
+        cache_dir = tmp_path / 'cache'
+        config, _ = jimmy_load(config_path, cache_dir=cache_dir)
+        assert len(list(cache_dir.glob('*.pkl'))) == 1
+
+        cached_config, _ = jimmy_load(config_path, cache_dir=cache_dir)
+        assert cached_config.to_dict().keys() == config.to_dict().keys()
+        assert cached_config.b.c == 3
+        assert isinstance(cached_config.logs, UniquePath)
+
+    def test_invalidation(self, tmp_path):
+        config_path = _write_configs(tmp_path)
+        cache_dir = tmp_path / 'cache'
+        jimmy_load(config_path, cache_dir=cache_dir)
+
+        (tmp_path / 'template.yaml').write_text('a: 5\nb: {c: 2}\n')
+        config, _ = jimmy_load(config_path, cache_dir=cache_dir)
+        assert config.a == 5
+
+        config, _ = jimmy_load(config_path, cli_kwargs={'a': 7}, cache_dir=cache_dir)
+        assert config.a == 7
+
+    def test_working_directory(self, tmp_path, monkeypatch):
+        (tmp_path / 'config.yaml').write_text("out: !absolute-path out\n")
+        results = []
+        for cwd in ['a', 'b']:
+            (tmp_path / cwd).mkdir()
+            monkeypatch.chdir(tmp_path / cwd)
+            config, _ = jimmy_load(tmp_path / 'config.yaml', cache_dir=tmp_path / 'cache')
+            results.append(Path(config.out))
+        assert results == [tmp_path / 'a' / 'out', tmp_path / 'b' / 'out']
+
+    def test_deferred_values(self, tmp_path):
+        config_path = _write_configs(tmp_path)
+        JimmyLauncher(config_path, cache_dir=tmp_path / 'cache')
+        assert len(list((tmp_path / 'cache').glob('*.pkl'))) == 1
+
+        # the deferred values of the cached config are resolved as when parsed
+        launcher = JimmyLauncher(config_path, cache_dir=tmp_path / 'cache')
+        assert launcher.config.logs == tmp_path / 'logs'
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+
+from jimmy.dump import DumpManifest, DumpWriter
+from jimmy.jimmy import JimmyLauncher
+from jimmy.jimmy_map import JimmyMap
+
+
+def _write_config(tmp_path, jimmy_config=''):
+    (tmp_path / 'config.yaml').write_text(f"x: 0\n"
+                                          f"y:\n"
+                                          f"  z: !path 'data.txt'\n"
+                                          f"logs: !unique-path '{tmp_path / 'results'}'\n"
+                                          f"jimmy:\n"
+                                          f"  dump_config: logs\n"
+                                          f"  grid_launcher:\n"
+                                          f"    x: [1, 2, 3]\n"
+                                          f"{jimmy_config}")
+    return tmp_path / 'config.yaml'
+
+
+class TestDumpConfig:
+    def test_config_files(self, tmp_path):
+        JimmyLauncher(_write_config(tmp_path)).grid_launcher(lambda x, y, logs: x)
+        for x in [1, 2, 3]:
+            assert (tmp_path / 'results' / f'hparam_x:{x}' / 'config.yaml').read_text().startswith('logs: ')
+        assert not (tmp_path / 'results' / 'jimmy_manifest.jsonl').exists()
+
+    @pytest.mark.parametrize('manifest_format', ['jsonl', 'yaml'])
+    def test_manifest(self, tmp_path, manifest_format):
+        config_path = _write_config(tmp_path, f"  dump_manifest: {manifest_format}\n"
+                                              f"  dump_files: false\n")
+        JimmyLauncher(config_path).grid_launcher(lambda x, y, logs: x)
+        assert not (tmp_path / 'results' / 'hparam_x:1' / 'config.yaml').exists()
+
+        manifest = DumpManifest(tmp_path / 'results' / f'jimmy_manifest.{manifest_format}')
+        assert list(manifest.keys()) == ['hparam_x:1', 'hparam_x:2', 'hparam_x:3']
+        config = manifest['hparam_x:2']
+        assert isinstance(config, JimmyMap)
+        assert config.x == 2 and config.y.z == str(Path('data.txt').absolute())
+
+        # the index is rebuilt from the manifest if it is missing
+        (tmp_path / 'results' / 'jimmy_manifest.index.json').unlink()
+        assert DumpManifest(manifest.path).index() == manifest.index()
+
+    def test_writer_error(self, tmp_path):
+        (tmp_path / 'file').write_text('')
+        writer = DumpWriter()
+        writer.submit(JimmyMap(x=1), tmp_path / 'file' / 'nested')
+        with pytest.raises(OSError):
+            writer.close()
+
+    def test_index_written_on_close(self, tmp_path):
+        writer = DumpWriter(manifest_dir=tmp_path, manifest_format='jsonl', write_files=False, batch_size=1)
+        for x in range(3):
+            writer.submit(JimmyMap(x=x), None, experiment_key=f'x:{x}')
+        writer.flush()
+        # the manifest is appended batch by batch, the index is only written once
+        assert not (tmp_path / 'jimmy_manifest.index.json').exists()
+        assert DumpManifest(tmp_path / 'jimmy_manifest.jsonl')['x:1'].x == 1
+
+        writer.close()
+        assert list(DumpManifest(tmp_path / 'jimmy_manifest.jsonl')._load_index()) == ['x:0', 'x:1', 'x:2']
+        assert (tmp_path / 'jimmy_manifest.index.json').exists()
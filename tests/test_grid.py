@@ -0,0 +1,111 @@
+import pytest
+
+from jimmy.grid import JimmyGrid
+from jimmy.jimmy import JimmyLauncher, compute_grid_configs
+from jimmy.jimmy_map import JimmyMap
+from jimmy.utils import config_parser, jimmy_args_parser
+
+
+def _base_config():
+    return JimmyMap(data=JimmyMap(table=list(range(100))),
+                    model=JimmyMap(size=1, layers=JimmyMap(n=2)),
+                    lr=0.1)
+
+
+class TestGridConfigs:
+    def test_grid_expansion(self):
+        config = _base_config()
+        grid = JimmyMap(**{'lr': [0.1, 0.01], 'model/size': JimmyMap(small=1, large=10)})
+        grid_configs = compute_grid_configs(config, grid)
+        assert list(grid_configs) == ['hparam_lr:0.1_size:small', 'hparam_lr:0.1_size:large',
+                                      'hparam_lr:0.01_size:small', 'hparam_lr:0.01_size:large']
+        point = grid_configs['hparam_lr:0.01_size:large']
+        assert point.lr == 0.01 and point.model.size == 10 and point.model.layers.n == 2
+        assert config.lr == 0.1 and config.model.size == 1
+
+    def test_copy_on_write(self):
+        config = _base_config()
+        points = list(compute_grid_configs(config, JimmyMap(**{'model/size': [1, 2, 3]})).values())
+        # the untouched subtrees are shared until accessed
+        assert all(vars(point)['data'] is config.data for point in points)
+
+        points[0].data.table.append(99)
+        points[0].model.layers.n = 5
+        points[0]['lr'] = 1.
+        assert points[0].data.table[-1] == 99 and points[0].model.layers.n == 5 and points[0].lr == 1.
+        for point in [*points[1:], config]:
+            assert point.data.table == list(range(100))
+            assert point.model.layers.n == 2 and point.lr == 0.1
+        assert [point.model.size for point in points] == [1, 2, 3] and config.model.size == 1
+
+    def test_launched_configs_are_private(self, tmp_path):
+        (tmp_path / 'config.yaml').write_text("a: {b: [1, 2]}\n"
+                                              "x: 0\n"
+                                              "jimmy:\n"
+                                              "  grid_launcher:\n"
+                                              "    x: [1, 2, 3]\n")
+
+        def func(a, x):
+            a.b.append(x)
+            return list(a.b)
+
+        launcher = JimmyLauncher(tmp_path / 'config.yaml')
+        assert launcher.grid_launcher(func) == [[1, 2, 1], [1, 2, 2], [1, 2, 3]]
+        assert launcher.config.a.b == [1, 2]
+
+
+class TestJimmyGrid:
+    def test_random_access(self):
+        grid = JimmyGrid(_base_config(), JimmyMap(**{'lr': [0.1, 0.01, 0.001],
+                                                     'model/size': JimmyMap(small=1, large=10),
+                                                     'model/layers/n': range(4)}))
+        assert len(grid) == 24 and grid.shape == (3, 2, 4)
+
+        points = list(grid)
+        assert len({key for key, _ in points}) == 24
+        for index, (key, config) in enumerate(points):
+            assert grid.experiment_key(index) == key
+            index_key, index_config = grid[index]
+            assert index_key == key
+            assert index_config.lr == config.lr and index_config.model.size == config.model.size
+            assert index_config.model.layers.n == config.model.layers.n
+
+        assert grid[-1][0] == 'hparam_lr:0.001_size:large_n:3'
+        with pytest.raises(IndexError):
+            grid[24]
+
+    def test_lazy_iteration(self):
+        grid = JimmyGrid(_base_config(), JimmyMap(**{'lr': range(10 ** 6), 'model/size': range(10 ** 6)}))
+        assert len(grid) == 10 ** 12
+        key, config = next(iter(grid))
+        assert key == 'hparam_lr:0_size:0'
+        assert grid[10 ** 12 - 1][1].model.size == 10 ** 6 - 1
+
+    @pytest.mark.parametrize('mode', ['round-robin', 'block'])
+    def test_shards(self, mode):
+        grid = JimmyGrid(_base_config(), JimmyMap(**{'lr': [0.1, 0.01, 0.001], 'model/size': range(5)}))
+        shards = [grid.shard(index, 4, mode=mode) for index in range(4)]
+        assert sorted(len(shard) for shard in shards) == [3, 4, 4, 4]
+
+        sharded_keys = [key for shard in shards for key, _ in shard]
+        assert sorted(sharded_keys) == sorted(key for key, _ in grid)
+        for shard in shards:
+            for index, (key, config) in enumerate(shard):
+                assert shard[index][0] == key
+                assert key == f'hparam_lr:{config.lr}_size:{config.model.size}'
+
+    def test_launcher_shard(self, tmp_path, monkeypatch):
+        (tmp_path / 'config.yaml').write_text("x: 0\njimmy:\n  grid_launcher:\n    x: [0, 1, 2, 3, 4]\n")
+        monkeypatch.setenv('TASK_ID', '1')
+        launcher = JimmyLauncher(tmp_path / 'config.yaml', shard='TASK_ID/2')
+        assert launcher.grid_launcher(lambda x: x) == [1, 3]
+        launcher = JimmyLauncher(tmp_path / 'config.yaml', shard=(1, 2), shard_mode='block')
+        assert launcher.grid_launcher(lambda x: x) == [2, 3, 4]
+
+    def test_cli_shard(self, tmp_path, monkeypatch):
+        monkeypatch.setattr('sys.argv', ['main.py', '--config', str(tmp_path / 'config.yaml'), '--launcher', 'grid',
+                                         '--shard', '1/2', '--lr', '0.1'])
+        # config_parser still returns the launcher name, the shard spec is given by jimmy_args_parser
+        assert config_parser() == (tmp_path / 'config.yaml', {'lr': 0.1}, 'grid')
+        _, _, jimmy_args = jimmy_args_parser()
+        assert (jimmy_args.launcher, jimmy_args.shard, jimmy_args.shard_mode) == ('grid', '1/2', 'round-robin')
@@ -1,5 +1,52 @@
+import subprocess
+import sys
+
+import pytest
+import yaml
+
+from jimmy.constructors.registry import LazyConstructor, entry_point_constructors
+from jimmy.loader import JimmyLoader
+
+# cumulative import time budget of `import jimmy`, in seconds
+IMPORT_BUDGET = 0.25
 
 
 class TestImport:
     def test_import(self):
         from jimmy import JimmyLauncher
+
+    def test_import_time(self):
+        # the best of a few runs, to be robust to a busy machine
+        timings = []
+        for _ in range(3):
+            output = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                                     "import sys, jimmy; assert 'numpy' not in sys.modules"],
+                                    capture_output=True, text=True, check=True).stderr
+            jimmy_line = [line for line in output.splitlines() if line.rstrip().endswith('| jimmy')][0]
+            timings.append(int(jimmy_line.split('|')[1]) / 1e6)
+        assert min(timings) < IMPORT_BUDGET
+
+
+class TestConstructorRegistry:
+    def test_lazy_constructor(self):
+        constructor = LazyConstructor('jimmy.constructors.math_constructors:build_range')
+        assert constructor.__module__ == 'jimmy.constructors.math_constructors'
+        assert constructor.__qualname__ == 'build_range'
+        assert yaml.load('x: !range [0, 3, 1]', Loader=JimmyLoader)['x'] == [0, 1, 2]
+
+    def test_entry_points(self, tmp_path, monkeypatch):
+        (tmp_path / 'my_constructors.py').write_text('def shout(loader, node):\n'
+                                                      '    return loader.construct_scalar(node).upper()\n')
+        dist_info = tmp_path / 'my_constructors-0.1.dist-info'
+        dist_info.mkdir()
+        (dist_info / 'METADATA').write_text('Metadata-Version: 2.1\nName: my-constructors\nVersion: 0.1\n')
+        (dist_info / 'entry_points.txt').write_text('[jimmy.constructors]\nshout = my_constructors:shout\n')
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        entry_point_constructors.cache_clear()
+        try:
+            assert yaml.load('x: !shout hello', Loader=JimmyLoader)['x'] == 'HELLO'
+            with pytest.raises(yaml.constructor.ConstructorError):
+                yaml.load('x: !whisper hello', Loader=JimmyLoader)
+        finally:
+            entry_point_constructors.cache_clear()
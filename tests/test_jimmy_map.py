@@ -0,0 +1,81 @@
+import copy
+import pickle
+import pickletools
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from jimmy.jimmy_map import Configurator, JimmyMap, FrozenJimmyMap, freeze_jimmy_map, to_jimmy_dataclass
+
+
+class Config(JimmyMap):
+    x: int = 1
+    y: int = 2
+
+
+class Point(JimmyMap):
+    x: int = 1
+
+
+Point = to_jimmy_dataclass(Point)
+
+
+class TestJimmyMap:
+    def test_plain_map(self):
+        jmap = JimmyMap(x=1, y=2)
+        assert 'x' in jmap and 'z' not in jmap
+        assert len(jmap) == 2
+        assert list(jmap) == ['x', 'y']
+        assert jmap.get('z') is None
+
+        assert jmap.pop('x') == 1
+        assert 'x' not in jmap and not hasattr(jmap, 'x')
+        assert jmap.pop('x', None) is None
+
+    def test_dataclass_map(self):
+        config = to_jimmy_dataclass(Config)(x=3)
+        assert 'x' in config and 'z' not in config
+        assert len(config) == 2
+        assert dict(config) == {'x': 3, 'y': 2}
+        with pytest.raises(KeyError):
+            config['z']
+        with pytest.raises(NotImplementedError):
+            config.pop('x')
+
+    def test_frozen_map(self):
+        frozen = freeze_jimmy_map(JimmyMap(x=1, y=JimmyMap(z=[1, 2])))
+        assert isinstance(frozen, FrozenJimmyMap) and isinstance(frozen, JimmyMap)
+        assert not hasattr(frozen, '__dict__')
+        assert frozen.x == frozen['x'] == 1
+        assert frozen.y.z == [1, 2]
+        assert len(frozen) == 2 and 'y' in frozen
+        assert type(frozen.y) is type(freeze_jimmy_map(JimmyMap(z=0)))
+
+        with pytest.raises(FrozenInstanceError):
+            frozen.x = 2
+        with pytest.raises(NotImplementedError):
+            frozen['x'] = 2
+
+        assert pickle.loads(pickle.dumps(frozen)) == frozen
+        assert copy.deepcopy(frozen).y.z is not frozen.y.z
+
+    def test_frozen_map_fallback(self):
+        frozen = freeze_jimmy_map(JimmyMap(**{'not-an-attribute': 1, 'items': 2}))
+        assert type(frozen) is JimmyMap
+        assert frozen['not-an-attribute'] == 1
+
+    def test_pickle_and_copy(self):
+        configs = [Configurator(name=f'point_{i}', kwargs=JimmyMap(layers=i, width=64)) for i in range(3)]
+        restored = pickle.loads(pickle.dumps(configs))
+        assert [dict(config) for config in restored] == [dict(config) for config in configs]
+        assert type(restored[0]) is Configurator and type(restored[0].kwargs) is JimmyMap
+        # the keys of the maps with the same keys are pickled once: a single keys tuple and a values tuple per map
+        maps = [JimmyMap(a=i, b=i, c=i, d=i) for i in range(10)]
+        ops = [op.name for op, _, _ in pickletools.genops(pickle.dumps(maps))]
+        assert ops.count('TUPLE') == 1 + len(maps)
+
+        shallow, deep = copy.copy(configs[0]), copy.deepcopy(configs[0])
+        assert shallow.kwargs is configs[0].kwargs
+        assert deep.kwargs is not configs[0].kwargs and dict(deep.kwargs) == dict(configs[0].kwargs)
+        config = Point(x=3)
+        assert copy.copy(config) == config and pickle.loads(pickle.dumps(config)) == config
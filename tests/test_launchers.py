@@ -0,0 +1,303 @@
+import os
+import pickle
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pytest
+
+from jimmy.constructors.basic_constructors import TimeStamp
+from jimmy.jimmy import JimmyLauncher, find_deferred, find_point_deferred
+from jimmy.jimmy_map import JimmyMap
+from jimmy.grid import JimmyGrid
+from jimmy.ledger import LEDGER_NAME, ConfigFingerprint, RunLedger, config_fingerprint
+from jimmy.pool import LaunchFailure
+from jimmy.results import RESULTS_NAME, ResultStore
+from jimmy.transport import SweepTask
+
+
+def _write_config(tmp_path, pool_launcher=''):
+    (tmp_path / 'config.yaml').write_text("x: 0\n"
+                                          "jimmy:\n"
+                                          "  grid_launcher:\n"
+                                          "    x: [1, 2, 3, 4]\n"
+                                          f"{pool_launcher}")
+    return tmp_path / 'config.yaml'
+
+
+def _square(x):
+    if x == 3:
+        raise RuntimeError('failed point')
+    return x ** 2
+
+
+def _sleep(x):
+    time.sleep(x / 2)
+    return x
+
+
+class TestPoolLauncher:
+    def test_results_in_grid_order(self, tmp_path):
+        launcher = JimmyLauncher(_write_config(tmp_path, "  pool_launcher:\n    max_workers: 2\n"))
+        results = launcher.pool_launcher(_square, start_method='spawn')
+        assert results[:2] == [1, 4] and results[3] == 16
+        assert isinstance(results[2], LaunchFailure)
+        assert results[2].experiment_key == 'hparam_x:3'
+        assert isinstance(results[2].exception, RuntimeError)
+
+    def test_local_function_with_fork(self, tmp_path):
+        launcher = JimmyLauncher(_write_config(tmp_path))
+        assert launcher.pool_launcher(lambda x: -x, max_workers=2, start_method='fork') == [-1, -2, -3, -4]
+
+    def test_timeout(self, tmp_path):
+        launcher = JimmyLauncher(_write_config(tmp_path))
+        results = launcher.pool_launcher(_sleep, max_workers=4, timeout=1.2)
+        assert results[:2] == [1, 2]
+        assert all(isinstance(result, LaunchFailure) for result in results[2:])
+        assert isinstance(results[2].exception, TimeoutError)
+
+    def test_unenforced_timeout(self, tmp_path, monkeypatch):
+        monkeypatch.delattr(signal, 'SIGALRM')
+        launcher = JimmyLauncher(_write_config(tmp_path))
+        with pytest.warns(UserWarning, match='not enforced'):
+            assert launcher.pool_launcher(lambda x: x, max_workers=2, start_method='fork', timeout=1) == [1, 2, 3, 4]
+
+    def test_broken_pool(self, tmp_path):
+        def func(x):
+            if x == 2:
+                os._exit(1)
+            return x
+
+        launcher = JimmyLauncher(_write_config(tmp_path))
+        results = launcher.pool_launcher(func, max_workers=1, start_method='fork')
+        assert len(results) == 4
+        assert all(isinstance(result, LaunchFailure) for result in results[1:])
+        assert isinstance(results[3].exception, BrokenProcessPool)
+        assert results[3].experiment_key == 'hparam_x:4'
+
+
+class TestRunLedger:
+    def _write_config(self, tmp_path):
+        (tmp_path / 'config.yaml').write_text(f"x: 0\n"
+                                              f"logs: !unique-path '{tmp_path / 'results'}'\n"
+                                              f"jimmy:\n"
+                                              f"  dump_config: logs\n"
+                                              f"  grid_launcher:\n"
+                                              f"    x: [1, 2, 3, 4]\n")
+        return tmp_path / 'config.yaml'
+
+    def test_resume(self, tmp_path):
+        config_path = self._write_config(tmp_path)
+        calls = []
+
+        def func(x, logs):
+            calls.append(x)
+            if x == 3 and len(calls) == 3:
+                raise RuntimeError('interrupted')
+            return {'x': x}
+
+        with pytest.raises(RuntimeError):
+            JimmyLauncher(config_path).grid_launcher(func)
+
+        ledger = RunLedger(tmp_path / 'results' / LEDGER_NAME)
+        assert [record['status'] for record in ledger.records()] == ['started', 'success', 'started', 'success',
+                                                                     'started', 'failed']
+        assert len(ledger.completed()) == 2
+
+        results = JimmyLauncher(config_path, resume=True).grid_launcher(func)
+        assert results == [{'x': 1}, {'x': 2}, {'x': 3}, {'x': 4}]
+        assert calls == [1, 2, 3, 3, 4]
+
+        results = JimmyLauncher(config_path, resume=True).pool_launcher(func, max_workers=2)
+        assert results == [{'x': 1}, {'x': 2}, {'x': 3}, {'x': 4}]
+        assert calls == [1, 2, 3, 3, 4]
+
+    def test_fingerprint(self):
+        config = JimmyMap(a=1, b=JimmyMap(c=[1, 2.0, 'x'], d=Path('/tmp')))
+        same_config = JimmyMap(b=JimmyMap(d=Path('/tmp'), c=[1, 2.0, 'x']), a=1)
+        assert config_fingerprint(config) == config_fingerprint(same_config)
+        other_config = JimmyMap(a=1, b=JimmyMap(c=[1, 2, 'x'], d=Path('/tmp')))
+        assert config_fingerprint(config) != config_fingerprint(other_config)
+
+    def test_result_types(self, tmp_path):
+        ledger = RunLedger(tmp_path / LEDGER_NAME)
+        results = {'a': {'x': [1, 2.5, None]}, 'b': (0, {1: 'a'}), 'c': float('nan'), 'd': Path('/tmp')}
+        for fingerprint, result in results.items():
+            ledger.success(fingerprint, fingerprint, result)
+        completed = ledger.completed()
+        assert completed['a'] == results['a'] and completed['d'] == results['d']
+        assert completed['b'] == (0, {1: 'a'})
+        assert 'result_pickle' not in ledger.records()[0] and 'result_pickle' in ledger.records()[1]
+
+    def test_fingerprint_memo(self):
+        grid = JimmyGrid(JimmyMap(a=JimmyMap(b=[1, 2]), x=0), JimmyMap(x=[1, 2, 3]))
+        fingerprint = ConfigFingerprint(shared=grid.config)
+        fingerprints = [fingerprint(config) for _, config in grid]
+        assert fingerprints == [config_fingerprint(config) for _, config in grid]
+        # only the subtrees shared with the base config are memoized, the grid points are not kept alive
+        assert len(fingerprint._memo) == 2
+        assert all(value is grid.config.a or value is grid.config.a.b for value, _ in fingerprint._memo.values())
+
+
+class TestSearchLaunchers:
+    def _write_config(self, tmp_path):
+        (tmp_path / 'config.yaml').write_text("x: 0\n"
+                                              "y: 0\n"
+                                              "jimmy:\n"
+                                              "  grid_launcher:\n"
+                                              "    x: !range [0, 9, 1]\n"
+                                              "    y: {low: 0, high: 100}\n"
+                                              "  random_launcher:\n"
+                                              "    num_samples: 5\n"
+                                              "    seed: 0\n")
+        return tmp_path / 'config.yaml'
+
+    def test_random_launcher(self, tmp_path):
+        launcher = JimmyLauncher(self._write_config(tmp_path))
+        results = launcher.random_launcher(lambda x, y: (x, y))
+        assert len(set(results)) == 5
+        assert results == JimmyLauncher(self._write_config(tmp_path)).random_launcher(lambda x, y: (x, y))
+
+        keys = [key for key, _ in launcher.sample_grid(5, seed=0)]
+        assert keys[0].startswith('hparam_x:') and keys[0].endswith(('_y:low', '_y:high'))
+        assert len(launcher.random_launcher(lambda x, y: x, num_samples=100)) == 18
+
+    def test_halving_launcher(self, tmp_path):
+        calls = []
+
+        def func(x, y, budget):
+            calls.append((x, y, budget))
+            return {'score': x + y}
+
+        launcher = JimmyLauncher(self._write_config(tmp_path))
+        results = launcher.halving_launcher(func, eta=3, score_key='score')
+        assert list(results)[0] == 'hparam_x:8_y:high'
+        assert len(results) == 18
+        assert [budget for *_, budget in calls] == [1] * 18 + [3] * 6 + [9] * 2 + [27]
+
+        calls.clear()
+        results = launcher.halving_launcher(func, num_samples=9, seed=1, max_budget=3, mode='min', score_key='score')
+        assert len(calls) == 12 and len(results) == 9
+        scores = [result['score'] for result in results.values()]
+        assert scores[:3] == sorted(scores[:3]) and min(scores) == scores[0]
+
+    def test_halving_result_store(self, tmp_path):
+        (tmp_path / 'config.yaml').write_text(self._write_config(tmp_path).read_text() + "  results: true\n"
+                                              "  dump_config: logs\n"
+                                              f"logs: '{tmp_path / 'logs'}'\n")
+        launcher = JimmyLauncher(tmp_path / 'config.yaml')
+        results = launcher.halving_launcher(lambda x, y, budget, logs: {'score': x + y}, score_key='score')
+        with ResultStore(tmp_path / 'logs' / RESULTS_NAME) as store:
+            # the last round of every candidate, with its budget
+            assert len(store) == len(results) == 18
+            assert store.best('score')['experiment_key'] == list(results)[0]
+            assert store.best('score')['budget'] == 27 and store['hparam_x:0_y:low']['budget'] == 1
+
+
+class TestResolvedConfig:
+    def test_memoized_resolution(self, tmp_path):
+        (tmp_path / 'config.yaml').write_text(f"time: !time-stamp []\n"
+                                              f"data: {{table: [1, 2, 3]}}\n"
+                                              f"model: {{logs: !unique-path '{tmp_path / 'logs'}', size: 1}}\n")
+        launcher = JimmyLauncher(tmp_path / 'config.yaml')
+        config = launcher.config
+        assert launcher.config is config
+        assert isinstance(config.time, str) and config.model.logs == tmp_path / 'logs'
+
+        # only the maps leading to deferred values are copied
+        assert config.data is launcher._config.data
+        assert config.model is not launcher._config.model
+
+        fresh_config = launcher.resolve()
+        assert fresh_config is not config and launcher.config is fresh_config
+        assert isinstance(fresh_config.time, str) and fresh_config.model.logs == tmp_path / 'logs_v1'
+        assert launcher.resolved_config().model.logs == tmp_path / 'logs_v1'
+
+        assert launcher.simple_launcher(lambda time, data, model: data) is not config.data
+
+
+class TestConfigTransport:
+    def test_point_delta(self, tmp_path):
+        (tmp_path / 'config.yaml').write_text(f"data: {{table: {list(range(1000))}}}\n"
+                                              f"model: {{logs: !unique-path '{tmp_path / 'logs'}', size: 1}}\n"
+                                              f"jimmy:\n"
+                                              f"  grid_launcher:\n"
+                                              f"    model/size: [1, 2]\n"
+                                              f"    seed: [0, 1]\n")
+        launcher = JimmyLauncher(tmp_path / 'config.yaml')
+        grid = launcher.grid
+        task = SweepTask(lambda **config: config, grid.config, grid.plan)
+        for index, (key, config) in enumerate(grid):
+            resolved, delta = launcher._point_delta(grid, index, key, config)
+            assert delta.experiment_key == key
+            assert [path for path, _ in delta.resolved] == [('model', 'logs')]
+            # the worker rebuilds the same config as the one parsed in the launcher
+            expected = launcher.parse_config(config, experiment_key=key)
+            built = task(pickle.loads(pickle.dumps(delta)))
+            assert built == expected == resolved
+            assert built['model']['logs'] == tmp_path / 'logs' / key
+            assert len(pickle.dumps(delta)) < len(pickle.dumps(grid.config)) / 2
+
+        # the base is shared with the built configs, and a task modifying its config does not change it
+        built = task.build(delta)
+        assert vars(built)['data'] is grid.config.data
+        mutating_task = SweepTask(lambda data, model, seed: data.table.append(seed) or len(data.table),
+                                  grid.config, grid.plan)
+        assert [mutating_task(delta), mutating_task(delta)] == [1001, 1001]
+        assert len(grid.config.data.table) == 1000
+
+    def test_overridden_deferred_values(self):
+        base = {'a': {'b': TimeStamp(), 'c': 1}, 'd': TimeStamp()}
+        config = {'a': {'c': 2, 'e': {'f': TimeStamp()}}, 'd': TimeStamp()}
+        assert find_point_deferred(config, find_deferred(base), ['a']) == [('d',), ('a', 'e', 'f')]
+        assert find_point_deferred(config, find_deferred(base), ['a/c', 'd']) == [('a', 'b'), ('d',)]
+
+
+def _ray_square(x):
+    if x == 3:
+        raise RuntimeError('failed point')
+    return x ** 2
+
+
+@pytest.fixture(scope='module')
+def ray():
+    ray = pytest.importorskip('ray')
+    ray.init(num_cpus=2, include_dashboard=False, log_to_driver=False)
+    yield ray
+    ray.shutdown()
+
+
+class TestRayLauncher:
+    def test_streaming(self, tmp_path, ray):
+        launcher = JimmyLauncher(_write_config(tmp_path))
+        completed = []
+        results = launcher.ray_launcher(_ray_square, max_in_flight=2, max_retries=1,
+                                        callback=lambda key, result: completed.append(key))
+        assert results[:2] == [1, 4] and results[3] == 16
+        assert isinstance(results[2], LaunchFailure) and results[2].experiment_key == 'hparam_x:3'
+        assert sorted(completed) == ['hparam_x:1', 'hparam_x:2', 'hparam_x:3', 'hparam_x:4']
+
+        stream = launcher.ray_stream(_ray_square, max_in_flight=1)
+        assert next(stream) == ('hparam_x:1', 1)
+        assert dict(stream)['hparam_x:4'] == 16
+
+    def test_retries(self, tmp_path, ray):
+        @ray.remote
+        class Counter:
+            def __init__(self):
+                self.count = 0
+
+            def increment(self):
+                self.count += 1
+                return self.count
+
+        counter = Counter.remote()
+
+        def flaky(x):
+            if ray.get(counter.increment.remote()) <= 2:
+                raise RuntimeError('flaky point')
+            return x
+
+        launcher = JimmyLauncher(_write_config(tmp_path))
+        assert launcher.ray_launcher(flaky, max_in_flight=1, max_retries=2) == [1, 2, 3, 4]
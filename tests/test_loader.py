@@ -0,0 +1,181 @@
+import copy
+
+import numpy as np
+import pytest
+import yaml
+
+from jimmy.constructors import path_constructors
+from jimmy.constructors.math_constructors import LinSpaceSequence, NumericSequence, RangeSequence
+from jimmy.constructors.path_constructors import GlobPaths
+from jimmy.grid import JimmyGrid
+from jimmy.include import IncludeCycleError
+from jimmy.jimmy import LoadFailure, jimmy_load, jimmy_load_many, save_yaml
+from jimmy.jimmy_map import JimmyMap
+from jimmy.profiling import profile
+
+
+class TestLoader:
+    def test_global_yaml_state(self, tmp_path):
+        (tmp_path / 'config.yaml').write_text("x: !join ['a', 'b']\nhere: !here []\n")
+        config, _ = jimmy_load(tmp_path / 'config.yaml')
+        assert isinstance(config, JimmyMap)
+        assert config.x == 'ab'
+        assert config.here == tmp_path
+
+        with pytest.raises(yaml.constructor.ConstructorError):
+            yaml.full_load("x: !join ['a', 'b']")
+
+    def test_custom_constructors(self, tmp_path):
+        (tmp_path / 'config.yaml').write_text("x: !double 2\n")
+        config, _ = jimmy_load(tmp_path / 'config.yaml',
+                               constructors={'!double': lambda loader, node: 2 * int(node.value)})
+        assert config.x == 4
+
+    def test_save_yaml(self, tmp_path):
+        config = JimmyMap(a=1, b=JimmyMap(c=tmp_path))
+        save_yaml(config, tmp_path / 'out.yaml')
+        assert yaml.safe_load((tmp_path / 'out.yaml').read_text()) == {'a': 1, 'b': {'c': str(tmp_path)}}
+
+
+class TestIncludes:
+    def _write_fragments(self, tmp_path):
+        (tmp_path / 'fragments').mkdir()
+        (tmp_path / 'fragments' / 'shared.yaml').write_text('x: 1\n')
+        (tmp_path / 'fragments' / 'model.yaml').write_text("shared: !load 'shared.yaml'\n")
+        (tmp_path / 'config.yaml').write_text("a: !load 'fragments/shared.yaml'\n"
+                                              "b: !load 'fragments/shared.yaml'\n"
+                                              "model: !load 'fragments/model.yaml'\n")
+        return tmp_path / 'config.yaml'
+
+    @pytest.mark.parametrize('include_workers', [None, 4])
+    def test_relative_includes(self, tmp_path, include_workers):
+        config_path = self._write_fragments(tmp_path)
+        config, _ = jimmy_load(config_path, include_workers=include_workers)
+        assert config.a.x == 1
+        assert config.model.shared.x == 1
+        assert config.a is not config.b
+
+    def test_shared_includes(self, tmp_path):
+        config_path = self._write_fragments(tmp_path)
+        config, _ = jimmy_load(config_path, copy_includes=False)
+        assert config.a is config.b
+        assert config.a is config.model.shared
+
+    def test_include_cycle(self, tmp_path):
+        (tmp_path / 'a.yaml').write_text("b: !load 'b.yaml'\n")
+        (tmp_path / 'b.yaml').write_text("a: !load 'a.yaml'\n")
+        with pytest.raises(IncludeCycleError) as error:
+            jimmy_load(tmp_path / 'a.yaml')
+        assert error.value.chain == (tmp_path / 'a.yaml', tmp_path / 'b.yaml', tmp_path / 'a.yaml')
+
+
+class TestGlob:
+    def test_lazy_glob(self, tmp_path):
+        (tmp_path / 'data').mkdir()
+        for name in ['a.txt', 'b.txt', 'c.csv']:
+            (tmp_path / 'data' / name).write_text('')
+        (tmp_path / 'config.yaml').write_text(f"files: !glob ['{tmp_path}', 'data', '*.txt']\n"
+                                              f"nested: !glob ['{tmp_path}', '**/*.csv']\n")
+        config, _ = jimmy_load(tmp_path / 'config.yaml')
+        assert isinstance(config.files, GlobPaths)
+        assert len(config.files) == 2
+        assert sorted(config.files) == [tmp_path / 'data' / 'a.txt', tmp_path / 'data' / 'b.txt']
+        assert list(config.nested) == [tmp_path / 'data' / 'c.csv']
+        assert config.nested[0] == tmp_path / 'data' / 'c.csv'
+
+        # the listing is cached until the directory is modified
+        assert path_constructors._glob_cache[(str(tmp_path / 'data'), '*.txt')][1] is not None
+        (tmp_path / 'data' / 'd.txt').write_text('')
+        assert len(config.files) == 3
+        assert config.files[2:] == [config.files[2]]
+
+        # deferred globs are dumped as their pattern
+        save_yaml(config, tmp_path / 'out.yaml')
+        assert (tmp_path / 'out.yaml').read_text().startswith(f"files: !glob [{tmp_path / 'data'}, '*.txt']")
+        dumped_config, _ = jimmy_load(tmp_path / 'out.yaml')
+        assert dumped_config.files == config.files
+
+
+class TestNumericSequences:
+    def test_lazy_ranges(self, tmp_path):
+        (tmp_path / 'config.yaml').write_text("a: !range [0, 1, 1e-6]\n"
+                                              "b: !lin-space [0, 1, 5]\n"
+                                              "c: !log-space [-3, 0, 4]\n"
+                                              "d: !range [0, 10, 3]\n")
+        config, _ = jimmy_load(tmp_path / 'config.yaml')
+        assert isinstance(config.a, RangeSequence)
+        assert len(config.a) == 10 ** 6 and config.a[-1] == np.arange(0, 1, 1e-6)[-1]
+        assert config.a[2:5] == np.arange(0, 1, 1e-6)[2:5].tolist()
+        assert config.b == [0., 0.25, 0.5, 0.75, 1.]
+        # a single sample is a float as well, e.g. in the experiment keys
+        assert list(LinSpaceSequence(0, 1, 1)) == np.linspace(0, 1, 1).tolist()
+        assert JimmyGrid(JimmyMap(x=0), JimmyMap(x=LinSpaceSequence(0, 1, 1))).experiment_key(0) == 'hparam_x:0.0'
+        assert list(config.c) == np.logspace(-3, 0, 4).tolist()
+        assert config.d == [0, 3, 6, 9] and isinstance(config.d[1], int)
+        assert copy.deepcopy(config).a is config.a
+
+        # dumped as the tag
+        save_yaml(config, tmp_path / 'out.yaml')
+        assert (tmp_path / 'out.yaml').read_text().startswith("a: !range [0, 1, 1.0e-06]\n")
+        dumped_config, _ = jimmy_load(tmp_path / 'out.yaml')
+        assert dumped_config == config
+
+    def test_equality(self):
+        # compared by elements, so equality is transitive across types and arguments
+        assert RangeSequence(0, 4, 1) == [0, 1, 2, 3] == RangeSequence(0, 3.5, 1)
+        assert RangeSequence(0, 4, 1) == RangeSequence(0, 3.5, 1) == LinSpaceSequence(0, 3, 4)
+        assert hash(RangeSequence(0, 4, 1)) == hash(RangeSequence(0, 3.5, 1)) == hash((0, 1, 2, 3))
+        assert RangeSequence(0, 4, 1) != RangeSequence(0, 4, 2) and RangeSequence(0, 4, 1) != '0123'
+        with pytest.raises(TypeError):
+            NumericSequence(0, 1, 1)
+
+    def test_grid_axis(self):
+        grid = JimmyGrid(JimmyMap(x=0), JimmyMap(x=RangeSequence(0, 10 ** 6, 1)))
+        assert len(grid) == 10 ** 6
+        assert next(iter(grid)) == ('hparam_x:0', JimmyMap(x=0))
+        assert grid[-1][1]['x'] == 10 ** 6 - 1
+
+
+class TestLoadMany:
+    def _write_configs(self, tmp_path, num_configs=16):
+        (tmp_path / 'shared.yaml').write_text('lr: 0.1\n')
+        paths = []
+        for index in range(num_configs):
+            (tmp_path / f'exp_{index}').mkdir()
+            paths.append(tmp_path / f'exp_{index}' / 'config.yaml')
+            paths[-1].write_text(f"x: {index}\n"
+                                 f"here: !here []\n"
+                                 f"optim: !load '{tmp_path / 'shared.yaml'}'\n"
+                                 f"jimmy:\n"
+                                 f"  template:\n"
+                                 f"    y: 1\n")
+        (tmp_path / 'broken.yaml').write_text('x: [1\n')
+        return paths
+
+    def test_threads(self, tmp_path):
+        paths = self._write_configs(tmp_path)
+        with profile() as profiler:
+            results = jimmy_load_many(paths[:8] + [tmp_path / 'broken.yaml'] + paths[8:],
+                                      cli_kwargs={'optim/lr': 0.2}, max_workers=8)
+
+        assert isinstance(results[8], LoadFailure) and results[8].path == tmp_path / 'broken.yaml'
+        configs = [config for config, _ in results[:8] + results[9:]]
+        assert [config.x for config in configs] == list(range(16))
+        assert [config.here for config in configs] == [path.parent for path in paths]
+        assert all(config.optim.lr == 0.2 and config.y == 1 for config in configs)
+        # the shared include is parsed once and never modified by the overrides
+        assert profiler.stats[('phase', 'parse', str(tmp_path / 'shared.yaml'))].count == 1
+        assert configs[0].optim is not configs[1].optim
+
+    def test_processes(self, tmp_path):
+        paths = self._write_configs(tmp_path, num_configs=5)
+        results = jimmy_load_many(paths, max_workers=2, executor='process')
+        assert [config.x for config, _ in results] == list(range(5))
+        assert results[0][1].template.y == 1
+
+    def test_cycles(self, tmp_path):
+        (tmp_path / 'a.yaml').write_text(f"b: !load '{tmp_path / 'b.yaml'}'\n")
+        (tmp_path / 'b.yaml').write_text(f"a: !load '{tmp_path / 'a.yaml'}'\n")
+        for _ in range(20):
+            results = jimmy_load_many([tmp_path / 'a.yaml', tmp_path / 'b.yaml'] * 4, max_workers=8)
+            assert all(isinstance(result.exception, IncludeCycleError) for result in results)
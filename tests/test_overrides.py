@@ -0,0 +1,47 @@
+import pytest
+
+from jimmy.jimmy import update_from_cli
+from jimmy.jimmy_map import JimmyMap
+from jimmy.overrides import OverrideError, OverridePlan
+
+
+def _config():
+    return JimmyMap(lr=0.1, name='run', model=JimmyMap(size=1, layers=JimmyMap(n=2, act='relu')))
+
+
+class TestOverridePlan:
+    def test_apply(self):
+        config = _config()
+        plan = OverridePlan(['lr', 'model/layers/n', 'model/size', 'model/extra/depth'])
+        new_config = plan.apply(config, [0.01, 4, 10, 3])
+        assert new_config.lr == 0.01 and new_config.model.size == 10 and new_config.model.extra.depth == 3
+        assert new_config.model.layers.n == 4 and new_config.model.layers.act == 'relu'
+
+        # only the overridden paths are copied
+        assert config.lr == 0.1 and config.model.layers.n == 2 and 'extra' not in config.model
+        assert new_config.model is not config.model
+
+        other_config = plan.apply(config, [0.2, 8, 20, 6])
+        assert other_config.model.layers.n == 8 and new_config.model.layers.n == 4
+
+    def test_map_values_are_merged(self):
+        config = update_from_cli(_config(), {'model/layers': JimmyMap(n=3), 'model/layers/act': 'gelu'})
+        assert config.model.layers.n == 3 and config.model.layers.act == 'gelu'
+
+    def test_errors_are_collected(self):
+        plan = OverridePlan(['lr/value', 'name/x', 'model/size', 'model/missing', 'other/key'])
+        assert plan.check(_config(), [1, 2, 'large', 4, 5]) == ["lr: can not override the keys ['value'] of a float",
+                                                                "name: can not override the keys ['x'] of a str",
+                                                                'model/size: str value overrides a int',
+                                                                'model/missing: unknown key',
+                                                                'other: unknown key']
+
+        with pytest.raises(OverrideError) as error:
+            plan.apply(_config(), [1, 2, 'large', 4, 5])
+        assert len(error.value.errors) == 2
+
+        plan = OverridePlan(['model/size', 'model/missing'])
+        assert plan.apply(_config(), ['large', 4]).model.missing == 4
+        with pytest.raises(OverrideError) as error:
+            plan.apply(_config(), ['large', 4], strict=True)
+        assert len(error.value.errors) == 2
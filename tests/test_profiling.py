@@ -0,0 +1,67 @@
+import atexit
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import jimmy
+from jimmy.jimmy import JimmyLauncher, jimmy_load
+from jimmy.profiling import active_profiler, profile
+
+
+def _write_configs(tmp_path):
+    (tmp_path / 'data').mkdir()
+    (tmp_path / 'data' / 'a.txt').write_text('')
+    (tmp_path / 'include.yaml').write_text('files: !glob [data, "*.txt"]\n')
+    (tmp_path / 'config.yaml').write_text("x: 0\n"
+                                          "sub: !load 'include.yaml'\n"
+                                          "values: !range [0, 4, 1]\n"
+                                          "jimmy:\n"
+                                          "  grid_launcher:\n"
+                                          "    x: [1, 2, 3]\n")
+    return tmp_path / 'config.yaml'
+
+
+class TestProfiling:
+    def test_profile(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        config_path = _write_configs(tmp_path)
+        with profile() as profiler:
+            jimmy_load(config_path, cli_kwargs={'x': 4})
+        assert active_profiler() is None
+
+        stats = {(stats.kind, stats.name, stats.file): stats for stats in profiler.sorted_stats()}
+        assert stats[('phase', 'jimmy_load', str(config_path))].count == 1
+        assert stats[('phase', 'cli', None)].count == 1
+        assert stats[('phase', 'parse', str(tmp_path / 'include.yaml'))].count == 1
+        assert stats[('tag', '!glob', str(tmp_path / 'include.yaml'))].count == 1
+        assert stats[('tag', '!load', str(config_path))].count == 1
+        assert stats[('tag', '!range', str(config_path))].count == 1
+        assert 'jimmy_load' in profiler.report().splitlines()[1]
+
+        profiler.to_chrome_trace(tmp_path / 'trace.json')
+        events = json.loads((tmp_path / 'trace.json').read_text())['traceEvents']
+        assert len(events) == sum(stats.count for stats in stats.values())
+
+    def test_launcher(self, tmp_path):
+        config_path = _write_configs(tmp_path)
+        launcher = JimmyLauncher(config_path, profile=str(tmp_path / 'trace.json'))
+        try:
+            launcher.grid_launcher(lambda x, sub, values: x)
+            names = {stats.name for stats in launcher.profiler.sorted_stats()}
+            assert {'jimmy_load', 'grid_point', 'resolve'} <= names
+        finally:
+            launcher.profiler.disable()
+            atexit.unregister(launcher._report_profile)
+
+    def test_cli(self, tmp_path):
+        config_path = _write_configs(tmp_path)
+        script = ("from jimmy import JimmyLauncher\n"
+                  "JimmyLauncher().auto_launcher(lambda x, sub, values: x)\n")
+        output = subprocess.run([sys.executable, '-c', script, '--config', str(config_path), '--jimmy-profile',
+                                 str(tmp_path / 'trace.json'), '--launcher', 'grid'],
+                                cwd=tmp_path, capture_output=True, text=True, check=True,
+                                env={**os.environ, 'PYTHONPATH': str(Path(jimmy.__file__).parents[1])})
+        assert 'jimmy_load' in output.stderr and '!glob' in output.stderr
+        assert json.loads((tmp_path / 'trace.json').read_text())['traceEvents']
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from jimmy.jimmy import JimmyLauncher
+from jimmy.pool import LaunchFailure
+from jimmy.results import RESULTS_NAME, ResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ResultStore(tmp_path / 'results.sqlite') as store:
+        for lr in [0.01, 0.1, 1.]:
+            for model in ['small', 'large']:
+                store.record(f'hparam_lr:{lr}_model:{model}', {'lr': lr, 'model': model},
+                             {'accuracy': lr * (2 if model == 'large' else 1), 'curve': np.arange(3) * lr})
+        store.record('hparam_lr:10_model:small', {'lr': 10, 'model': 'small'},
+                     LaunchFailure('hparam_lr:10_model:small', RuntimeError('diverged'), ''))
+        yield store
+
+
+class TestResultStore:
+    def test_columns(self, store):
+        assert len(store) == 7
+        assert store.axes == ['lr', 'model']
+        assert store.metrics == ['accuracy', 'curve']
+        assert store['hparam_lr:10_model:small']['status'] == 'failed'
+        np.testing.assert_allclose(store['hparam_lr:0.1_model:small']['curve'], [0, 0.1, 0.2])
+
+    def test_query(self, store):
+        rows = list(store.select(['model', 'accuracy'], where={'lr': slice(None, 1.)}, order_by='accuracy'))
+        assert rows == [{'model': 'small', 'accuracy': 0.01}, {'model': 'large', 'accuracy': 0.02},
+                        {'model': 'small', 'accuracy': 0.1}, {'model': 'large', 'accuracy': 0.2}]
+        assert store.columns(['lr'], where={'model': 'large'}) == {'lr': [0.01, 0.1, 1.]}
+        assert store.best('accuracy')['experiment_key'] == 'hparam_lr:1.0_model:large'
+
+    def test_aggregate(self, store):
+        assert store.aggregate('accuracy', by='model', how='max') == {'large': 2., 'small': 1.}
+        assert store.aggregate('accuracy', by=['lr', 'model'], where={'lr': [1.]}) == {(1., 'large'): 2.,
+                                                                                      (1., 'small'): 1.}
+        assert store.aggregate('accuracy', how='count') == 6
+
+    def test_reopen(self, store):
+        with ResultStore(store.path) as reopened:
+            assert reopened.axes == ['lr', 'model'] and len(reopened) == 7
+
+
+def test_launcher_results(tmp_path):
+    (tmp_path / 'config.yaml').write_text(f"x: 0\n"
+                                          f"logs: '{tmp_path / 'logs'}'\n"
+                                          f"jimmy:\n"
+                                          f"  dump_config: logs\n"
+                                          f"  results: true\n"
+                                          f"  grid_launcher:\n"
+                                          f"    x: [1, 2, 3]\n"
+                                          f"    y:\n"
+                                          f"      a: 10\n"
+                                          f"      b: 20\n")
+    launcher = JimmyLauncher(tmp_path / 'config.yaml')
+    launcher.pool_launcher(lambda x, y, **kwargs: {'value': x * y}, max_workers=2, start_method='fork')
+
+    with ResultStore(tmp_path / 'logs' / RESULTS_NAME) as store:
+        assert store.axes == ['x', 'y']
+        assert store.aggregate('value', by='y', how='sum') == {'a': 60, 'b': 120}
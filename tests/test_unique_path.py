@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from jimmy.constructors.path_constructors import UniquePath, _unique_path
+
+
+class TestUniquePath:
+    def test_versions(self, tmp_path):
+        assert _unique_path(tmp_path / 'logs') == tmp_path / 'logs'
+        assert _unique_path(tmp_path / 'logs') == tmp_path / 'logs_v1'
+        assert _unique_path(tmp_path / 'logs') == tmp_path / 'logs_v2'
+        assert (tmp_path / 'logs_v2').is_dir()
+
+        (tmp_path / 'runs').mkdir()
+        (tmp_path / 'runs_v7').mkdir()
+        assert _unique_path(tmp_path / 'runs') == tmp_path / 'runs_v8'
+
+        assert _unique_path(tmp_path / 'out.txt', is_dir=False) == tmp_path / 'out.txt'
+        assert _unique_path(tmp_path / 'out.txt', is_dir=False) == tmp_path / 'out_v1.txt'
+        assert (tmp_path / 'out_v1.txt').is_file()
+
+    def test_experiment_keys(self, tmp_path):
+        unique_path = UniquePath(tmp_path / 'results')
+        assert unique_path.apply(experiment_key='a') == tmp_path / 'results' / 'a'
+        assert unique_path.apply(experiment_key='a') == tmp_path / 'results' / 'a'
+
+        # in a second sweep, only the experiment keys already used get a new version of the directory
+        unique_path = UniquePath(tmp_path / 'results')
+        assert unique_path.apply(experiment_key='a') == tmp_path / 'results_v1' / 'a'
+        assert unique_path.apply(experiment_key='b') == tmp_path / 'results' / 'b'
+
+    def test_concurrent_allocation(self, tmp_path):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            paths = list(executor.map(lambda _: _unique_path(tmp_path / 'logs'), range(64)))
+        assert len(set(paths)) == 64
+        assert all(path.is_dir() for path in paths)
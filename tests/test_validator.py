@@ -0,0 +1,90 @@
+from pathlib import Path
+from typing import Literal, Optional
+
+import pytest
+
+from jimmy.grid import JimmyGrid
+from jimmy.jimmy import JimmyLauncher
+from jimmy.jimmy_map import JimmyMap
+from jimmy.jimmy_validator import ValidationError, compile_type_check, jimmy_validator, validate_grid
+from jimmy.constructors.math_constructors import LinSpaceSequence, RangeSequence
+from jimmy.constructors.path_constructors import GlobPaths, UniquePath
+
+
+@jimmy_validator
+class Model:
+    size: int = lambda value: value > 0
+    activation: Literal['relu', 'gelu']
+
+
+@jimmy_validator
+class Config:
+    name: str = 'name'
+    lr: float = [lambda value: 0 < value < 1]
+    layers: list[int]
+    model: Model
+    logs: Optional[Path] = None
+
+
+def _config(**kwargs):
+    config = JimmyMap(name='run', lr=0.1, layers=[1, 2], model=JimmyMap(size=1, activation='relu'), logs=None)
+    for key, value in kwargs.items():
+        config[key] = value
+    return config
+
+
+class TestValidator:
+    def test_valid(self):
+        Config.validate(_config())
+        assert Config.errors(_config(lr=1e-3, logs=UniquePath('logs'))) == []
+
+    def test_all_errors_are_collected(self):
+        config = _config(lr=2, layers=[1, 'a'], model=JimmyMap(size=0, activation='tanh'))
+        config.pop('name')
+        with pytest.raises(ValidationError) as error:
+            Config.validate(config)
+        assert [error.split(':')[0] for error in error.value.errors] == ['name', 'lr', 'layers[1]', 'model/size',
+                                                                         'model/activation']
+
+    def test_numeric_sequences(self):
+        errors = []
+        for annotation in (list, tuple, list[float], tuple[float, ...], tuple[float, float, float]):
+            compile_type_check(annotation)(RangeSequence(0, 3, 1), 'x', errors)
+            compile_type_check(annotation)(LinSpaceSequence(0, 1, 3), 'x', errors)
+        assert errors == []
+        compile_type_check(list[str])(RangeSequence(0, 1, 1), 'x', errors)
+        assert errors == ['x[0]: expected str, got int']
+
+    def test_glob_paths(self, tmp_path):
+        (tmp_path / 'a.txt').write_text('a')
+        errors = []
+        for annotation in (list, list[Path], tuple[Path, ...], Optional[list[Path]]):
+            compile_type_check(annotation)(GlobPaths(tmp_path, '*.txt'), 'files', errors)
+        assert errors == []
+        compile_type_check(list[str])(GlobPaths(tmp_path, '*.txt'), 'files', errors)
+        assert errors == [f'files[0]: expected str, got {type(tmp_path).__name__}']
+        compile_type_check(list)('a.txt', 'files', errors)
+        assert errors[1:] == ['files: expected list, got str']
+
+    def test_validate_grid(self):
+        grid = JimmyGrid(_config(), JimmyMap(**{'lr': [0.1, 2], 'model/size': list(range(-1000, 1000))}))
+        invalid = validate_grid(Config, grid)
+        assert len(invalid) == 2000 + 1000 + 1
+        assert invalid['hparam_lr:2_size:-1'] == ['lr: tests failed for 2, results: [False]',
+                                                  'model/size: tests failed for -1, results: [False]']
+        assert validate_grid(Config, grid, max_workers=4, chunk_size=256) == invalid
+
+    def test_launcher(self, tmp_path):
+        (tmp_path / 'config.yaml').write_text("name: run\n"
+                                              "lr: 0.1\n"
+                                              "layers: [1, 2]\n"
+                                              "model: {size: 1, activation: relu}\n"
+                                              "logs: null\n"
+                                              "jimmy:\n"
+                                              "  grid_launcher:\n"
+                                              "    model/activation: [relu, tanh]\n")
+        calls = []
+        launcher = JimmyLauncher(tmp_path / 'config.yaml', validator=Config)
+        with pytest.raises(ValidationError, match='hparam_activation:tanh: model/activation'):
+            launcher.grid_launcher(lambda **config: calls.append(config))
+        assert calls == []
@@ -0,0 +1,114 @@
+import os
+import time
+
+import pytest
+import yaml
+
+from jimmy.jimmy import JimmyLauncher
+from jimmy.watch import ConfigWatcher
+
+
+def _write(path, text):
+    path.write_text(text)
+    # the watcher compares the modification times, make sure they change within the test
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9 + int(time.time_ns() % 10 ** 6)))
+
+
+def _write_configs(tmp_path):
+    (tmp_path / 'data').mkdir()
+    _write(tmp_path / 'model.yaml', 'layers: 2\nwidth: 64\n')
+    _write(tmp_path / 'optim.yaml', 'lr: 0.1\n')
+    _write(tmp_path / 'config.yaml', 'model: !load model.yaml\n'
+                                     'optim: !load optim.yaml\n'
+                                     f'files: !glob [{tmp_path / "data"}, "*.txt"]\n'
+                                     'x: 1\n')
+    return tmp_path / 'config.yaml'
+
+
+class TestConfigWatcher:
+    def test_reload_fragment(self, tmp_path):
+        watcher = ConfigWatcher(_write_configs(tmp_path), cli_kwargs={'model/width': 32})
+        diffs = []
+        watcher.subscribe(diffs.append)
+        optim, config = watcher.config['optim'], watcher.config
+        assert watcher.reload() is None
+
+        _write(tmp_path / 'model.yaml', 'layers: 3\nwidth: 64\nnorm: true\n')
+        diff = watcher.reload()
+        assert diff.files == [tmp_path / 'model.yaml']
+        assert diff.modified == ['model/layers'] and diff.added == ['model/norm']
+        assert diffs == [diff]
+        # the rest of the config is not parsed again, and the previous config is left as it is
+        assert watcher.config['optim'] is optim
+        assert config['model']['layers'] == 2 and 'norm' not in config['model']
+        assert watcher.config['model']['layers'] == 3 and watcher.config['model']['width'] == 32
+
+    def test_reload_root_and_glob(self, tmp_path):
+        watcher = ConfigWatcher(_write_configs(tmp_path))
+        _write(tmp_path / 'config.yaml', f'model: !load model.yaml\n'
+                                     f'files: !glob [{tmp_path / "data"}, "*.txt"]\n'
+                                     f'x: 2\n')
+        diff = watcher.reload()
+        assert diff.modified == ['x'] and diff.removed == ['optim']
+        assert tmp_path / 'optim.yaml' not in watcher.files
+
+        (tmp_path / 'data' / 'a.txt').touch()
+        stat = os.stat(tmp_path / 'data')
+        os.utime(tmp_path / 'data', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        assert watcher.reload().modified == ['files']
+        assert [path.name for path in watcher.config['files']] == ['a.txt']
+
+    def test_broken_fragment(self, tmp_path):
+        watcher = ConfigWatcher(_write_configs(tmp_path))
+        _write(tmp_path / 'optim.yaml', 'lr: [0.1\n')
+        with pytest.raises(yaml.YAMLError):
+            watcher.reload()
+        assert watcher.config['optim']['lr'] == 0.1
+        assert watcher.reload() is None
+
+        _write(tmp_path / 'optim.yaml', 'lr: 0.2\n')
+        assert watcher.reload().modified == ['optim/lr']
+
+
+def test_launcher_watch(tmp_path):
+    _write(tmp_path / 'grid.yaml', 'x: [1, 2]\n')
+    _write(tmp_path / 'config.yaml', 'x: 0\njimmy:\n  grid_launcher: !load grid.yaml\n')
+    launcher = JimmyLauncher(tmp_path / 'config.yaml')
+    diffs = []
+    watcher = launcher.watch(callback=diffs.append)
+    assert len(launcher.grid) == 2
+
+    _write(tmp_path / 'grid.yaml', 'x: [1, 2, 3]\n')
+    watcher.reload()
+    assert diffs[0].modified == ['jimmy/grid_launcher/x']
+    assert len(launcher.grid) == 3
+
+    # a config reloaded during a launch is only set once the launch ends
+    def func(x):
+        if x == 1:
+            _write(tmp_path / 'grid.yaml', 'x: [4]\n')
+            watcher.reload()
+        return x
+
+    assert launcher.grid_launcher(func) == [1, 2, 3]
+    assert len(diffs) == 2 and launcher.grid_launcher(func) == [4]
+
+
+def test_launcher_watch_nested_include(tmp_path):
+    _write(tmp_path / 'model.yaml', 'size: 2\n')
+    _write(tmp_path / 'config.yaml', 'a: {model: !load model.yaml}\n'
+                                     'x: 0\n'
+                                     'jimmy:\n  grid_launcher:\n    x: [1, 2]\n')
+    launcher = JimmyLauncher(tmp_path / 'config.yaml')
+    watcher = launcher.watch()
+
+    # an include saved during a launch does not reach the running sweep
+    def func(a, x):
+        if x == 1:
+            _write(tmp_path / 'model.yaml', 'size: 5\n')
+            assert watcher.reload().modified == ['a/model/size']
+        return a.model.size
+
+    assert launcher.grid_launcher(func) == [2, 2]
+    assert launcher.grid_launcher(lambda a, x: a.model.size) == [5, 5]